@@ -0,0 +1,139 @@
+"""
+Teslimat Logu - Her hedef gönderiminin sonucu Postgres'e (delivery_log)
+- Sonuçlar bellekteki sınırlı tampona eklenir (gönderim yolu hiç beklemez);
+  tampon doluysa yeni kayıt atılır ve sayılır
+- Arka planda `batch_size` kayıtta bir veya `flush_interval` saniyede bir COPY ile toplu yazılır
+- Satırlar gün (day) kolonuyla tutulur; `retention_days`'den eski günler
+  parça parça silinir (dashboard sorguları gün + kanal indeksini kullanır)
+"""
+
+import asyncio
+import csv
+import io
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+COLUMNS = ("day", "delivered_at", "code", "chat_id", "success", "error_code", "error", "attempts", "latency_ms")
+COPY_SQL = f"COPY delivery_log ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+class DeliveryAudit:
+    """delivery_log tablosuna COPY ile toplu yazan teslimat logu
+
+    on_drop(): tampon dolu olduğu için atılan her kayıtta çağrılır
+    """
+
+    def __init__(
+        self,
+        db,
+        flush_interval: float = 1.0,
+        batch_size: int = 2000,
+        max_buffer: int = 50000,
+        retention_days: int = 7,
+        on_drop=None,
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.retention_days = retention_days
+        self.on_drop = on_drop
+        self._buffer = deque()
+        self._wakeup = asyncio.Event()
+        self._last_cleanup = 0.0
+        self.dropped = 0
+        self.written = 0
+        self.failed_flushes = 0
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def record(self, code: str, result: dict):
+        """Gönderim sonucunu tampona ekle (send_message / zamanlayıcı sonuç dict'i)"""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop()
+            return
+        latency = result.get("latency")
+        self._buffer.append((
+            time.time(),
+            code,
+            result.get("chat_id"),
+            bool(result.get("success")),
+            result.get("error_code"),
+            result.get("error"),
+            result.get("attempts") or 1,
+            None if latency is None else round(latency * 1000),
+        ))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    @staticmethod
+    def _to_csv(rows: list) -> io.StringIO:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for at, code, chat_id, success, error_code, error, attempts, latency_ms in rows:
+            delivered_at = datetime.fromtimestamp(at, timezone.utc)
+            writer.writerow((
+                delivered_at.date().isoformat(), delivered_at.isoformat(), code, chat_id,
+                "t" if success else "f", error_code, error, attempts, latency_ms,
+            ))
+        buffer.seek(0)
+        return buffer
+
+    def _write(self, cursor, rows: list):
+        # CSV üretimi de DB thread'inde: event loop'a CPU yükü binmez
+        cursor.copy_expert(COPY_SQL, self._to_csv(rows))
+
+    async def flush(self):
+        while self._buffer:
+            count = min(len(self._buffer), self.batch_size)
+            rows = [self._buffer.popleft() for _ in range(count)]
+            try:
+                await self.db.run_async(self._write, rows)
+                self.written += count
+            except Exception:
+                # Yazılamayanları geri koy (tampon sınırı aşılırsa en eskiler atılır)
+                self.failed_flushes += 1
+                self._buffer.extendleft(reversed(rows))
+                overflow = len(self._buffer) - self.max_buffer
+                for _ in range(max(0, overflow)):
+                    self._buffer.popleft()
+                    self.dropped += 1
+                    if self.on_drop is not None:
+                        self.on_drop()
+                raise
+
+    def _cleanup(self, cursor, cutoff_days: int, chunk: int = 10000) -> int:
+        """Retention'dan eski günleri parça parça sil (uzun kilit tutmadan)"""
+        deleted = 0
+        while True:
+            cursor.execute(
+                "DELETE FROM delivery_log WHERE id IN ("
+                "SELECT id FROM delivery_log WHERE day < CURRENT_DATE - %s LIMIT %s)",
+                (cutoff_days, chunk),
+            )
+            deleted += cursor.rowcount
+            if cursor.rowcount < chunk:
+                return deleted
+
+    async def cleanup(self) -> int:
+        self._last_cleanup = time.monotonic()
+        return await self.db.run_async(self._cleanup, self.retention_days)
+
+    async def run(self, on_error=None, cleanup_interval: float = 3600):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_cleanup > cleanup_interval:
+                    await self.cleanup()
+            except Exception as e:
+                if on_error is not None:
+                    on_error(e)
+                await asyncio.sleep(self.flush_interval * 5)
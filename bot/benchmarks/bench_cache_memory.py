@@ -0,0 +1,151 @@
+"""
+Hedef cache bellek benchmark'ı: dict tabanlı eski cache <-> dizi kolonlu target_cache
+
+Kullanım:
+    python benchmarks/bench_cache_memory.py [hedef_sayıları]   # ör. 1000,10000,100000
+
+Sentetik config: 8 hedefe bir kullanıcı, kanalların bir kısmı birden çok kullanıcıda,
+hedef başına 0-2 admin link (aynı site adları), kanalların %30'unda kelime filtresi.
+DB imleci satır listesiyle taklit edilir. Her senaryo için tracemalloc ile:
+- cache     : ham cache yapıları (hedef / link / filtre)
+- toplam    : cache + yönlendirme tablosu
+- kurulum   : ilk yükleme + tablo kurulumu sırasındaki tepe
+- yenileme  : tam yenilemede (eski cache ve tablo hâlâ canlıyken yeni yükleme) tepe
+- GC nesne  : çöp toplayıcının izlediği nesne sayısındaki artış
+"""
+
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import RoutingTable
+from target_cache import LinkTable, TargetRows, compact_filters
+
+SITES = [
+    "supertotobet", "otobet", "bets10", "mobilbahis", "jojobet", "matbet", "grandpashabet",
+    "betturkey", "casibom", "marsbahis", "tipobet", "onwin", "betebet", "sahabet", "vdcasino",
+]
+
+def generate(targets: int, seed: int = 3):
+    """DB'den dönen satırlar: (user_channels, admin_links, channel_filters)"""
+    rng = random.Random(seed)
+    users = max(1, targets // 8)
+    target_rows, link_rows, filter_rows = [], [], []
+    seen = set()
+    for row_id in range(1, targets + 1):
+        user_id = rng.randrange(users)
+        channel_id = -1001000000000 - rng.randrange(targets)
+        if (user_id, channel_id) in seen:
+            continue
+        seen.add((user_id, channel_id))
+        target_rows.append((row_id, user_id, channel_id, "filtered" if rng.random() < 0.2 else "all"))
+        for site in rng.sample(SITES, rng.choice((0, 1, 1, 2))):
+            link_rows.append((user_id, channel_id, site.capitalize(), f"https://{site}.com/ref/{user_id}"))
+    link_rows.sort(key=lambda row: (row[0], row[1], row[2].lower()))
+    for channel_id in sorted({row[2] for row in target_rows}):
+        if rng.random() < 0.3:
+            for keyword in rng.sample(SITES, rng.randint(2, 5)):
+                filter_rows.append((channel_id, keyword.upper()))
+    return target_rows, link_rows, filter_rows
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ESKİ CACHE (dict tabanlı, fetchall + tuple anahtarlar)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def legacy_load(target_rows, link_rows, filter_rows):
+    rows = {(user_id, channel_id): (row_id, mode or "all") for row_id, user_id, channel_id, mode in list(target_rows)}
+    links = {}
+    for user_id, channel_id, link_code, link_url in list(link_rows):
+        links.setdefault((user_id, channel_id), {})[link_code.lower()] = link_url
+    filters = {}
+    for channel_id, keyword in list(filter_rows):
+        filters.setdefault(channel_id, set()).add(keyword.lower())
+    # install_cache'in türettiği yardımcı yapılar
+    cache = list(rows)
+    modes = {key: mode for key, (_, mode) in rows.items()}
+    return rows, links, filters, cache, modes
+
+def legacy_table(raw):
+    rows, links, filters, _, _ = raw
+    ordered = sorted(rows.items(), key=lambda item: item[1][0])
+    entries = ((key, code, url) for key, codes in links.items() for code, url in codes.items())
+    return RoutingTable.build([(u, c, mode) for (u, c), (_, mode) in ordered], filters, entries)
+
+def legacy_refresh(state, data):
+    # Eski install_cache: yeni tablo, eski cache yapıları hâlâ bağlıyken kurulurdu
+    raw = legacy_load(*data)
+    table = legacy_table(raw)
+    state[:] = [raw, table]
+
+# ══════════════════════════════════════════════════════════════════════════════
+# YENİ CACHE (target_cache)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def compact_load(target_rows, link_rows, filter_rows):
+    return (
+        TargetRows.from_rows(iter(target_rows)),
+        LinkTable.from_rows(iter(link_rows)),
+        compact_filters(iter(filter_rows)),
+    )
+
+def compact_table(raw):
+    rows, links, filters = raw
+    return RoutingTable.build(rows, filters, links.entries())
+
+def compact_refresh(state, data):
+    # Yeni install_cache: eski ham tablolar bırakılır, sadece eski yönlendirme tablosu canlı kalır
+    state[0] = None
+    state[0] = compact_load(*data)
+    state[1] = compact_table(state[0])
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ÖLÇÜM
+# ══════════════════════════════════════════════════════════════════════════════
+
+def measure(load, build, refresh, data):
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    raw = load(*data)
+    cache_bytes = tracemalloc.get_traced_memory()[0]
+    table = build(raw)
+    total_bytes, build_peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    objects = len(gc.get_objects()) - objects_before
+
+    state = [raw, table]
+    del raw, table
+    tracemalloc.reset_peak()
+    refresh(state, data)
+    refresh_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cache_bytes, total_bytes, build_peak, refresh_peak, objects
+
+def same_routes(data) -> bool:
+    legacy = legacy_table(legacy_load(*data))
+    compact = compact_table(compact_load(*data))
+    messages = [("abc123", "supertotobet"), ("jojobet", ""), ("kod", "sadece sohbet"), ("onwin", "casibom.com")]
+    return all(legacy.route(code, link) == compact.route(code, link) for code, link in messages)
+
+def main(sizes: list):
+    print(f"{'hedef':>7} | {'senaryo':<6} | {'cache':>8} | {'toplam':>8} | {'kurulum':>8} | {'yenileme':>8} | {'GC nesne':>9}")
+    for size in sizes:
+        data = generate(size)
+        assert same_routes(data), "eski ve yeni cache farklı yönlendiriyor"
+        for name, load, build, refresh in (
+            ("eski", legacy_load, legacy_table, legacy_refresh),
+            ("yeni", compact_load, compact_table, compact_refresh),
+        ):
+            cache_bytes, total_bytes, build_peak, refresh_peak, objects = measure(load, build, refresh, data)
+            print(
+                f"{len(data[0]):>7} | {name:<6} | {cache_bytes / 1e6:>5.1f} MB | {total_bytes / 1e6:>5.1f} MB | "
+                f"{build_peak / 1e6:>5.1f} MB | {refresh_peak / 1e6:>5.1f} MB | {objects:>9}"
+            )
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1000, 10000, 100000]
+    main(sizes)
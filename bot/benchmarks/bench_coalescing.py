@@ -0,0 +1,119 @@
+"""
+Patlama birleştirme benchmark'ı: promo fırtınasında istek sayısı ve son teslimat gecikmesi
+
+Kullanım:
+    python benchmarks/bench_coalescing.py [hedef_kanal_sayısı] [kod_sayısı] [pencere_ms]
+
+4 kaynak kanal ~300 ms içinde `kod_sayısı` farklı kod atar. Her kod tüm
+hedeflere gider (%30 hedef kendi admin linkiyle). Gerçek DeliveryScheduler
+(Bot API limitleri: global 30/sn, kanal 20/dk, patlama 3) sahte Bot API'ye
+karşı çalışır. Birleştirmesiz ve birleştirmeli çalıştırmada sendMessage
+sayısı, 429 sayısı ve her kodun hedefe son varış gecikmesi raporlanır.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from coalesce import Coalescer, merge_texts
+from delivery import DeliveryScheduler
+from fake_bot_api import FakeBotAPI
+from payload import MessagePayload, render_message
+from transport import BotTransport
+
+STORM_SPAN = 0.3  # kodların yayıldığı süre (saniye)
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def make_storm(code_count: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    sites = ["supertotobet", "jojobet", "matbet", "grandpashabet"]
+    storm = []
+    for i in range(code_count):
+        site = sites[i % len(sites)]
+        storm.append((rng.random() * STORM_SPAN, f"{site.upper()}{rng.randint(100, 99999)}", f"https://{site}.com/promo"))
+    return sorted(storm)
+
+async def run(targets: int, storm: list, window: float):
+    server = FakeBotAPI(latency=0.02, retry_after=1)
+    await server.start()
+    transport = BotTransport(http2=False)
+    url = httpx.URL(f"{server.base_url}/botTEST/sendMessage")
+
+    async def send(chat_id, payload, code):
+        response = await transport.post(url, payload.body(chat_id))
+        result = response.json()
+        if result.get("ok"):
+            return {"success": True, "chat_id": chat_id}
+        retry_after = (result.get("parameters") or {}).get("retry_after")
+        return {"success": False, "chat_id": chat_id, "error_code": result.get("error_code"), "retry_after": retry_after}
+
+    scheduler = DeliveryScheduler(send, deadline=30.0, max_attempts=20)
+    scheduler.start()
+
+    async def deliver(jobs, code):
+        await asyncio.gather(*[scheduler.submit(chat_id, MessagePayload(text), code) for chat_id, text in jobs])
+
+    async def flush(batch):
+        await deliver([(chat_id, merge_texts(items)) for chat_id, items in batch], "+")
+
+    coalescer = Coalescer(flush)
+    coalescer_task = asyncio.create_task(coalescer.run())
+    chats = [-1009000000000 - i for i in range(targets)]
+    injected_at = {}
+    deliveries = []
+
+    started = time.monotonic()
+    for offset, code, link in storm:
+        await asyncio.sleep(max(0.0, started + offset - time.monotonic()))
+        injected_at[code] = time.monotonic()
+        jobs = []
+        for i, chat_id in enumerate(chats):
+            final_link = f"https://t.me/admin_{i}" if i % 10 >= 7 else link
+            text = render_message(code, final_link)
+            if window:
+                coalescer.add(chat_id, code, text, window)
+            else:
+                jobs.append((chat_id, text))
+        if jobs:
+            deliveries.append(asyncio.create_task(deliver(jobs, code)))
+
+    await asyncio.gather(*deliveries)
+    await coalescer.join()
+    coalescer_task.cancel()
+    await scheduler.stop()
+    await transport.aclose()
+    await server.stop()
+
+    # Her kodun her hedefe varış gecikmesi (birleşik mesajda kod metnin içinde)
+    latencies = []
+    for received_at, _, text in server.delivery_times:
+        for code, at in injected_at.items():
+            if f"`{code}`" in text:
+                latencies.append(received_at - at)
+    sends = server.requests
+    return sends, server.rate_limited, len(server.delivery_times), latencies
+
+async def main(targets: int, code_count: int, window_ms: float):
+    storm = make_storm(code_count)
+    print(f"{targets} hedef | {code_count} kod / {STORM_SPAN * 1000:.0f} ms | pencere {window_ms:.0f} ms")
+    for name, window in (("birleştirmesiz", 0.0), ("birleştirmeli", window_ms / 1000)):
+        sends, limited, delivered, latencies = await run(targets, storm, window)
+        print(
+            f"{name:<15} | sendMessage: {sends:>5} (429: {limited:>4}) | teslim edilen mesaj: {delivered:>5} | "
+            f"kod teslimi p50 {percentile(latencies, 0.5) * 1000:>6.0f} ms | son {max(latencies) * 1000:>6.0f} ms"
+        )
+
+if __name__ == "__main__":
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    code_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    window_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 400
+    asyncio.run(main(targets, code_count, window_ms))
@@ -0,0 +1,70 @@
+"""
+Veritabanı yenilemesi sırasında event loop gecikmesi ölçümü
+
+Kullanım:
+    DATABASE_URL=postgresql://... python benchmarks/bench_db_loop_lag.py [sorgu_gecikmesi_sn]
+
+Yerel bir Postgres'e pg_sleep ile gecikme enjekte edilir. Eski yöntem
+(loop üzerinde psycopg2.connect + senkron sorgu) ile Database.run_async
+karşılaştırılır; 10 ms'lik bir ticker'ın en büyük gecikmesi raporlanır.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+
+from db import Database
+
+TICK = 0.01
+
+async def measure_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.monotonic() - started - TICK)
+    return worst
+
+def slow_query(cursor, delay):
+    cursor.execute("SELECT pg_sleep(%s), 1", (delay,))
+    return cursor.fetchone()
+
+async def run_blocking(dsn: str, delay: float, rounds: int):
+    for _ in range(rounds):
+        conn = psycopg2.connect(dsn, connect_timeout=10)
+        cursor = conn.cursor()
+        slow_query(cursor, delay)
+        cursor.close()
+        conn.close()
+        await asyncio.sleep(0)
+
+async def run_pooled(db: Database, delay: float, rounds: int):
+    for _ in range(rounds):
+        await db.run_async(slow_query, delay)
+
+async def compare(dsn: str, delay: float, rounds: int = 5):
+    db = Database(dsn)
+    for name, job in (
+        ("eski (senkron)", lambda: run_blocking(dsn, delay, rounds)),
+        ("Database havuzu", lambda: run_pooled(db, delay, rounds)),
+    ):
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_lag(stop))
+        started = time.monotonic()
+        await job()
+        stop.set()
+        worst = await lag_task
+        print(f"{name:<16} toplam {time.monotonic() - started:.2f} sn | en büyük loop gecikmesi {worst * 1000:.1f} ms")
+    db.close()
+
+if __name__ == "__main__":
+    dsn = os.getenv("DATABASE_URL", "")
+    if not dsn:
+        sys.exit("DATABASE_URL gerekli")
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    asyncio.run(compare(dsn, delay))
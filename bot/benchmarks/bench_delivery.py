@@ -0,0 +1,73 @@
+"""
+Teslimat zamanlayıcı benchmark'ı (sahte Bot API üzerinde)
+
+Kullanım:
+    python benchmarks/bench_delivery.py [hedef_kanal_sayısı] [kod_sayısı]
+
+Her kod tüm hedeflere gönderilir; kayıp teslimat, 429 sayısı ve
+kod bazlı ilk/son teslimat süreleri raporlanır.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from delivery import DeliveryScheduler
+from fake_bot_api import FakeBotAPI
+
+async def run(targets: int, codes: int):
+    server = FakeBotAPI(latency=0.02)
+    await server.start()
+
+    http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(5.0, connect=3.0),
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+    )
+
+    async def send(chat_id, text, code):
+        response = await http_client.post(f"{server.base_url}/botTEST/sendMessage", json={"chat_id": chat_id, "text": text})
+        result = response.json()
+        if result.get("ok"):
+            return {"success": True, "chat_id": chat_id}
+        return {
+            "success": False,
+            "chat_id": chat_id,
+            "error": result.get("description"),
+            "error_code": result.get("error_code"),
+            "retry_after": (result.get("parameters") or {}).get("retry_after"),
+        }
+
+    scheduler = DeliveryScheduler(send, deadline=60.0, max_attempts=10)
+    scheduler.start()
+
+    started = time.monotonic()
+    per_code = []
+    for i in range(codes):
+        code = f"KOD{i}"
+        futures = [scheduler.submit(-100 - t, f"`{code}`", code) for t in range(targets)]
+        per_code.append(asyncio.gather(*futures))
+    all_results = await asyncio.gather(*per_code)
+    elapsed = time.monotonic() - started
+
+    delivered = 0
+    for i, results in enumerate(all_results):
+        latencies = [r["latency"] for r in results if r.get("success")]
+        delivered += len(latencies)
+        if latencies:
+            print(f"KOD{i}: ilk {min(latencies) * 1000:.0f} ms | son {max(latencies) * 1000:.0f} ms | {len(latencies)}/{targets}")
+
+    print(f"Teslim edilen: {delivered}/{targets * codes} | 429: {server.rate_limited} | İstek: {server.requests} | Süre: {elapsed:.2f} sn")
+
+    await scheduler.stop()
+    await http_client.aclose()
+    await server.stop()
+
+if __name__ == "__main__":
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    codes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.run(run(targets, codes))
@@ -0,0 +1,163 @@
+"""
+Sıcak yedek devralma testi: iki process, Postgres advisory lock ile lider seçimi
+
+Kullanım:
+    DATABASE_URL=postgresql://... python benchmarks/bench_failover.py [tur]
+
+İki aday process (bu dosya --candidate ile) LeaderElection'ı botla aynı varsayılan
+ayarlarla (lock deneme 250 ms, heartbeat 1 sn, lease 5 sn) çalıştırır. Lider 10 ms'de
+bir "mesaj" işler (sayaç) ve sayacı heartbeat ile yazar. Her turda lider önce SIGKILL (çökme), sonra SIGTERM (deploy / dyno restart: temiz
+devir) ile durdurulur ve yerine yeni bir yedek başlatılır. Devralma boşluğu: liderin
+durdurulduğu an -> yedeğin liderliği alıp alımı açtığı an. Temiz devirde yeni liderin
+eski liderin son sayacını devraldığı kontrol edilir.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+WARMUP = 1.5  # Yeni yedeğin bağlanıp lock denemeye başlaması için beklenen süre
+
+# prisma/schema.prisma BotLeader modeliyle aynı tablo (db push yapılmamış test DB'si için)
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS bot_leader (
+        id INTEGER PRIMARY KEY DEFAULT 1,
+        epoch BIGINT NOT NULL DEFAULT 0,
+        holder TEXT,
+        pid INTEGER,
+        acquired_at TIMESTAMP(3),
+        heartbeat_at TIMESTAMP(3),
+        state JSONB
+    )
+"""
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ADAY PROCESS
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def candidate(name: str):
+    from leader import LeaderElection
+
+    seq = 0
+    stopping = asyncio.Event()
+
+    async def on_promote(epoch, state):
+        nonlocal seq
+        seq = (state or {}).get("seq", 0)
+        print(f"PROMOTED {time.time():.6f} {epoch} {seq}", flush=True)
+
+    election = LeaderElection(
+        DATABASE_URL,
+        name,
+        on_promote=on_promote,
+        get_state=lambda: {"seq": seq},
+        on_error=lambda e: print(f"ERROR {e}", flush=True),
+    )
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    task = asyncio.create_task(election.run())
+    while not stopping.is_set():
+        await asyncio.sleep(0.01)
+        if election.is_leader:
+            seq += 1
+    await election.release({"seq": seq})
+    print(f"RELEASED {time.time():.6f} {seq}", flush=True)
+    task.cancel()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ÖLÇÜM
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Candidate:
+    def __init__(self, name: str):
+        self.name = name
+        self.lines = asyncio.Queue()
+        self.process = None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), "--candidate", self.name,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        asyncio.create_task(self._read())
+        return self
+
+    async def _read(self):
+        async for line in self.process.stdout:
+            kind, *fields = line.decode().split()
+            if kind == "ERROR":
+                print(f"  [{self.name}] {line.decode().strip()}")
+                continue
+            await self.lines.put((kind, fields))
+
+    async def wait_for(self, kind: str, timeout: float = 30):
+        while True:
+            got, fields = await asyncio.wait_for(self.lines.get(), timeout)
+            if got == kind:
+                return fields
+
+def prepare_table():
+    import psycopg2
+    conn = psycopg2.connect(DATABASE_URL)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+    conn.close()
+
+async def main(rounds: int):
+    prepare_table()
+    counter = 0
+
+    def name():
+        nonlocal counter
+        counter += 1
+        return f"aday-{counter}"
+
+    leader = await Candidate(name()).start()
+    await leader.wait_for("PROMOTED")
+    standby = await Candidate(name()).start()
+    await asyncio.sleep(WARMUP)
+
+    gaps = {"SIGKILL": [], "SIGTERM": []}
+    inherited_ok = 0
+    for _ in range(rounds):
+        for sig in (signal.SIGKILL, signal.SIGTERM):
+            stopped_at = time.time()
+            leader.process.send_signal(sig)
+            promoted_at, _, inherited = await standby.wait_for("PROMOTED")
+            gaps[sig.name].append(float(promoted_at) - stopped_at)
+            if sig == signal.SIGTERM:
+                _, released_seq = await leader.wait_for("RELEASED")
+                inherited_ok += int(inherited == released_seq)
+            await leader.process.wait()
+            leader, standby = standby, await Candidate(name()).start()
+            await asyncio.sleep(WARMUP)
+
+    print(f"{rounds} tur")
+    for kind, label in (("SIGKILL", "çökme (SIGKILL)"), ("SIGTERM", "temiz devir (SIGTERM)")):
+        values = gaps[kind]
+        print(
+            f"{label:<22} | devralma boşluğu p50 {percentile(values, 0.5) * 1000:>5.0f} ms | "
+            f"max {max(values) * 1000:>5.0f} ms"
+        )
+    print(f"temiz devirde son sayaç devralındı: {inherited_ok}/{rounds}")
+
+    for c in (leader, standby):
+        c.process.terminate()
+        await c.process.wait()
+
+if __name__ == "__main__":
+    if not DATABASE_URL:
+        sys.exit("DATABASE_URL gerekli (test Postgres'i)")
+    if len(sys.argv) > 2 and sys.argv[1] == "--candidate":
+        asyncio.run(candidate(sys.argv[2]))
+    else:
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
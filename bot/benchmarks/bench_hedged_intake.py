@@ -0,0 +1,85 @@
+"""
+Çoklu oturum alım benchmark'ı: tek oturum vs ilk-gelen-kazanır (hedged) alım
+
+Kullanım:
+    python benchmarks/bench_hedged_intake.py [mesaj_sayısı] [mesaj_aralığı_ms]
+
+Oturumlar sahte: her biri aynı mesaj akışını kendi gecikme dağılımıyla
+(taban gecikme + ara sıra reconnect / FloodWait duraklaması) teslim eder.
+Her mesaj için kaynaktan işlemeye geçen süre ölçülür; oturum bazlı
+ilk/geç kopya sayıları ArrivalTracker.summary() ile raporlanır.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intake import ArrivalTracker
+
+CHANNELS = [-1002059757502, -1001513128130, -1001904588149, -1003795422286]
+
+# ad -> (taban gecikme, jitter, duraklama olasılığı, duraklama süresi)
+SESSIONS = {
+    "s0": (0.120, 0.060, 0.02, 2.0),   # mevcut oturum: ara sıra reconnect
+    "s1": (0.080, 0.040, 0.01, 1.5),   # yakın DC
+    "s2": (0.250, 0.100, 0.00, 0.0),   # uzak DC, ama duraklamasız
+}
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def session_delay(rng, profile) -> float:
+    base, jitter, stall_rate, stall = profile
+    delay = base + rng.random() * jitter
+    if rng.random() < stall_rate:
+        delay += stall
+    return delay
+
+async def run(sessions: dict, messages: int, interval: float, seed: int = 7):
+    rng = random.Random(seed)
+    tracker = ArrivalTracker()
+    latencies = []
+    processed = []
+
+    async def deliver(session, channel_id, message_id, posted_at, delay):
+        await asyncio.sleep(delay)
+        if tracker.claim(session, channel_id, message_id):
+            latencies.append(time.monotonic() - posted_at)
+            processed.append(message_id)
+
+    tasks = []
+    for message_id in range(1, messages + 1):
+        channel_id = CHANNELS[message_id % len(CHANNELS)]
+        posted_at = time.monotonic()
+        for session, profile in sessions.items():
+            delay = session_delay(rng, profile)
+            tasks.append(asyncio.create_task(deliver(session, channel_id, message_id, posted_at, delay)))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+
+    assert sorted(processed) == list(range(1, messages + 1)), "her mesaj tam bir kez işlenmeli"
+    return latencies, tracker
+
+async def main(messages: int, interval: float):
+    print(f"{messages} mesaj, {interval * 1000:.0f} ms aralıkla")
+    scenarios = [
+        ("tek oturum (s0)", {"s0": SESSIONS["s0"]}),
+        ("hedged (s0+s1+s2)", SESSIONS),
+    ]
+    for name, sessions in scenarios:
+        latencies, tracker = await run(sessions, messages, interval)
+        print(
+            f"{name:<18} | alım p50 {percentile(latencies, 0.5) * 1000:>5.0f} ms | "
+            f"p99 {percentile(latencies, 0.99) * 1000:>5.0f} ms | max {max(latencies) * 1000:>5.0f} ms"
+        )
+        print(f"{'':<18} | {tracker.summary()}")
+
+if __name__ == "__main__":
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    interval_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.run(main(messages, interval_ms / 1000))
@@ -0,0 +1,93 @@
+"""
+Filtre + link eşleştirme benchmark'ı
+
+Kullanım:
+    python benchmarks/bench_matcher.py [hedef_sayısı] [kanal_başına_kelime]
+
+Eski yöntem (her hedef için kelimeleri sırala + substring testi) ile
+KeywordIndex (tek otomat, kod ve link bir kez taranır) karşılaştırılır.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import KeywordIndex
+
+SITES = ["supertotobet", "otobet", "bets10", "mobilbahis", "jojobet", "matbet", "grandpashabet", "betturkey"]
+
+def build_tables(targets: int, per_target: int, seed: int = 7):
+    rng = random.Random(seed)
+    vocabulary = SITES + [f"{rng.choice(SITES)}{i}" for i in range(per_target * 20)]
+    channel_filters = {}
+    admin_links = {}
+    for i in range(targets):
+        channel_id = -1000000000000 - i
+        words = set(rng.sample(vocabulary, per_target)) | {rng.choice(SITES)}
+        channel_filters[channel_id] = words
+        admin_links[(i % 500, channel_id)] = {w: f"https://t.me/link{i}_{w}" for w in words}
+    return channel_filters, admin_links
+
+def legacy(channel_filters, admin_links, code, link):
+    code_lower = code.lower()
+    link_lower = link.lower()
+    filters = {}
+    for channel_id, keywords in channel_filters.items():
+        for keyword in sorted(keywords, key=len, reverse=True):
+            if keyword in code_lower or keyword in link_lower:
+                filters[channel_id] = keyword
+                break
+    links = {}
+    for key, codes in admin_links.items():
+        for link_code, link_url in sorted(codes.items(), key=lambda x: len(x[0]), reverse=True):
+            if link_code in code_lower or link_code in link_lower:
+                links[key] = link_code
+                break
+    return filters, links
+
+def indexed(filter_index, link_index, code, link):
+    code_lower = code.lower()
+    link_lower = link.lower()
+    return filter_index.resolve(code_lower, link_lower), link_index.resolve(code_lower, link_lower)
+
+def main():
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    per_target = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    channel_filters, admin_links = build_tables(targets, per_target)
+
+    started = time.perf_counter()
+    filter_index = KeywordIndex({ch: {kw: kw for kw in kws} for ch, kws in channel_filters.items()})
+    link_index = KeywordIndex(admin_links)
+    print(f"Hedef: {targets} | Kanal başına kelime: ~{per_target} | Otomat kurulumu: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    messages = [
+        ("SUPERTOTOBET500", "https://supertotobet12.com/promo"),
+        ("OTOBET2024", "https://otobet.com/giris"),
+        ("MATBET777", "https://matbet5.com/x"),
+        ("HICBIRI", "https://ornek.com"),
+    ]
+
+    # Eşleşen kelime uzunlukları eski yöntemle aynı olmalı
+    for code, link in messages:
+        old_filters, old_links = legacy(channel_filters, admin_links, code, link)
+        new_filters, new_links = indexed(filter_index, link_index, code, link)
+        assert {k: len(v) for k, v in old_filters.items()} == {k: len(v[0]) for k, v in new_filters.items()}
+        assert {k: len(v) for k, v in old_links.items()} == {k: len(v[0]) for k, v in new_links.items()}
+
+    for name, func, args in (
+        ("eski", legacy, (channel_filters, admin_links)),
+        ("otomat", indexed, (filter_index, link_index)),
+    ):
+        started = time.perf_counter()
+        rounds = 3
+        for _ in range(rounds):
+            for code, link in messages:
+                func(*args, code, link)
+        per_code = (time.perf_counter() - started) / (rounds * len(messages))
+        print(f"{name:<8} kod başına {per_code * 1000:>9.2f} ms")
+
+if __name__ == "__main__":
+    main()
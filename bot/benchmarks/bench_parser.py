@@ -0,0 +1,115 @@
+"""
+Ayrıştırıcı micro-benchmark'ı
+
+Kullanım:
+    python benchmarks/bench_parser.py [mesaj_sayısı]
+
+Gerçekçi bir mesaj karışımı üzerinde eski (process_message içindeki
+re.match tabanlı) ayrıştırma ile code_parser.parse_message'ı karşılaştırır
+ve saniyede işlenen mesaj sayısını raporlar.
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_parser import parse_message
+
+SITES = ["supertotobet", "otobet", "bets10", "mobilbahis", "jojobet", "matbet", "grandpashabet"]
+CHATTER = [
+    "Günaydın arkadaşlar, bugün çok güzel fırsatlar var!",
+    "Yarın saat 20:00'de büyük etkinlik başlıyor\nHazır olun",
+    "Kazananları tebrik ederiz 🎉🎉🎉",
+    "Yeni kanalımıza katılmayı unutmayın\nt.me/ornekkanal\nÇekiliş için takipte kalın",
+    "📢 DUYURU 📢\n\nBakım çalışması nedeniyle site 1 saat kapalı olacaktır.\nAnlayışınız için teşekkürler.",
+]
+
+def build_corpus(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        site = rng.choice(SITES)
+        code = f"{site.upper()}{rng.randint(100, 99999)}"
+        link = f"https://{site}{rng.randint(1, 999)}.com/promo?ref={rng.randint(1, 9999)}"
+        kind = rng.random()
+        if kind < 0.35:
+            corpus.append(f"{site}\n{code}\n{link}")
+        elif kind < 0.6:
+            corpus.append(f"  {code}  \n\n{link}\n")
+        elif kind < 0.7:
+            corpus.append(f"{site} özel kod\n{code}\n{link}")
+        else:
+            corpus.append(rng.choice(CHATTER))
+    return corpus
+
+def legacy_parse(text: str, keywords=frozenset()):
+    """Eski process_message ayrıştırması (karşılaştırma için birebir kopya)"""
+    text = text.strip()
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    if len(lines) < 2:
+        return None
+
+    link_pattern = r'^(?:https?://)?(?:www\.)?[a-zA-Z0-9][-a-zA-Z0-9]*(?:\.[a-zA-Z0-9][-a-zA-Z0-9]*)+(?:/[^\s]*)?$'
+    code_pattern = r'^[\wÇçĞğİıÖöŞşÜü-]+$'
+
+    code = None
+    link = None
+    format_type = None
+
+    if len(lines) >= 3:
+        first_line_lower = lines[0].lower()
+        is_single_word = ' ' not in first_line_lower and '\t' not in first_line_lower
+        if is_single_word or first_line_lower in keywords:
+            potential_code = lines[1]
+            potential_link = lines[2]
+            if re.match(code_pattern, potential_code) and re.match(link_pattern, potential_link, re.IGNORECASE):
+                code = potential_code
+                link = potential_link
+                if is_single_word:
+                    format_type = f"FORMAT-1 (tek_kelime:{lines[0]}+kod+link)"
+                else:
+                    format_type = f"FORMAT-1 (keyword:{lines[0]}+kod+link)"
+
+    if not code:
+        potential_code = lines[0]
+        potential_link = lines[1]
+        if re.match(code_pattern, potential_code) and re.match(link_pattern, potential_link, re.IGNORECASE):
+            code = potential_code
+            link = potential_link
+            format_type = "FORMAT-2 (kod+link)"
+
+    if not code or not link:
+        return None
+    return code, link, format_type
+
+def bench(name: str, func, corpus: list, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    rate = len(corpus) / best
+    print(f"{name:<12} {rate:>12,.0f} mesaj/sn")
+    return rate
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    corpus = build_corpus(count)
+
+    # Sonuçlar eski ayrıştırma ile birebir aynı olmalı
+    for text in corpus:
+        old = legacy_parse(text)
+        new = parse_message(text)
+        assert old == (None if new is None else (new.code, new.link, new.format_type)), text
+
+    before = bench("eski", legacy_parse, corpus)
+    after = bench("code_parser", parse_message, corpus)
+    print(f"Hızlanma: {after / before:.2f}x")
+
+if __name__ == "__main__":
+    main()
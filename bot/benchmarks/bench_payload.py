@@ -0,0 +1,79 @@
+"""
+Gönderim gövdesi hazırlama benchmark'ı: eski (hedef başına f-string + dict + json=)
+ile yeni (varyant başına metin + tek serileştirme + chat_id ekleme) karşılaştırması
+
+Kullanım:
+    python benchmarks/bench_payload.py [hedef_kanal_sayısı] [link_varyantı] [tekrar]
+
+Ağ kullanılmaz; sadece istek nesnesinin kurulması (CPU) ölçülür.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from payload import JSON_HEADERS, build_payloads, render_message
+
+URL = "https://api.telegram.org/botTEST/sendMessage"
+PARSED_URL = httpx.URL(URL)
+
+def make_targets(targets: int, variants: int) -> list:
+    """%70 hedef kaynak linki, kalanı `variants` farklı admin linkinden birini alır"""
+    result = []
+    for i in range(targets):
+        custom = f"https://t.me/admin_{i % variants}" if i % 10 >= 7 else None
+        result.append((-1009000000000 - i, custom))
+    return result
+
+def legacy(client, code, link, targets):
+    requests = []
+    for chat_id, custom_link in targets:
+        message = f"`{code}`\n\n{custom_link or link}"
+        payload = {
+            "chat_id": chat_id,
+            "text": message,
+            "parse_mode": "Markdown",
+            "disable_web_page_preview": True
+        }
+        requests.append(client.build_request("POST", URL, json=payload))
+    return requests
+
+def pre_rendered(client, code, link, targets):
+    extensions = {"timeout": client.timeout.as_dict()}
+    rendered = {}
+    jobs = []
+    for chat_id, custom_link in targets:
+        final_link = custom_link or link
+        text = rendered.get(final_link)
+        if text is None:
+            text = rendered[final_link] = render_message(code, final_link)
+        jobs.append((chat_id, text))
+    return [
+        httpx.Request("POST", PARSED_URL, content=payload.body(chat_id), headers=JSON_HEADERS, extensions=extensions)
+        for chat_id, payload in build_payloads(jobs)
+    ]
+
+def measure(func, client, targets, rounds: int) -> float:
+    started = time.process_time()
+    for i in range(rounds):
+        func(client, f"SUPER{i}_BONUS", "https://supertotobet.com/promo_kod", targets)
+    return (time.process_time() - started) / rounds
+
+if __name__ == "__main__":
+    target_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    variants = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    client = httpx.AsyncClient()
+    targets = make_targets(target_count, variants)
+
+    old = measure(legacy, client, targets, rounds)
+    new = measure(pre_rendered, client, targets, rounds)
+    per_1000 = 1000 / target_count
+    print(f"{target_count} hedef, {variants} link varyantı, {rounds} tekrar")
+    print(f"Eski : {old * per_1000 * 1000:.2f} ms CPU / 1000 hedef")
+    print(f"Yeni : {new * per_1000 * 1000:.2f} ms CPU / 1000 hedef ({old / new:.2f}x)")
@@ -0,0 +1,97 @@
+"""
+Ön filtre benchmark'ı: %95 gürültü içeren gerçekçi mesaj karışımında
+sadece parse_message ile quick_reject + parse_message karşılaştırması
+
+Kullanım:
+    python benchmarks/bench_prefilter.py [mesaj_sayısı] [kod_oranı]
+
+İki yolun aynı mesajları kabul ettiği de doğrulanır (ön filtre yanlış ret yapmamalı).
+"""
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_parser import parse_message, quick_reject
+
+SITES = ["supertotobet", "otobet", "bets10", "mobilbahis", "jojobet", "matbet", "grandpashabet"]
+KEYWORDS = {"kod geldi", "yeni kod"}
+
+ANNOUNCEMENT = (
+    "📢 DUYURU 📢\n\n"
+    "Değerli üyelerimiz, bu akşam saat 21:00'de büyük turnuva başlıyor. Katılım için hesabınıza "
+    "giriş yapmanız ve etkinlik sayfasından kayıt olmanız yeterlidir. Ödül havuzu 100.000 TL!\n\n"
+    "Detaylar için sabitlenen mesaja bakın.\n"
+    "İyi şanslar 🍀"
+)
+CHATTER = [
+    "Günaydın arkadaşlar, bugün çok güzel fırsatlar var!",
+    "Kazananları tebrik ederiz 🎉🎉🎉",
+    "Yarın saat 20:00'de büyük etkinlik başlıyor\nHazır olun",
+    "Yeni kanalımıza katılmayı unutmayın\nt.me/ornekkanal\nÇekiliş için takipte kalın",
+    "KOD GELİYOR\nhazır olun",
+    "ok",
+    "🔥🔥🔥",
+    "Sitemiz güncellendi. Yeni adres için duyuruları takip edin.",
+    ANNOUNCEMENT,
+]
+
+def noise(rng) -> str:
+    kind = rng.random()
+    if kind < 0.15:
+        # Fotoğraf altı açıklama gibi uzun metin
+        return ANNOUNCEMENT + "\n\n" + " ".join(rng.choice(CHATTER) for _ in range(rng.randint(2, 8)))
+    return rng.choice(CHATTER)
+
+def code_message(rng) -> str:
+    site = rng.choice(SITES)
+    code = f"{site.upper()}{rng.randint(100, 99999)}"
+    link = f"https://{site}{rng.randint(1, 999)}.com/promo?ref={rng.randint(1, 9999)}"
+    kind = rng.random()
+    if kind < 0.5:
+        return f"{site}\n{code}\n{link}"
+    if kind < 0.8:
+        return f"{code}\n{link}"
+    return f"yeni kod\n{code}\n{link}"
+
+def build_corpus(count: int, code_ratio: float, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [code_message(rng) if rng.random() < code_ratio else noise(rng) for _ in range(count)]
+
+def parse_only(corpus):
+    return [parse_message(text, KEYWORDS) for text in corpus]
+
+def with_prefilter(corpus):
+    return [None if quick_reject(text, KEYWORDS) else parse_message(text, KEYWORDS) for text in corpus]
+
+def measure(func, corpus, rounds: int = 5):
+    best = float("inf")
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = func(corpus)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    code_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    corpus = build_corpus(count, code_ratio)
+
+    old_time, old_result = measure(parse_only, corpus)
+    new_time, new_result = measure(with_prefilter, corpus)
+
+    old_codes = [(p.code, p.link) if p else None for p in old_result]
+    new_codes = [(p.code, p.link) if p else None for p in new_result]
+    assert old_codes == new_codes, "ön filtre parse_message ile farklı sonuç verdi"
+
+    reasons = Counter(quick_reject(text, KEYWORDS) or "parse" for text in corpus)
+    accepted = sum(1 for p in new_result if p)
+    print(f"{count} mesaj | kod oranı %{code_ratio * 100:.0f} | kabul edilen: {accepted}")
+    print(f"Ön filtre kararları: {dict(reasons)}")
+    print(f"Sadece parse_message : {old_time / count * 1e6:.2f} µs/mesaj")
+    print(f"quick_reject + parse : {new_time / count * 1e6:.2f} µs/mesaj ({old_time / new_time:.2f}x)")
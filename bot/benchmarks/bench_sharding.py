@@ -0,0 +1,128 @@
+"""
+Sharding ölçeklenme benchmark'ı (tek makine, sahte Bot API)
+
+Kullanım:
+    python benchmarks/bench_sharding.py [worker_sayıları] [hedef_kanal_sayısı] [kod_sayısı]
+    python benchmarks/bench_sharding.py 1,2,4 2000 20
+
+Dinleyici (bu process) her kodu consistent-hash ile worker'lara böler ve
+Unix socket üzerinden gönderir. Her worker ayrı process'te kendi
+DeliveryScheduler'ı ve HTTP istemcisiyle, kendi sahte Bot API'sine (ayrı
+token gibi) gönderir. Rate limit kapalıdır: ölçülen, gönderim tarafının
+CPU kapasitesidir. Worker sayısıyla teslimat/sn'nin neredeyse doğrusal
+artması beklenir (çekirdek sayısı kadar).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_bot_api import FakeBotAPI
+from sharding import HashRing, ShardClient, serve_shard, socket_path
+
+def run_fake_api(ports):
+    async def serve():
+        server = FakeBotAPI(latency=0.005, global_rate=None, chat_rate=None)
+        await server.start()
+        ports.put(server.port)
+        await asyncio.Event().wait()
+    asyncio.run(serve())
+
+def run_worker(path, api_port):
+    import httpx
+    from delivery import DeliveryScheduler
+
+    async def serve():
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=50)
+        )
+        url = f"http://127.0.0.1:{api_port}/botTEST/sendMessage"
+
+        async def send(chat_id, text, code):
+            result = (await http_client.post(url, json={"chat_id": chat_id, "text": text})).json()
+            return {"success": bool(result.get("ok")), "chat_id": chat_id, "error_code": result.get("error_code")}
+
+        scheduler = DeliveryScheduler(send, global_rate=1e9, global_burst=1e9, chat_rate=1e9, chat_burst=1e9,
+                                      concurrency=50, deadline=60.0)
+        scheduler.start()
+
+        async def deliver(code, jobs):
+            results = await asyncio.gather(*[scheduler.submit(chat_id, text, code) for chat_id, text in jobs])
+            return [{"success": r["success"], "chat_id": r["chat_id"], "latency": r["latency"]} for r in results]
+
+        server = await serve_shard(path, deliver)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+async def run_listener(paths, targets: int, codes: int):
+    ring = HashRing(range(len(paths)))
+    clients = {i: ShardClient(path) for i, path in enumerate(paths)}
+
+    # Worker'lar socket'i açana kadar bekle
+    for shard_client in clients.values():
+        for _ in range(100):
+            try:
+                await shard_client.deliver("ISINMA", [(-1, "x")])
+                break
+            except ConnectionError:
+                await asyncio.sleep(0.1)
+
+    channels = [-1009000000000 - t for t in range(targets)]
+    started = time.monotonic()
+    delivered = 0
+    for i in range(codes):
+        code = f"KOD{i}"
+        groups = ring.split([(chat_id, f"`{code}`\n\nhttps://example.com") for chat_id in channels], key=lambda job: job[0])
+        parts = await asyncio.gather(*[clients[shard].deliver(code, jobs) for shard, jobs in groups.items()])
+        delivered += sum(1 for part in parts for r in part if r["success"])
+    elapsed = time.monotonic() - started
+
+    for shard_client in clients.values():
+        await shard_client.close()
+    return delivered, elapsed
+
+def measure(workers: int, targets: int, codes: int) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    ports = ctx.Queue()
+    processes = []
+    directory = tempfile.mkdtemp(prefix="shardbench")
+    paths = [socket_path(directory, i) for i in range(workers)]
+    try:
+        for _ in range(workers):
+            process = ctx.Process(target=run_fake_api, args=(ports,), daemon=True)
+            process.start()
+            processes.append(process)
+        api_ports = [ports.get(timeout=30) for _ in range(workers)]
+
+        for path, api_port in zip(paths, api_ports):
+            process = ctx.Process(target=run_worker, args=(path, api_port), daemon=True)
+            process.start()
+            processes.append(process)
+
+        delivered, elapsed = asyncio.run(run_listener(paths, targets, codes))
+        rate = delivered / elapsed
+        print(f"{workers} worker | {delivered}/{targets * codes} teslimat | {elapsed:.2f} sn | {rate:,.0f} teslimat/sn")
+        return rate
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+if __name__ == "__main__":
+    worker_counts = [int(n) for n in (sys.argv[1] if len(sys.argv) > 1 else "1,2,4").split(",")]
+    targets = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    codes = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    print(f"CPU çekirdeği: {os.cpu_count()} | {targets} hedef x {codes} kod")
+    baseline = None
+    for workers in worker_counts:
+        rate = measure(workers, targets, codes)
+        baseline = baseline or rate / workers
+        print(f"   ölçeklenme: {rate / baseline:.2f}x (ideal {workers}x)")
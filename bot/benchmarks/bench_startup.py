@@ -0,0 +1,122 @@
+"""
+Soğuk başlangıç benchmark'ı: handler'ın dinlemeye başlamasına kadar geçen süre
+
+Kullanım:
+    python benchmarks/bench_startup.py [kaynak_kanal_sayısı] [telegram_gecikmesi_ms] [db_yükleme_ms]
+
+Telegram ve DB çağrıları yapay gecikmeli sahte nesnelerle taklit edilir.
+Senaryolar:
+- eski      : bağlan -> kanal başına sıralı get_entity/get_messages/GetFullChannel -> DB -> handler
+- soğuk     : DB yüklemesi bağlantıyla paralel, kanallar eşzamanlı çözümlenir (cache dosyası yok)
+- cache'li  : entity cache dosyasından handler hemen kurulur, doğrulama arka planda
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_cache import EntityCache
+
+RESOLVE_CONCURRENCY = 8  # bot.SOURCE_RESOLVE_CONCURRENCY ile aynı
+
+class FakeTelegram:
+    """Her çağrı `latency` saniye süren sahte Telethon client"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def _call(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def start(self):
+        # Bağlantı + yetkilendirme birkaç RTT sürer
+        for _ in range(3):
+            await self._call()
+
+    async def get_entity(self, channel_id):
+        await self._call()
+        return (channel_id, channel_id * 7 % 1000003)
+
+    async def get_messages(self, entity, limit=1):
+        await self._call()
+        return [1000]
+
+    async def get_full_channel(self, entity):
+        await self._call()
+        return 5000
+
+async def load_db(delay: float):
+    # check_cache_version + load_target_channels + sent_codes.restore + fetch_sources
+    await asyncio.sleep(delay)
+
+async def resolve(client: FakeTelegram, channel_id: int, state: dict):
+    entity = await client.get_entity(channel_id)
+    messages = await client.get_messages(entity, limit=1)
+    await client.get_full_channel(entity)
+    state[channel_id] = (entity[1], messages[0])
+
+async def legacy(client, channels, db_delay):
+    started = time.monotonic()
+    await client.start()
+    state = {}
+    for channel_id in channels:
+        await resolve(client, channel_id, state)
+    await load_db(db_delay)
+    return time.monotonic() - started, None, state
+
+async def concurrent_resolve(client, channels, state):
+    semaphore = asyncio.Semaphore(RESOLVE_CONCURRENCY)
+
+    async def one(channel_id):
+        async with semaphore:
+            await resolve(client, channel_id, state)
+
+    await asyncio.gather(*[one(channel_id) for channel_id in channels])
+
+async def new_startup(client, channels, db_delay, cache: EntityCache):
+    started = time.monotonic()
+    cached = cache.load()
+    db_task = asyncio.create_task(load_db(db_delay))
+    await client.start()
+    await db_task
+
+    state = dict(cached)
+    await concurrent_resolve(client, [ch for ch in channels if ch not in cached], state)
+    handler_ready = time.monotonic() - started
+
+    # Cache'ten gelenlerin doğrulanması handler'ı bekletmez
+    await concurrent_resolve(client, [ch for ch in channels if ch in cached], state)
+    verified = time.monotonic() - started
+    cache.save(state)
+    return handler_ready, verified, state
+
+async def main(channel_count: int, latency_ms: float, db_ms: float):
+    channels = [-1001000000000 - i for i in range(channel_count)]
+    latency = latency_ms / 1000
+    db_delay = db_ms / 1000
+    cache = EntityCache(os.path.join(tempfile.mkdtemp(prefix="benchstartup"), "entity_cache.json"))
+
+    print(f"{channel_count} kaynak kanal | Telegram çağrısı {latency_ms:.0f} ms | DB yükleme {db_ms:.0f} ms")
+    scenarios = [
+        ("eski", lambda client: legacy(client, channels, db_delay)),
+        ("soğuk", lambda client: new_startup(client, channels, db_delay, cache)),
+        ("cache'li", lambda client: new_startup(client, channels, db_delay, cache)),
+    ]
+    for name, run in scenarios:
+        client = FakeTelegram(latency)
+        ready, verified, state = await run(client)
+        assert len(state) == channel_count
+        tail = f" | doğrulama bitişi {verified * 1000:>7.0f} ms" if verified is not None else ""
+        print(f"{name:<9} | handler hazır {ready * 1000:>7.0f} ms{tail} | Telegram çağrısı: {client.calls}")
+
+if __name__ == "__main__":
+    channel_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 80
+    db_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 300
+    asyncio.run(main(channel_count, latency_ms, db_ms))
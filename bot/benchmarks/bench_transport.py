@@ -0,0 +1,117 @@
+"""
+Bot API taşıyıcısı benchmark'ı: soğuk havuz vs ısıtılmış havuz (yerel TLS sunucu)
+
+Kullanım:
+    python benchmarks/bench_transport.py [hedef_kanal_sayısı] [bağlantı_gecikmesi_ms]
+
+Sahte Bot API TLS (self-signed) ile dinler. Her senaryoda hedef sayısı
+kadar eşzamanlı sendMessage atılır; ilk/son cevap süresi, havuz bekleme
+p50/p99 ve açılan yeni bağlantı sayısı raporlanır.
+bağlantı_gecikmesi_ms: yeni TCP bağlantısı kabulünde yapay gecikme
+(gerçek api.telegram.org el sıkışma RTT'sini taklit eder).
+"""
+
+import asyncio
+import datetime
+import os
+import ssl
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from fake_bot_api import FakeBotAPI
+from metrics import Histogram
+from payload import MessagePayload
+from transport import BotTransport
+
+def self_signed_context() -> ssl.SSLContext:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    directory = tempfile.mkdtemp(prefix="benchtls")
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+class SlowAcceptAPI(FakeBotAPI):
+    """Yeni bağlantıda el sıkışma gecikmesi ekleyen sahte API"""
+
+    def __init__(self, connect_delay: float, **kwargs):
+        super().__init__(**kwargs)
+        self.connect_delay = connect_delay
+
+    async def _handle(self, reader, writer):
+        await asyncio.sleep(self.connect_delay)
+        await super()._handle(reader, writer)
+
+async def burst(transport: BotTransport, url: httpx.URL, targets: int):
+    pool_wait = Histogram("pool_wait", "")
+    connections = [0]
+    transport.on_pool_wait = pool_wait.observe
+    transport.on_connect = lambda: connections.__setitem__(0, connections[0] + 1)
+
+    payload = MessagePayload("`KOD123`\n\nhttps://example\\.com")
+    started = time.monotonic()
+    done = []
+
+    async def send(chat_id):
+        response = await transport.post(url, payload.body(chat_id))
+        response.json()
+        done.append(time.monotonic() - started)
+
+    await asyncio.gather(*[send(-1009000000000 - i) for i in range(targets)])
+    return min(done), max(done), pool_wait, connections[0]
+
+async def scenario(name: str, server: FakeBotAPI, targets: int, warm: bool):
+    transport = BotTransport(http2=False, verify=False, min_connections=10, max_connections=50)
+    transport.resize(targets)
+    url = httpx.URL(f"{server.base_url}/botTEST/sendMessage")
+    if warm:
+        await transport.warm(httpx.URL(f"{server.base_url}/botTEST/getMe"))
+        await asyncio.sleep(0.5)
+    first, last, pool_wait, opened = await burst(transport, url, targets)
+    print(
+        f"{name:<10} | havuz {transport.size:>3} | ilk {first * 1000:>6.1f} ms | son {last * 1000:>7.1f} ms | "
+        f"havuz bekleme p50/p99 {pool_wait.quantile(0.5) * 1000:.1f}/{pool_wait.quantile(0.99) * 1000:.1f} ms | "
+        f"yeni bağlantı: {opened}"
+    )
+    await transport.aclose()
+
+async def main(targets: int, connect_delay_ms: float):
+    server = SlowAcceptAPI(connect_delay_ms / 1000, latency=0.005, global_rate=None, chat_rate=None,
+                           ssl=self_signed_context())
+    await server.start()
+    print(f"{targets} hedef | yeni bağlantı gecikmesi {connect_delay_ms:.0f} ms | TLS {server.base_url}")
+    await scenario("soğuk", server, targets, warm=False)
+    await scenario("ısıtılmış", server, targets, warm=True)
+    await server.stop()
+
+if __name__ == "__main__":
+    targets = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    connect_delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(targets, connect_delay_ms))
@@ -0,0 +1,141 @@
+"""
+Güncelleme motoru simülasyonu
+
+Kullanım:
+    python benchmarks/bench_update_engine.py [süre_sn]
+
+Birkaç kaynak kanal farklı hızlarda (biri patlamalı) mesaj üretir; push
+update'lerin bir kısmı kaybolur. Eski yöntem (her 2 sn'de her kanal için
+get_messages(limit=3)) ile UpdateEngine karşılaştırılır: API çağrısı
+sayısı, kaçırılan mesaj ve ortalama yakalama gecikmesi raporlanır.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from update_engine import UpdateEngine
+
+class SimMessage:
+    __slots__ = ("id", "pts", "created")
+
+    def __init__(self, id, pts, created):
+        self.id = id
+        self.pts = pts
+        self.created = created
+
+class SimChannel:
+    """Mesaj üreten sahte kanal: (mesaj aralığı, patlama boyu)"""
+
+    def __init__(self, channel_id, interval, burst):
+        self.channel_id = channel_id
+        self.interval = interval
+        self.burst = burst
+        self.messages = []
+
+    def post(self):
+        msg = SimMessage(len(self.messages) + 1, len(self.messages) + 1, time.monotonic())
+        self.messages.append(msg)
+        return msg
+
+CHANNELS = [
+    SimChannel(-1001, 0.5, 1),   # aktif
+    SimChannel(-1002, 3.0, 6),   # patlamalı (promo fırtınası)
+    SimChannel(-1003, 20.0, 1),  # sessiz
+    SimChannel(-1004, 60.0, 1),  # çok sessiz
+]
+
+async def produce(duration, on_push, drop_rate, rng):
+    async def channel_loop(channel):
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            await asyncio.sleep(rng.expovariate(1 / channel.interval))
+            for _ in range(channel.burst):
+                msg = channel.post()
+                if rng.random() >= drop_rate:
+                    on_push(channel, msg)
+    await asyncio.gather(*(channel_loop(c) for c in CHANNELS))
+
+def report(name, calls, seen, duration):
+    total = sum(len(c.messages) for c in CHANNELS)
+    delays = [d for d in seen.values()]
+    avg = sum(delays) / len(delays) * 1000 if delays else 0
+    print(f"{name:<14} API çağrısı: {calls:>5} ({calls / duration:.1f}/sn) | yakalanan: {len(seen)}/{total} | ort. gecikme: {avg:.0f} ms")
+
+async def run_legacy(duration, drop_rate):
+    rng = random.Random(1)
+    for c in CHANNELS:
+        c.messages = []
+    seen = {}
+    calls = 0
+
+    def on_push(channel, msg):
+        seen.setdefault((channel.channel_id, msg.id), time.monotonic() - msg.created)
+
+    async def poll():
+        nonlocal calls
+        last_ids = {c.channel_id: 0 for c in CHANNELS}
+        while True:
+            for c in CHANNELS:
+                calls += 1
+                await asyncio.sleep(0.02)  # sahte API gecikmesi
+                fresh = [m for m in c.messages if m.id > last_ids[c.channel_id]][-3:]
+                for m in fresh:
+                    seen.setdefault((c.channel_id, m.id), time.monotonic() - m.created)
+                    last_ids[c.channel_id] = m.id
+            await asyncio.sleep(2)
+
+    poller = asyncio.create_task(poll())
+    await produce(duration, on_push, drop_rate, rng)
+    await asyncio.sleep(2.5)
+    poller.cancel()
+    report("eski polling", calls, seen, duration)
+
+async def run_engine(duration, drop_rate):
+    rng = random.Random(1)
+    for c in CHANNELS:
+        c.messages = []
+    by_id = {c.channel_id: c for c in CHANNELS}
+    seen = {}
+    calls = 0
+
+    async def fetch_difference(channel_id, pts):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        channel = by_id[channel_id]
+        fresh = channel.messages[pts:pts + 100]
+        new_pts = pts + len(fresh)
+        return new_pts, fresh, new_pts == len(channel.messages), None
+
+    async def on_message(channel_id, message):
+        seen.setdefault((channel_id, message.id), time.monotonic() - message.created)
+
+    engine = UpdateEngine(fetch_difference, on_message, min_interval=2.0, max_interval=30.0)
+    for c in CHANNELS:
+        engine.add_channel(c.channel_id, 0)
+
+    def on_push(channel, msg):
+        engine.on_update(channel.channel_id, msg.pts, 1)
+        if engine.claim(channel.channel_id, msg.id):
+            seen.setdefault((channel.channel_id, msg.id), time.monotonic() - msg.created)
+
+    runner = asyncio.create_task(engine.run())
+    await produce(duration, on_push, drop_rate, rng)
+    await asyncio.sleep(2.5)
+    runner.cancel()
+    report("UpdateEngine", calls, seen, duration)
+    print(f"{'':<14} gap çekimi: {engine.gap_fetches} | periyodik kontrol: {engine.poll_fetches}")
+
+async def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    drop_rate = 0.1
+    await run_legacy(duration, drop_rate)
+    await run_engine(duration, drop_rate)
+
+if __name__ == "__main__":
+    asyncio.run(main())
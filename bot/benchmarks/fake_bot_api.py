@@ -0,0 +1,145 @@
+"""
+Sahte Bot API sunucusu - yerel benchmark ve deneme için
+- sendMessage isteklerini kabul eder, gecikme / 429 / hata enjekte eder
+- Kanal bazlı ve global limitleri gerçek Bot API gibi 429 + retry_after ile uygular
+  (global_rate / chat_rate = None ise limit yok)
+- ssl verilirse TLS üzerinden (HTTP/1.1) dinler
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from ssl import SSLError
+
+class FakeBotAPI:
+    def __init__(
+        self,
+        latency: float = 0.02,
+        global_rate: float = 30,
+        chat_rate: float = 20 / 60,
+        chat_burst: int = 3,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ssl=None,
+    ):
+        self.latency = latency
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate  # limitten bağımsız rastgele 429 oranı
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+
+        self.requests = 0
+        self.delivered = {}  # chat_id -> [text, ...]
+        self.delivery_times = []  # [(monotonic, chat_id, text), ...]
+        self.rate_limited = 0
+        self.errors = 0
+
+        self._global_hits = deque()
+        self._chat_tokens = {}  # chat_id -> (tokens, updated)
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.ssl else "http"
+        return f"{scheme}://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, ssl=self.ssl)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _chat_allowed(self, chat_id, now: float) -> bool:
+        if self.chat_rate is None:
+            return True
+        tokens, updated = self._chat_tokens.get(chat_id, (self.chat_burst, now))
+        tokens = min(self.chat_burst, tokens + (now - updated) * self.chat_rate)
+        if tokens < 1:
+            self._chat_tokens[chat_id] = (tokens, now)
+            return False
+        self._chat_tokens[chat_id] = (tokens - 1, now)
+        return True
+
+    def _global_allowed(self, now: float) -> bool:
+        if self.global_rate is None:
+            return True
+        while self._global_hits and now - self._global_hits[0] >= 1.0:
+            self._global_hits.popleft()
+        if len(self._global_hits) >= self.global_rate:
+            return False
+        self._global_hits.append(now)
+        return True
+
+    def _reply(self, payload: dict) -> dict:
+        self.requests += 1
+        now = time.monotonic()
+        chat_id = payload.get("chat_id")
+
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+
+        limited = self.rate_limit_rate and random.random() < self.rate_limit_rate
+        if limited or not self._global_allowed(now) or not self._chat_allowed(chat_id, now):
+            self.rate_limited += 1
+            return {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+
+        self.delivered.setdefault(chat_id, []).append(payload.get("text"))
+        self.delivery_times.append((now, chat_id, payload.get("text")))
+        return {"ok": True, "result": {"message_id": self.requests, "chat": {"id": chat_id}}}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                content_length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value.strip())
+
+                body = await reader.readexactly(content_length) if content_length else b""
+                payload = json.loads(body) if body else {}
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                if b"/sendMessage" in request_line:
+                    result = self._reply(payload)
+                else:
+                    # getMe vb. (bağlantı ısıtma): sayılmaz, limit uygulanmaz
+                    result = {"ok": True, "result": {"id": 1, "is_bot": True}}
+                status = 200 if result["ok"] else result["error_code"]
+                data = json.dumps(result).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError, SSLError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,268 @@
+"""
+Yük testi / replay harness'ı - canlı Telegram, Postgres ve Bot API olmadan
+
+Kullanım:
+    python benchmarks/load_test.py [--targets 10,100,1000,10000] [--stream storm]
+                                   [--messages 200] [--latency 0.02]
+                                   [--error-rate 0.0] [--rate-limit-rate 0.0]
+                                   [--retry-after 1] [--realistic-limits]
+                                   [--speed 1.0] [--replay kayit.jsonl]
+                                   [--coalesce-ms 0]
+
+bot.py'nin gerçek process_message -> kod kuyruğu -> send_to_all_channels -> DeliveryScheduler
+-> send_message hattı sahte Bot API sunucusuna karşı çalıştırılır. Hedef
+kanallar bellekteki bir config'ten (install_cache) yüklenir. Her hedef
+sayısı için mesaj/sn, teslimat/sn, p50/p99 teslimat gecikmesi ve bellek
+raporlanır.
+
+Akışlar:
+    storm       4 kaynak kanal aynı anda farklı kodlar atar (promo fırtınası)
+    duplicates  aynı kod birden fazla kaynaktan gelir
+    malformed   çoğunluğu sohbet / bozuk format / yasak kelime
+    mixed       hepsinin karışımı
+    --replay    JSONL kayıt: {"channel_id": ..., "text": "...", "delay": sn}
+
+Gereken bağımlılıklar bot/requirements.txt ile aynıdır (telethon, httpx, psycopg2).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+# bot.py import edilmeden önce: kalıcı dedupe ve gerçek API kapalı
+# Telethon client import sırasında kurulur: sahte kimlik, session dosyası geçici dizinde
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "x")
+os.environ.setdefault("SESSION_FILE", os.path.join(tempfile.mkdtemp(prefix="loadtest"), "bot_session"))
+os.environ.setdefault("DEDUPE_STORE", "memory")
+os.environ.setdefault("OUTBOX_STORE", "off")
+os.environ.setdefault("DELIVERY_LOG", "off")
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("METRICS_LOG_INTERVAL", "0")
+
+from fake_bot_api import FakeBotAPI
+from target_cache import LinkTable, TargetRows, compact_filters
+
+SOURCES = [-1002059757502, -1001513128130, -1001904588149, -1003795422286]
+SITES = ["supertotobet", "otobet", "bets10", "mobilbahis", "jojobet", "matbet"]
+CHATTER = [
+    "Günaydın arkadaşlar, bugün çok güzel fırsatlar var!",
+    "Kazananları tebrik ederiz 🎉🎉🎉",
+    "📢 DUYURU 📢\n\nBakım çalışması nedeniyle site 1 saat kapalı olacaktır.",
+    "KOD GELİYOR\nhazır olun",
+    "test\nTEST123\nhttps://test.com",
+]
+
+class SimMessage:
+    __slots__ = ("id", "message", "date")
+
+    def __init__(self, id, message):
+        self.id = id
+        self.message = message
+        self.date = datetime.now(timezone.utc)
+
+class SimEvent:
+    __slots__ = ("chat_id", "message")
+
+    def __init__(self, chat_id, message):
+        self.chat_id = chat_id
+        self.message = message
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MESAJ AKIŞLARI: [(gecikme_sn, kaynak_kanal, metin), ...]
+# ══════════════════════════════════════════════════════════════════════════════
+
+def code_message(rng, run_id, i):
+    site = rng.choice(SITES)
+    code = f"R{run_id}{site.upper()}{i}"
+    return f"{site}\n{code}\nhttps://{site}{rng.randint(1, 99)}.com/promo"
+
+def storm_stream(rng, count, run_id):
+    stream = []
+    for i in range(count):
+        # Her 4 mesajda bir fırtına: kaynaklar birkaç yüz ms içinde
+        delay = rng.uniform(1.0, 2.0) if i % len(SOURCES) == 0 else rng.uniform(0.0, 0.2)
+        stream.append((delay, SOURCES[i % len(SOURCES)], code_message(rng, run_id, i)))
+    return stream
+
+def duplicates_stream(rng, count, run_id):
+    stream = []
+    i = 0
+    while len(stream) < count:
+        text = code_message(rng, run_id, i)
+        for source in rng.sample(SOURCES, rng.randint(2, len(SOURCES))):
+            stream.append((rng.uniform(0.0, 0.1), source, text))
+        i += 1
+    return stream[:count]
+
+def malformed_stream(rng, count, run_id):
+    stream = []
+    for i in range(count):
+        if rng.random() < 0.1:
+            text = code_message(rng, run_id, i)
+        else:
+            text = rng.choice(CHATTER)
+        stream.append((rng.uniform(0.0, 0.05), rng.choice(SOURCES), text))
+    return stream
+
+def mixed_stream(rng, count, run_id):
+    part = count // 3
+    stream = storm_stream(rng, part, run_id) + duplicates_stream(rng, part, run_id) + malformed_stream(rng, count - 2 * part, run_id)
+    rng.shuffle(stream)
+    return stream
+
+def replay_stream(path):
+    stream = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                stream.append((float(row.get("delay", 0)), int(row["channel_id"]), row["text"]))
+    return stream
+
+STREAMS = {
+    "storm": storm_stream,
+    "duplicates": duplicates_stream,
+    "malformed": malformed_stream,
+    "mixed": mixed_stream,
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BELLEKTEKİ HEDEF CONFIG'İ
+# ══════════════════════════════════════════════════════════════════════════════
+
+def build_config(rng, targets):
+    """install_cache için (rows, links, filters): %20 filtreli kanal, %30 özel link"""
+    rows = TargetRows()
+    links = LinkTable()
+    filter_rows = []
+    for i in range(targets):
+        user_id = i % 50 + 1
+        channel_id = -1009000000000 - i
+        filtered = rng.random() < 0.2
+        rows.add(i + 1, user_id, channel_id, "filtered" if filtered else "all")
+        if filtered:
+            filter_rows.extend((channel_id, site) for site in rng.sample(SITES, 2))
+        if rng.random() < 0.3:
+            site = rng.choice(SITES)
+            links.add(user_id, channel_id, site, f"https://t.me/u{user_id}_{site}")
+    return rows, links, compact_filters(filter_rows)
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ÇALIŞTIRMA
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def run_once(bot, args, targets, run_id):
+    rng = random.Random(run_id)
+
+    server = FakeBotAPI(
+        latency=args.latency,
+        global_rate=30 if args.realistic_limits else None,
+        chat_rate=20 / 60 if args.realistic_limits else None,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+    )
+    await server.start()
+    bot.TELEGRAM_BOT_API = f"{server.base_url}/botTEST"
+
+    rows, links, filters = build_config(rng, targets)
+    await bot.install_cache(rows, links, filters)
+
+    if args.replay:
+        stream = replay_stream(args.replay)
+    else:
+        stream = STREAMS[args.stream](rng, args.messages, run_id)
+
+    injected_at = {}  # kod -> enjeksiyon zamanı
+    tasks = []
+    started = time.monotonic()
+    for i, (delay, source, text) in enumerate(stream):
+        if delay and args.speed:
+            await asyncio.sleep(delay / args.speed)
+        lines = [l.strip() for l in text.splitlines() if l.strip()]
+        for line in lines[:3]:
+            injected_at.setdefault(line, time.monotonic())
+        event = SimEvent(source, SimMessage(run_id * 1_000_000 + i, text))
+        tasks.append(asyncio.create_task(bot.process_message(event, path="event")))
+
+    await asyncio.gather(*tasks)
+    await bot.sender_pool.join()
+    await bot.coalescer.join()
+    elapsed = time.monotonic() - started
+
+    # Teslimat gecikmesi: enjeksiyondan sahte sunucuya varışa
+    latencies = []
+    last_by_code = {}
+    for received_at, _, text in server.delivery_times:
+        code = text.split("`")[1] if text and "`" in text else None
+        if code in injected_at:
+            latency = received_at - injected_at[code]
+            latencies.append(latency)
+            last_by_code[code] = max(last_by_code.get(code, 0), latency)
+
+    deliveries = len(server.delivery_times)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{targets:>6} hedef | {len(stream) / elapsed:>8.1f} mesaj/sn | {deliveries / elapsed:>9.1f} teslimat/sn | "
+        f"p50 {percentile(latencies, 0.5) * 1000:>7.0f} ms | p99 {percentile(latencies, 0.99) * 1000:>7.0f} ms | "
+        f"son teslimat p99 {percentile(list(last_by_code.values()), 0.99) * 1000:>7.0f} ms | "
+        f"429: {server.rate_limited} | hata: {server.errors} | RSS {rss_mb:.0f} MB"
+    )
+    await server.stop()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bot yük testi (sahte Bot API)")
+    parser.add_argument("--targets", default="10,100,1000,10000")
+    parser.add_argument("--stream", choices=sorted(STREAMS), default="storm")
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="Sahte Bot API cevap gecikmesi (sn)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="5xx hata oranı")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Rastgele 429 oranı")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 cevabındaki retry_after (sn)")
+    parser.add_argument("--realistic-limits", action="store_true", help="Bot API limitlerini (30/sn, kanal 20/dk) uygula")
+    parser.add_argument("--speed", type=float, default=1.0, help="Akış gecikmelerini hızlandır (0 = beklemeden)")
+    parser.add_argument("--replay", help="JSONL kayıt dosyası")
+    parser.add_argument("--coalesce-ms", type=int, default=0, help="Hedef bazlı birleştirme penceresi (0 = kapalı)")
+    args = parser.parse_args()
+
+    import bot
+    from delivery import TokenBucket
+
+    if not args.realistic_limits:
+        # Botun kendi rate limit'i de kaldırılır: sadece işleme kapasitesi ölçülür
+        bot.delivery_scheduler.global_bucket = TokenBucket(1e9, 1e9)
+        bot.delivery_scheduler.chat_rate = 1e9
+        bot.delivery_scheduler.chat_burst = 1e9
+    bot.delivery_scheduler.start()
+    bot.sender_pool.start()
+    bot.COALESCE_WINDOW_MS = args.coalesce_ms
+    coalescer_task = asyncio.create_task(bot.coalescer.run())
+
+    for run_id, targets in enumerate(int(t) for t in args.targets.split(",")):
+        await run_once(bot, args, targets, run_id + 1)
+
+    coalescer_task.cancel()
+    await bot.sender_pool.stop()
+    await bot.delivery_scheduler.stop()
+    await bot.transport.aclose()
+    bot.log_listener.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
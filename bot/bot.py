@@ -4,58 +4,87 @@ Telegram Kod Botu - ANLIK DİNLEME VERSİYONU
 """
 
 import asyncio
-import re
+import json
 import time
 import os
+import signal
 import sys
 import logging
 import httpx
+from psycopg2.extras import execute_values
+from audit import DeliveryAudit
+from code_parser import REJECT_FORMAT, parse_message, quick_reject
+from coalesce import Coalescer, merge_texts
+from db import Database
+from dedupe import DatabaseJournal, FileJournal, SentCodeStore
+from entity_cache import EntityCache
+from health import PERMANENT, TargetHealth
+from intake import ArrivalTracker
+from leader import LeaderElection
+from log_pipeline import SuccessAggregator, setup_logging
+from delivery import DeliveryScheduler
+from matcher import AhoCorasick
+from metrics import MetricsRegistry, monitor_loop_lag
+from outbox import Outbox
+from payload import MessagePayload, build_payloads, render_message
+from pipeline import CodeQueue, SenderPool
+from routing import EMPTY_ROUTING_TABLE, RoutingTable
+from sharding import HashRing, ShardClient, ShardUnreachable, serve_shard, socket_path
+from target_cache import LinkTable, TargetRows, compact_filters
+from transport import BotTransport
+from update_engine import UpdateEngine
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
 from telethon.errors import ChannelPrivateError, ChannelInvalidError
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.functions.updates import GetChannelDifferenceRequest
+from telethon.tl.types import ChannelMessagesFilterEmpty, InputPeerChannel, Message
+from telethon.tl.types.updates import ChannelDifferenceEmpty, ChannelDifferenceTooLong
+from telethon.utils import resolve_id
 
 # ══════════════════════════════════════════════════════════════════════════════
 # LOGGING AYARLARI (Heroku için)
 # ══════════════════════════════════════════════════════════════════════════════
 
-# Heroku için stdout'a loglama
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
+# Heroku stdout'u yakalar; yazım arka plan thread'inde yapılır, event loop beklemez
+# LOG_FORMAT=json: her satır code/source/target alanlı JSON kayıt
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_SUCCESS_SAMPLE = int(os.getenv('LOG_SUCCESS_SAMPLE', '0'))  # Her N. başarılı gönderimi tek tek logla (0 = sadece özet)
+LOG_SUCCESS_INTERVAL = 5  # Başarılı gönderim özet aralığı (saniye)
 
-# Flush logları hemen yazdırmak için
-sys.stdout.reconfigure(line_buffering=True)
+log_listener, log_handler = setup_logging(logging.INFO, LOG_FORMAT)
+logger = logging.getLogger(__name__)
 
-def log_info(message):
-    """Bilgi logu"""
-    logger.info(message)
-    sys.stdout.flush()
+def log_info(message, *args, **fields):
+    """Bilgi logu (args yazıcıda biçimlendirilir, fields JSON kayda eklenir)"""
+    logger.info(message, *args, extra={"fields": fields})
 
-def log_success(message):
+def log_success(message, *args, **fields):
     """Başarı logu"""
-    logger.info(f"✅ {message}")
-    sys.stdout.flush()
+    logger.info("✅ " + message, *args, extra={"fields": fields})
 
-def log_warning(message):
+def log_warning(message, *args, **fields):
     """Uyarı logu"""
-    logger.warning(f"⚠️ {message}")
-    sys.stdout.flush()
+    logger.warning("⚠️ " + message, *args, extra={"fields": fields})
 
-def log_error(message):
+def log_error(message, *args, **fields):
     """Hata logu"""
-    logger.error(f"❌ {message}")
-    sys.stdout.flush()
+    logger.error("❌ " + message, *args, extra={"fields": fields})
+
+def log_success_summary(counts: dict):
+    total = sum(counts.values())
+    detail = ", ".join(f"{code}: {n}" for code, n in counts.items())
+    log_success("GÖNDERİM BAŞARILI (son %d sn) | Toplam: %d | %s", LOG_SUCCESS_INTERVAL, total, detail, deliveries=total)
+
+# Hedef başına "GÖNDERİM BAŞARILI" satırları yerine kod bazlı periyodik özet
+success_log = SuccessAggregator(log_success_summary, LOG_SUCCESS_INTERVAL, LOG_SUCCESS_SAMPLE)
 
 # ══════════════════════════════════════════════════════════════════════════════
-# HARDCODED CONFIG
+# VARSAYILAN CONFIG
 # ══════════════════════════════════════════════════════════════════════════════
 
+# DB'deki source_channels / bot_words tabloları boşsa veya okunamazsa bu değerler
+# kullanılır; çalışma anında DB'den gelen listelerle değiştirilir (load_sources)
 LISTENING_CHANNELS = [
     -1002059757502,
     -1001513128130,
@@ -86,12 +115,21 @@ BANNED_WORDS = {
     "BamcooSiteler"
 }
 
+DEFAULT_CHANNEL_NAMES = dict(CHANNEL_NAMES)
+DEFAULT_KEYWORDS = frozenset(KEYWORDS)
+DEFAULT_BANNED_WORDS = frozenset(BANNED_WORDS)
+
 # ══════════════════════════════════════════════════════════════════════════════
 # ANLIK DİNLEME AYARLARI
 # ══════════════════════════════════════════════════════════════════════════════
-POLLING_INTERVAL = 2
+POLLING_INTERVAL = 2        # Aktif kanal için difference kontrol aralığı
+IDLE_POLLING_INTERVAL = 30  # Sessiz kanal için en uzun kontrol aralığı
 CATCH_UP_INTERVAL = 30
 
+# Çözümlenmiş kaynak kanallar restart'ta buradan yüklenir (boş = kapalı)
+ENTITY_CACHE_FILE = os.getenv('ENTITY_CACHE_FILE', 'entity_cache.json')
+ENTITY_CACHE_INTERVAL = 60  # last_seen bilgisinin dosyaya yazılma aralığı (saniye)
+
 last_seen_message_ids = {}
 channel_pts = {}
 
@@ -103,212 +141,532 @@ API_ID = int(os.getenv('API_ID', '0'))
 API_HASH = os.getenv('API_HASH', '')
 DATABASE_URL = os.getenv('DATABASE_URL', '')
 SESSION_STRING = os.getenv('SESSION_STRING', '')
+SESSION_FILE = os.getenv('SESSION_FILE', 'bot_session')  # SESSION_STRING yoksa kullanılan Telethon session dosyası
+# Aynı kaynak kanalları dinleyen ek kullanıcı oturumları (virgülle ayrılmış). İlk gelen kopya işlenir
+EXTRA_SESSION_STRINGS = [s.strip() for s in os.getenv('EXTRA_SESSION_STRINGS', '').split(',') if s.strip()]
 BOT_TOKEN = os.getenv('BOT_TOKEN', '')
 
-TELEGRAM_BOT_API = f"https://api.telegram.org/bot{BOT_TOKEN}"
+BOT_API_BASE = os.getenv('BOT_API_BASE', 'https://api.telegram.org')
+
+# Sharding: boş = tek process, listener = dinle + worker'lara dağıt, worker = sadece gönder
+SHARD_ROLE = os.getenv('SHARD_ROLE', '')
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0'))
+SHARD_INDEX = int(os.getenv('SHARD_INDEX', '0'))
+SHARD_SOCKET_DIR = os.getenv('SHARD_SOCKET_DIR', '/tmp')
+# Worker başına bot token (virgülle ayrılmış, sırayla dağıtılır); boşsa hepsi BOT_TOKEN kullanır
+SENDER_BOT_TOKENS = [t.strip() for t in os.getenv('SENDER_BOT_TOKENS', '').split(',') if t.strip()]
+
+if SHARD_ROLE == "worker" and SENDER_BOT_TOKENS:
+    BOT_TOKEN = SENDER_BOT_TOKENS[SHARD_INDEX % len(SENDER_BOT_TOKENS)]
+
+TELEGRAM_BOT_API = f"{BOT_API_BASE}/bot{BOT_TOKEN}"
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TESLİMAT (RATE LIMIT) AYARLARI
+# ══════════════════════════════════════════════════════════════════════════════
+
+GLOBAL_SEND_RATE = 30       # Bot API global limiti: saniyede ~30 mesaj
+CHAT_SEND_RATE = 20 / 60    # Kanal başına dakikada ~20 mesaj
+CHAT_SEND_BURST = 3         # Kanal başına anlık patlama kapasitesi
+SEND_CONCURRENCY = 50       # Aynı anda açık HTTP isteği (bağlantı havuzunun üst sınırı ile aynı)
+DELIVERY_DEADLINE = 10.0    # Kuyruk sıralaması için teslimat hedef süresi (saniye)
+DELIVERY_MAX_ATTEMPTS = 5
+
+# Alım -> gönderim hattı: kodlar sınırlı kuyruğa girer, en yeni kod önce gönderilir
+DELIVERY_WORKERS = int(os.getenv('DELIVERY_WORKERS', '4'))      # Aynı anda fan-out yapılan kod
+CODE_QUEUE_SIZE = int(os.getenv('CODE_QUEUE_SIZE', '100'))      # Gönderim bekleyen en fazla kod
+CODE_MAX_AGE = float(os.getenv('CODE_MAX_AGE', '60'))           # Bu süreden uzun bekleyen kod atılır (saniye)
+SHED_POLICY = os.getenv('SHED_POLICY', 'oldest')                # Kuyruk doluysa: oldest / newest atılır
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', '15'))  # Kapanışta kuyruğun boşalması için beklenen süre (Heroku SIGKILL'e 30 sn)
+
+# Hedef sağlığı: kalıcı hata (bot atıldı, kanal yok) veya art arda geçici hatada hedef karantinaya alınır
+HEALTH_FAILURE_THRESHOLD = 5    # Karantina için art arda geçici hata sayısı
+HEALTH_PROBE_INTERVAL = 60      # Karantinadaki hedefe ilk deneme aralığı (her başarısızlıkta 2 katı)
+HEALTH_MAX_PROBE_INTERVAL = 3600
+HEALTH_FLUSH_INTERVAL = 5       # channels.is_joined / join_error toplu yazım aralığı (saniye)
+
+# Patlama birleştirme: pencere içinde aynı hedefe giden kodlar tek mesajda (0 = kapalı).
+# Kullanıcı bazında users.coalesce_window_ms ile ayarlanır, boşsa bu varsayılan kullanılır
+COALESCE_WINDOW_MS = int(os.getenv('COALESCE_WINDOW_MS', '0'))
+COALESCE_MAX_CODES = 10         # Birleşik mesajdaki en fazla kod
+
+# Bot API bağlantıları
+HTTP2_ENABLED = os.getenv('HTTP2', '1') != '0'  # h2 paketi yoksa HTTP/1.1'e düşer
+MIN_CONNECTIONS = 10        # Havuzun en küçük boyutu
+TARGETS_PER_CONNECTION = 20 # Havuz boyutu: hedef sayısı / bu değer (MIN..SEND_CONCURRENCY arası)
+WARM_INTERVAL = 25          # Bağlantıları sıcak tutan getMe aralığı (saniye)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SICAK YEDEK (LİDER SEÇİMİ)
+# ══════════════════════════════════════════════════════════════════════════════
+
+# 1 = aynı bottan iki process çalışır; Postgres advisory lock'u tutan lider mesaj alır ve
+# gönderir, diğeri ısınmış bekler ve lider düşünce devralır (DEDUPE_STORE=db ile kullanın)
+LEADER_ELECTION = os.getenv('LEADER_ELECTION', '0') != '0'
+LEADER_NAME = os.getenv('DYNO') or f"{os.uname().nodename}:{os.getpid()}"
+LEADER_POLL_INTERVAL = 0.25     # Yedeğin lock deneme aralığı = en kötü devralma gecikmesi (saniye)
+LEADER_HEARTBEAT_INTERVAL = 1.0 # Liderin durum yazım aralığı
+LEADER_LEASE = 5.0              # Bu süre heartbeat yazamayan lider mesaj almayı bırakır
+LEADER_STATE_MAX_AGE = 300      # Bundan eski lider durumu devralınmaz (pts baştan alınır)
+LEADER_REPLAY_DELAY = DELIVERY_DEADLINE + 5  # Devralınca outbox replay'i önceki liderin gönderimleri bitince
+
+# ══════════════════════════════════════════════════════════════════════════════
+# METRİKLER
+# ══════════════════════════════════════════════════════════════════════════════
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))  # 0 = HTTP endpoint kapalı
+METRICS_LOG_INTERVAL = int(os.getenv('METRICS_LOG_INTERVAL', '300'))  # Periyodik özet (0 = kapalı)
+
+metrics = MetricsRegistry()
+metric_source_to_intake = metrics.histogram(
+    "telegramkod_source_to_intake_seconds", "Kaynak mesaj zamanından process_message girişine")
+metric_intake_to_first = metrics.histogram(
+    "telegramkod_intake_to_first_delivery_seconds", "process_message girişinden ilk başarılı gönderime")
+metric_intake_to_last = metrics.histogram(
+    "telegramkod_intake_to_last_delivery_seconds", "process_message girişinden son başarılı gönderime")
+metric_parse = metrics.histogram(
+    "telegramkod_parse_seconds", "Ayrıştırma + yasak kelime + tekrar kontrolü süresi")
+metric_route = metrics.histogram(
+    "telegramkod_route_seconds", "Filtre ve link eşleştirme süresi")
+metric_messages = metrics.counter(
+    "telegramkod_messages_total", "İşlenen kaynak mesajlar", ("path",))
+metric_codes = metrics.counter(
+    "telegramkod_codes_total", "Gönderime alınan kodlar", ("path",))
+metric_deliveries = metrics.counter(
+    "telegramkod_deliveries_total", "Hedef kanal gönderimleri", ("result",))
+metric_delivery_failures = metrics.counter(
+    "telegramkod_delivery_failures_total", "Hedef kanal bazlı başarısız gönderimler", ("chat_id",))
+metric_loop_lag = metrics.histogram(
+    "telegramkod_event_loop_lag_seconds", "Event loop gecikmesi")
+metric_loop_lag_last = metrics.gauge(
+    "telegramkod_event_loop_lag_last_seconds", "Son ölçülen event loop gecikmesi")
+metric_rejects = metrics.counter(
+    "telegramkod_rejected_messages_total", "Formata uymayan kaynak mesajlar (kanal, neden)", ("source", "reason"))
+metric_pool_wait = metrics.histogram(
+    "telegramkod_http_pool_wait_seconds", "Bot API isteğinin bağlantı havuzunda bekleme süresi")
+metric_connections = metrics.counter(
+    "telegramkod_http_connections_opened_total", "Bot API'ye açılan yeni TCP bağlantıları")
+metric_pool_size = metrics.gauge(
+    "telegramkod_http_pool_size", "Bot API bağlantı havuzu boyutu")
+metric_code_queue = metrics.gauge(
+    "telegramkod_code_queue_depth", "Gönderim bekleyen kod sayısı")
+metric_shed = metrics.counter(
+    "telegramkod_shed_codes_total", "Aşırı yükte gönderilmeden atılan kodlar", ("reason",))
+metric_quarantined = metrics.gauge(
+    "telegramkod_quarantined_targets", "Karantinadaki (gönderim yapılmayan) hedef kanallar")
+metric_session_arrivals = metrics.counter(
+    "telegramkod_session_arrivals_total", "Oturum bazlı kaynak mesaj varışları (first = ilk kopya)", ("session", "result"))
+metric_coalesce_saved = metrics.counter(
+    "telegramkod_coalesce_saved_requests_total", "Birleştirme sayesinde atılmayan sendMessage istekleri")
+metric_audit_dropped = metrics.counter(
+    "telegramkod_delivery_log_dropped_total", "Tampon dolu olduğu için yazılmayan teslimat logu kayıtları")
+metric_outbox_dropped = metrics.counter(
+    "telegramkod_outbox_dropped_total", "Tampon dolu olduğu için yazılmayan outbox kayıtları")
+metric_quarantine_skips = metrics.counter(
+    "telegramkod_quarantine_skips_total", "Karantina nedeniyle atlanan hedef gönderimleri")
+metric_leader = metrics.gauge(
+    "telegramkod_leader", "1 = bu process lider (mesaj alıyor), 0 = yedek")
+
+def metrics_summary() -> str:
+    paths = " ".join(f"{labels[0]}={int(v)}" for labels, v in metric_messages.values.items())
+    return (
+        f"Mesaj: {paths or '-'} | Kod: {int(sum(metric_codes.values.values()))} | "
+        f"Gönderim OK/HATA: {int(metric_deliveries.get('ok'))}/{int(metric_deliveries.get('error'))} | "
+        f"İlk teslimat p50/p99: {metric_intake_to_first.quantile(0.5) * 1000:.0f}/{metric_intake_to_first.quantile(0.99) * 1000:.0f} ms | "
+        f"Son teslimat p99: {metric_intake_to_last.quantile(0.99) * 1000:.0f} ms | "
+        f"Loop lag p99: {metric_loop_lag.quantile(0.99) * 1000:.0f} ms | "
+        f"Havuz bekleme p99: {metric_pool_wait.quantile(0.99) * 1000:.0f} ms | Yeni bağlantı: {int(metric_connections.get())} | "
+        f"Kuyruk: {len(code_queue)} | Atılan kod: {int(sum(metric_shed.values.values()))} | "
+        f"Karantina: {target_health.quarantined} hedef ({int(metric_quarantine_skips.get())} atlama) | "
+        f"Atılan log: {log_handler.dropped} | Atılan outbox kaydı: {int(metric_outbox_dropped.get())} | "
+        f"Teslimat logu yazılan/atılan: {delivery_audit.written if delivery_audit else 0}/{int(metric_audit_dropped.get())}"
+    )
+
+def rejects_summary() -> str:
+    """Kanal bazlı elenen mesaj sayıları: "kanal: toplam (neden=sayı ...)" """
+    by_source = {}
+    for (source, reason), count in metric_rejects.values.items():
+        by_source.setdefault(source, {})[reason] = int(count)
+    parts = []
+    for source, reasons in sorted(by_source.items(), key=lambda item: -sum(item[1].values())):
+        detail = " ".join(f"{reason}={count}" for reason, count in sorted(reasons.items()))
+        parts.append(f"{source}: {sum(reasons.values())} ({detail})")
+    return " | ".join(parts) or "-"
+
+async def log_metrics_periodically():
+    while True:
+        await asyncio.sleep(METRICS_LOG_INTERVAL)
+        log_info(f"📈 METRİK | {metrics_summary()}")
+        log_info(f"🧹 ELENEN MESAJ | {rejects_summary()}")
+        if extra_clients:
+            log_info(f"🛰️ OTURUM VARIŞ | {arrivals.summary()}")
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MEMORY CACHE
 # ══════════════════════════════════════════════════════════════════════════════
 
-sent_codes = {}
 CODE_TTL = 3600
+SENT_CODES_MAX = 50000  # Bellekteki en fazla kod (sert sınır)
+
+# Restart sonrası tekrar gönderimi önlemek için kalıcı kayıt:
+# "db" = Postgres sent_codes tablosu (Heroku), "file" = yerel dosya, "memory" = kalıcılık yok
+DEDUPE_STORE = os.getenv('DEDUPE_STORE', 'db')
+DEDUPE_FILE = os.getenv('DEDUPE_FILE', 'sent_codes.log')
+
+# Hedef bazlı teslimat durumu: "db" = Postgres delivery_outbox (restart sonrası yarım kalan
+# gönderimler tamamlanır), "off" = kapalı
+OUTBOX_STORE = os.getenv('OUTBOX_STORE', 'db')
+OUTBOX_FLUSH_INTERVAL = 0.2  # Toplu yazım aralığı (saniye)
+OUTBOX_MAX_BUFFER = 100000   # DB yazılamazken bellekte tutulan en fazla outbox kaydı
+
+# Teslimat logu: "db" = her hedef gönderimi delivery_log tablosuna (dashboard), "off" = kapalı
+DELIVERY_LOG = os.getenv('DELIVERY_LOG', 'db')
+DELIVERY_LOG_RETENTION_DAYS = int(os.getenv('DELIVERY_LOG_RETENTION_DAYS', '7'))
 
 def is_code_sent(code: str) -> bool:
-    if code in sent_codes:
-        if time.time() - sent_codes[code] < CODE_TTL:
-            return True
-        del sent_codes[code]
-    return False
+    return sent_codes.contains(code)
 
 def mark_code_sent(code: str):
-    sent_codes[code] = time.time()
+    # Alımda sadece bellekte işaretlenir; kalıcı kayda gönderici kodu kuyruktan alınca
+    # yazılır (persist_code_sent): kuyrukta kalıp gönderilmeyen kod restart sonrası engellenmez
+    sent_codes.add(code, persist=False)
 
-    if len(sent_codes) > 5000:
-        now = time.time()
-        expired = [k for k, v in sent_codes.items() if now - v > CODE_TTL]
-        for k in expired:
-            del sent_codes[k]
+def persist_code_sent(code: str):
+    sent_codes.persist(code)
+
+# Metin küçük harfe çevrilip aranır, desenler de küçük harf olmalı
+banned_words_matcher = AhoCorasick({word.lower() for word in BANNED_WORDS})
 
 def has_banned_word(text: str):
-    text_lower = text.lower()
-    for word in BANNED_WORDS:
-        if word in text_lower:
-            return word
-    return None
+    return banned_words_matcher.find_first(text.lower())
 
 # ══════════════════════════════════════════════════════════════════════════════
 # DATABASE
 # ══════════════════════════════════════════════════════════════════════════════
 
-import psycopg2
-
-# Cache yapısı: (user_id, channel_id) tuple bazlı
-user_channel_cache = []  # [(user_id, channel_id), ...]
-admin_links_cache = {}  # (user_id, channel_id) -> {link_code: link_url}
-user_channel_filter_mode = {}  # (user_id, channel_id) -> "all" veya "filtered"
-channel_filters = {}  # channel_id -> set of keywords (şimdilik channel bazlı)
+# Cache yapısı: dizi kolonlu tablolar (target_cache), on binlerce hedefte de az bellek
+user_channel_rows = TargetRows()  # user_channels satırları, uc.id sırasıyla
+admin_links_cache = LinkTable()  # (user_id, channel_id, link_code, link_url) satırları
+channel_filters = {}  # channel_id -> frozenset of keywords (aynı kümeler tek nesne, şimdilik channel bazlı)
+routing_table = EMPTY_ROUTING_TABLE  # Gönderim için hazır hedef tablosu (sadece bütün olarak değiştirilir)
 cache_last_update = 0
 cache_version = 0  # DB'deki cache version
 CACHE_TTL = 60  # Fallback: 60 saniye (version kontrolü başarısız olursa)
+CACHE_NOTIFY_CHANNEL = "cache_invalidate"  # Web paneli değişiklikte buraya NOTIFY gönderir
 
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL, connect_timeout=10)
+# Sorgular kalıcı bağlantılarla thread havuzunda çalışır, event loop bloklanmaz
+DB_MAX_CONNECTIONS = 2
+db = Database(DATABASE_URL, max_connections=DB_MAX_CONNECTIONS, connect_timeout=10)
 
-def load_target_channels():
-    global user_channel_cache, admin_links_cache, user_channel_filter_mode, channel_filters
+if DEDUPE_STORE == "db":
+    sent_codes = SentCodeStore(CODE_TTL, SENT_CODES_MAX, DatabaseJournal(db, CODE_TTL))
+elif DEDUPE_STORE == "file":
+    sent_codes = SentCodeStore(CODE_TTL, SENT_CODES_MAX, FileJournal(DEDUPE_FILE))
+else:
+    sent_codes = SentCodeStore(CODE_TTL, SENT_CODES_MAX)
+
+outbox = Outbox(
+    db, flush_interval=OUTBOX_FLUSH_INTERVAL, max_buffer=OUTBOX_MAX_BUFFER, on_drop=metric_outbox_dropped.inc
+) if OUTBOX_STORE == "db" else None
+delivery_audit = DeliveryAudit(
+    db, retention_days=DELIVERY_LOG_RETENTION_DAYS, on_drop=metric_audit_dropped.inc
+) if DELIVERY_LOG == "db" else None
+
+# Tam yenileme ve delta uygulaması aynı anda çalışmasın
+cache_lock = asyncio.Lock()
+
+# Aktif hedefler: kullanıcı banlı/pasif/bot kapalı değil ve kanal durdurulmamış
+TARGET_QUERY = """
+    SELECT uc.id, uc.user_id, uc.channel_id, uc.filter_mode
+    FROM user_channels uc
+    INNER JOIN users u ON uc.user_id = u.id
+    WHERE uc.paused = false
+      AND u.is_banned = false
+      AND u.is_active = true
+      AND u.bot_enabled = true
+"""
 
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Hedef user-channel kombinasyonlarını ve filter_mode bilgisini çek
-        cursor.execute("""
-            SELECT uc.user_id, uc.channel_id, uc.filter_mode
-            FROM user_channels uc
-            INNER JOIN users u ON uc.user_id = u.id
-            WHERE uc.paused = false
-              AND u.is_banned = false
-              AND u.is_active = true
-              AND u.bot_enabled = true
-        """)
-
-        results = cursor.fetchall()
-
-        # (user_id, channel_id) tuple listesi
-        user_channel_cache = [(row[0], row[1]) for row in results]
-
-        # (user_id, channel_id) -> filter_mode
-        user_channel_filter_mode = {(row[0], row[1]): (row[2] or "all") for row in results}
-
-        log_info(f"📊 Hedef user-channel sayısı: {len(user_channel_cache)}")
-        for user_id, ch_id in user_channel_cache:
-            filter_mode = user_channel_filter_mode.get((user_id, ch_id), "all")
-            log_info(f"   - User: {user_id} | Kanal: {ch_id} | Filter: {filter_mode}")
-
-        # Admin linkleri çek
-        cursor.execute("""
-            SELECT user_id, channel_id, link_code, link_url
-            FROM admin_links
-        """)
-
-        admin_links_cache = {}
-        for row in cursor.fetchall():
-            user_id, channel_id, link_code, link_url = row
-            key = (user_id, channel_id)
-            if key not in admin_links_cache:
-                admin_links_cache[key] = {}
-            admin_links_cache[key][link_code.lower()] = link_url
-
-        log_info(f"🔗 Admin link sayısı: {len(admin_links_cache)}")
-
-        # Kanal filtrelerini çek
-        cursor.execute("""
-            SELECT channel_id, keyword
-            FROM channel_filters
-        """)
-
-        channel_filters = {}
-        for row in cursor.fetchall():
-            channel_id, keyword = row
-            if channel_id not in channel_filters:
-                channel_filters[channel_id] = set()
-            channel_filters[channel_id].add(keyword.lower())
-
-        log_info(f"🔍 Kanal filtresi sayısı: {len(channel_filters)}")
-
-        cursor.close()
-        conn.close()
-        return True
+# Bildirimdeki tablo -> yeniden okunacak cache tabloları
+DELTA_TABLES = {
+    "users": ("users", "user_channels", "admin_links"),
+    "channels": ("user_channels", "channel_filters"),
+    "user_channels": ("user_channels",),
+    "admin_links": ("admin_links",),
+    "channel_filters": ("channel_filters",),
+}
 
+# Bu tablolardaki değişiklikler hedef cache'ini değil dinlenen kanalları / kelime listelerini etkiler
+SOURCE_TABLES = {"source_channels", "bot_words"}
+
+def key_conditions(user_id, channel_id, user_column="user_id", channel_column="channel_id"):
+    """Verilen anahtarlar için WHERE koşulları ve parametreleri"""
+    conditions = []
+    params = []
+    if user_id is not None:
+        conditions.append(f"{user_column} = %s")
+        params.append(user_id)
+    if channel_id is not None:
+        conditions.append(f"{channel_column} = %s")
+        params.append(channel_id)
+    return conditions, params
+
+def fetch_user_channels(cursor, user_id=None, channel_id=None):
+    conditions, params = key_conditions(user_id, channel_id, "uc.user_id", "uc.channel_id")
+    query = TARGET_QUERY + "".join(f" AND {c}" for c in conditions) + " ORDER BY uc.id"
+    cursor.execute(query, params)
+    # İmleç satır satır okunur: fetchall listesi ve ara dict oluşmaz
+    return TargetRows.from_rows(cursor)
+
+def fetch_admin_links(cursor, user_id=None, channel_id=None):
+    conditions, params = key_conditions(user_id, channel_id)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    # Anahtar sırası: aynı hedefin linkleri ardışık gelir (tek anahtar tuple'ı paylaşılır)
+    cursor.execute(
+        "SELECT user_id, channel_id, link_code, link_url FROM admin_links" + where
+        + " ORDER BY user_id, channel_id, lower(link_code), id",
+        params
+    )
+    return LinkTable.from_rows(cursor)
+
+def fetch_channel_filters(cursor, channel_id=None, shared=None):
+    conditions, params = key_conditions(None, channel_id)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor.execute("SELECT channel_id, keyword FROM channel_filters" + where, params)
+    return compact_filters(cursor, shared)
+
+def fetch_sources(cursor):
+    """Kaynak kanallar ve kelime listeleri: (kanallar, yasak, anahtar)
+
+    Kanallar: tablo yoksa None (varsayılanlar), tablo varsa aktif kanallar (hepsi pasifse boş).
+    Kelimeler: her tür ayrı; o türden satır yoksa None (o türün varsayılanları).
+    """
+    cursor.execute("SELECT to_regclass('source_channels'), to_regclass('bot_words')")
+    has_channels, has_words = cursor.fetchone()
+
+    channels = banned = keywords = None
+    if has_channels:
+        cursor.execute("SELECT channel_id, name FROM source_channels WHERE is_active = true ORDER BY created_at")
+        channels = {channel_id: name for channel_id, name in cursor.fetchall()}
+    if has_words:
+        cursor.execute("SELECT type, word FROM bot_words")
+        rows = cursor.fetchall()
+        banned = {word.lower() for kind, word in rows if kind == "banned"} or None
+        keywords = {word.lower() for kind, word in rows if kind == "keyword"} or None
+    return channels, banned, keywords
+
+def fetch_unhealthy_targets(cursor):
+    """Daha önce kalıcı hatayla işaretlenmiş hedefler: [(channel_id, join_error), ...]"""
+    cursor.execute("SELECT channel_id, join_error FROM channels WHERE is_joined = false AND join_error IS NOT NULL")
+    return cursor.fetchall()
+
+def write_target_health(cursor, changes):
+    """changes: [(channel_id, is_joined, join_error), ...] - dashboard bu kolonları gösterir"""
+    execute_values(
+        cursor,
+        """
+        UPDATE channels AS c SET is_joined = v.is_joined, join_error = v.join_error, last_updated = NOW()
+        FROM (VALUES %s) AS v(channel_id, is_joined, join_error)
+        WHERE c.channel_id = v.channel_id
+        """,
+        changes,
+        template="(%s::bigint, %s::boolean, %s::text)",
+    )
+
+def fetch_coalesce_windows(cursor):
+    """Birleştirme penceresi ayarlı kullanıcılar: {user_id: pencere_ms}"""
+    cursor.execute("SELECT id, coalesce_window_ms FROM users WHERE coalesce_window_ms IS NOT NULL")
+    return dict(cursor.fetchall())
+
+def fetch_target_snapshot(cursor):
+    """Hedef, link ve filtre tablolarının tamamını oku (DB thread'inde çalışır)"""
+    return fetch_user_channels(cursor), fetch_admin_links(cursor), fetch_channel_filters(cursor)
+
+def fetch_target_delta(cursor, tables, user_id, channel_id, shared_filters=None):
+    """Sadece değişen anahtarlara ait satırları oku (DB thread'inde çalışır)"""
+    delta = {}
+    if "users" in tables:
+        delta["coalesce_windows"] = fetch_coalesce_windows(cursor)
+    if "user_channels" in tables:
+        delta["user_channels"] = fetch_user_channels(cursor, user_id, channel_id)
+    if "admin_links" in tables:
+        delta["admin_links"] = fetch_admin_links(cursor, user_id, channel_id)
+    if "channel_filters" in tables:
+        delta["channel_filters"] = fetch_channel_filters(cursor, channel_id, shared_filters)
+    return delta
+
+def build_routing_table(rows: TargetRows, links: LinkTable, filters: dict) -> RoutingTable:
+    return RoutingTable.build(rows, filters, links.entries())
+
+def merge_target_delta(rows: TargetRows, links: LinkTable, delta: dict, user_id, channel_id):
+    """Değişen anahtarların satırlarını mevcut tabloların kopyasına uygula (DB thread'inde)"""
+    if "user_channels" in delta:
+        rows = rows.without(user_id, channel_id).merged(delta["user_channels"])
+    if "admin_links" in delta:
+        links = links.without(user_id, channel_id).extended(delta["admin_links"])
+    return rows, links
+
+async def install_cache(rows: TargetRows, links: LinkTable, filters: dict):
+    """Yeni cache yapılarını kur ve global referansları değiştir"""
+    global user_channel_rows, admin_links_cache, channel_filters
+    global routing_table
+
+    # Eski ham tablolar yeni yönlendirme tablosu kurulmadan bırakılır: bellekte eski
+    # yönlendirme tablosu (gönderimdeki kodlar için) + yeni tablolar kalır, iki tam kopya değil
+    user_channel_rows = rows
+    admin_links_cache = links
+    channel_filters = filters
+
+    # Tablo kurulumu CPU işi: DB thread'inde yapılır
+    loop = asyncio.get_running_loop()
+    table = await loop.run_in_executor(db.executor, build_routing_table, rows, links, filters)
+
+    # Yönlendirme tablosunu tek atamada değiştir:
+    # gönderimdeki kodlar eski tabloyu, yeni kodlar yeni tabloyu görür
+    routing_table = table
+
+    # Bağlantı havuzu hedef sayısına göre büyür/küçülür
+    if transport.resize(len(rows)):
+        metric_pool_size.set(transport.size)
+        log_info(f"🔌 Bot API bağlantı havuzu: {transport.size} ({len(rows)} hedef)")
+        asyncio.create_task(transport.warm(warm_url()))
+
+async def load_target_channels():
+    global coalesce_windows
+    try:
+        rows, links, filters = await db.run_async(fetch_target_snapshot)
+        coalesce_windows = await db.run_async(fetch_coalesce_windows)
+        await install_cache(rows, links, filters)
     except Exception as e:
         log_error(f"DB hatası: {e}")
         return False
 
-def get_link_for_user_channel(user_id: int, channel_id: int, code: str, original_link: str) -> str:
-    """Kullanıcı-kanal kombinasyonu için özel link getir"""
-    links = admin_links_cache.get((user_id, channel_id), {})
-    code_lower = code.lower()
-    link_lower = original_link.lower()
-
-    # Link kodlarını uzunluğa göre büyükten küçüğe sırala
-    # Bu sayede "supertotobet" önce kontrol edilir, "otobet" sonra
-    # Böylece "supertotobet" içinde "otobet" bulunması sorunu önlenir
-    sorted_links = sorted(links.items(), key=lambda x: len(x[0]), reverse=True)
-
-    for link_code, link_url in sorted_links:
-        if link_code in code_lower or link_code in link_lower:
-            return link_url
-    return original_link
-
-def should_send_to_user_channel(user_id: int, channel_id: int, code: str, link: str) -> tuple[bool, str]:
-    """Kullanıcı-kanal kombinasyonu için gönderilmeli mi kontrol et
-    Returns: (should_send, reason)
-    """
-    filter_mode = user_channel_filter_mode.get((user_id, channel_id), "all")
+    log_info(f"📊 Hedef user-channel: {len(user_channel_rows)} | 🔗 Admin link: {len(admin_links_cache)} | 🔍 Kanal filtresi: {len(channel_filters)}")
+    return True
+
+async def apply_cache_delta(tables, user_id, channel_id):
+    """Değişen satırları DB'den oku ve mevcut cache'in kopyasına uygula"""
+    global coalesce_windows
+    # Yeni filtre kümeleri mevcut cache'tekilerle aynıysa aynı nesne kullanılır
+    shared_filters = {words: words for words in channel_filters.values()}
+    delta = await db.run_async(fetch_target_delta, tables, user_id, channel_id, shared_filters)
+
+    if "coalesce_windows" in delta:
+        coalesce_windows = delta["coalesce_windows"]
+
+    loop = asyncio.get_running_loop()
+    rows, links = await loop.run_in_executor(
+        db.executor, merge_target_delta, user_channel_rows, admin_links_cache, delta, user_id, channel_id
+    )
+    filters = channel_filters
+
+    if "channel_filters" in delta:
+        if channel_id is None:
+            filters = delta["channel_filters"]
+        else:
+            filters = {k: v for k, v in filters.items() if k != channel_id}
+            filters.update(delta["channel_filters"])
 
-    # Eğer filter_mode "all" ise tüm kodlar gönderilir
-    if filter_mode == "all":
-        return True, "all"
+    await install_cache(rows, links, filters)
 
-    # Eğer filter_mode "filtered" ise sadece belirli kelimeler gönderilir
-    keywords = channel_filters.get(channel_id, set())
+async def handle_cache_notification(payload: str):
+    """Web panelinden gelen NOTIFY: sıradaki version ise delta uygula, değilse tam yenile"""
+    global cache_version, cache_last_update
+
+    try:
+        change = json.loads(payload)
+        version = int(change["version"])
+    except (ValueError, KeyError, TypeError):
+        log_warning(f"Geçersiz cache bildirimi: {payload}")
+        return
+
+    async with cache_lock:
+        if version <= cache_version:
+            return  # Tam yenileme bu değişikliği zaten içeriyor
+
+        started = time.monotonic()
+        table = change.get("table")
+        user_id = change.get("user_id")
+        channel_id = int(change["channel_id"]) if change.get("channel_id") else None
+        tables = DELTA_TABLES.get(table)
+        needs_key = user_id is None and channel_id is None
+
+        # Kaynak kanal / kelime listesi değişti: hedef cache'i etkilenmez
+        if version == cache_version + 1 and table in SOURCE_TABLES:
+            cache_version = version
+            schedule_sources_reload()
+            return
 
-    # Eğer hiç keyword tanımlanmamışsa gönderme
-    if not keywords:
-        return False, "no_keywords"
+        # Araya kaçırılmış bir version girdiyse veya kapsam belirsizse tam yenile
+        if version != cache_version + 1 or not tables or needs_key:
+            log_info(f"🔄 Cache yenileniyor (bildirim v{version})...")
+            schedule_sources_reload()
+            if await load_target_channels():
+                cache_version = version
+                cache_last_update = time.time()
+            return
 
-    # Kod veya linkte keyword var mı kontrol et
-    code_lower = code.lower()
-    link_lower = link.lower()
+        try:
+            await apply_cache_delta(tables, user_id, channel_id)
+        except Exception as e:
+            log_error(f"Cache delta hatası: {e}")
+            return  # Version ilerletilmez, polling tam yenileme ile düzeltir
 
-    # Keyword'leri uzunluğa göre büyükten küçüğe sırala
-    # Bu sayede "supertotobet" önce kontrol edilir, "otobet" sonra
-    sorted_keywords = sorted(keywords, key=len, reverse=True)
+        cache_version = version
+        log_info(f"🔄 Cache delta v{version} | Tablo: {table} | User: {user_id} | Kanal: {channel_id} | {(time.monotonic() - started) * 1000:.0f} ms")
 
-    for keyword in sorted_keywords:
-        if keyword in code_lower or keyword in link_lower:
-            return True, f"matched:{keyword}"
+async def cache_listener():
+    """LISTEN cache_invalidate - bağlantı koparsa yeniden bağlan"""
+    while True:
+        try:
+            log_info(f"👂 Cache bildirimleri dinleniyor ({CACHE_NOTIFY_CHANNEL})")
+            await db.listen(
+                CACHE_NOTIFY_CHANNEL,
+                lambda payload: asyncio.create_task(handle_cache_notification(payload)),
+            )
+        except Exception as e:
+            log_warning(f"Cache bildirim bağlantısı koptu: {e}")
+        await asyncio.sleep(5)
 
-    return False, "no_match"
+def fetch_cache_version(cursor):
+    cursor.execute("SELECT version FROM cache_version WHERE id = 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
 
-def check_cache_version() -> bool:
+async def check_cache_version() -> bool:
     """DB'deki cache_version değişmiş mi kontrol et"""
     global cache_version
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT version FROM cache_version WHERE id = 1")
-        row = cursor.fetchone()
-        cursor.close()
-        conn.close()
-
-        if row:
-            db_version = row[0]
-            if db_version != cache_version:
-                cache_version = db_version
-                return True  # Değişmiş, yenileme gerekli
+        db_version = await db.run_async(fetch_cache_version)
+
+        if db_version is not None and db_version != cache_version:
+            cache_version = db_version
+            return True  # Değişmiş, yenileme gerekli
         return False
     except Exception as e:
         log_warning(f"Cache version kontrol hatası: {e}")
         return False
 
-def maybe_refresh_cache():
+async def maybe_refresh_cache():
+    """Fallback: NOTIFY kaçırılırsa version polling ve TTL ile tam yenileme"""
     global cache_last_update
-    now = time.time()
 
-    # Önce cache_version tablosunu kontrol et (anlık algılama)
-    if check_cache_version():
-        cache_last_update = now
-        log_info("🔄 Cache yenileniyor (version değişti)...")
-        load_target_channels()
-        return
+    async with cache_lock:
+        now = time.time()
 
-    # Fallback: Zaman bazlı kontrol (version kontrolü başarısız olursa)
-    if now - cache_last_update > CACHE_TTL:
-        cache_last_update = now
-        log_info("🔄 Cache yenileniyor (TTL)...")
-        load_target_channels()
+        # Önce cache_version tablosunu kontrol et
+        if await check_cache_version():
+            cache_last_update = now
+            log_info("🔄 Cache yenileniyor (version değişti)...")
+            schedule_sources_reload()
+            await load_target_channels()
+            return
+
+        # Fallback: Zaman bazlı kontrol (version kontrolü başarısız olursa)
+        if now - cache_last_update > CACHE_TTL:
+            cache_last_update = now
+            log_info("🔄 Cache yenileniyor (TTL)...")
+            schedule_sources_reload()
+            await load_target_channels()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # TELEGRAM CLIENT
@@ -317,12 +675,28 @@ def maybe_refresh_cache():
 if SESSION_STRING:
     client = TelegramClient(StringSession(SESSION_STRING), API_ID, API_HASH)
 else:
-    client = TelegramClient('bot_session', API_ID, API_HASH)
-
-http_client = httpx.AsyncClient(
-    timeout=httpx.Timeout(5.0, connect=3.0),
-    limits=httpx.Limits(max_keepalive_connections=20, max_connections=50)
+    client = TelegramClient(SESSION_FILE, API_ID, API_HASH)
+
+# Ek oturumlar sadece dinler (entity çözümleme, difference ve catch_up ana client'ta)
+extra_clients = {
+    f"s{i}": TelegramClient(StringSession(session), API_ID, API_HASH)
+    for i, session in enumerate(EXTRA_SESSION_STRINGS, start=1)
+} if SHARD_ROLE != "worker" else {}
+
+# Tüm oturumların ortak tekrar kontrolü: (channel_id, message_id) ilk kopya kazanır
+arrivals = ArrivalTracker()
+
+transport = BotTransport(
+    http2=HTTP2_ENABLED,
+    timeout=5.0,
+    connect_timeout=3.0,
+    min_connections=MIN_CONNECTIONS,
+    max_connections=SEND_CONCURRENCY,
+    targets_per_connection=TARGETS_PER_CONNECTION,
+    on_pool_wait=metric_pool_wait.observe,
+    on_connect=metric_connections.inc,
 )
+metric_pool_size.set(transport.size)
 
 # ══════════════════════════════════════════════════════════════════════════════
 # KANAL ERİŞİM KONTROLÜ VE ENTITY CACHE
@@ -330,14 +704,28 @@ http_client = httpx.AsyncClient(
 
 channel_entities = {}
 inaccessible_channels = set()
+listening_chat_ids = frozenset()  # Handler'ın işlediği kanallar (sadece bütün olarak değiştirilir)
+SOURCE_RESOLVE_CONCURRENCY = 8  # Aynı anda çözümlenen kaynak kanal
 
-async def check_channel_access():
-    global channel_entities, inaccessible_channels, channel_pts
+def refresh_listening_set():
+    global listening_chat_ids
+    listening_chat_ids = frozenset(ch for ch in LISTENING_CHANNELS if ch in channel_entities)
 
-    log_info("🔍 Kaynak kanal erişimleri kontrol ediliyor...")
+async def check_channel_access(channel_ids=None):
+    """Kaynak kanalları eşzamanlı çözümle (verilmezse tüm LISTENING_CHANNELS)"""
+    channel_ids = list(LISTENING_CHANNELS if channel_ids is None else channel_ids)
+    log_info(f"🔍 Kaynak kanal erişimleri kontrol ediliyor ({len(channel_ids)} kanal)...")
 
-    for channel_id in LISTENING_CHANNELS:
-        channel_name = CHANNEL_NAMES.get(channel_id, str(channel_id))
+    semaphore = asyncio.Semaphore(SOURCE_RESOLVE_CONCURRENCY)
+    await asyncio.gather(*[resolve_source_channel(channel_id, semaphore) for channel_id in channel_ids])
+    refresh_listening_set()
+
+    log_info(f"📡 Erişilebilir kaynak kanal: {len(listening_chat_ids)}/{len(LISTENING_CHANNELS)}")
+
+async def resolve_source_channel(channel_id: int, semaphore: asyncio.Semaphore):
+    channel_name = CHANNEL_NAMES.get(channel_id, str(channel_id))
+    inaccessible_channels.discard(channel_id)
+    async with semaphore:
         try:
             entity = await client.get_entity(channel_id)
             channel_entities[channel_id] = entity
@@ -345,62 +733,185 @@ async def check_channel_access():
             messages = await client.get_messages(entity, limit=1)
             if messages:
                 last_seen_message_ids[channel_id] = messages[0].id
-                full = await client.get_entity(channel_id)
-                if hasattr(full, 'pts'):
-                    channel_pts[channel_id] = full.pts
             else:
                 last_seen_message_ids[channel_id] = 0
 
+            # Gap takibi için kanalın güncel pts değeri (alınamazsa motor ilk çekimde sorar)
+            try:
+                full = await client(GetFullChannelRequest(entity))
+                channel_pts[channel_id] = full.full_chat.pts
+            except Exception as e:
+                log_warning(f"pts alınamadı: {channel_name} ({channel_id}) - {e}")
+            update_engine.add_channel(channel_id, channel_pts.get(channel_id))
+
             log_success(f"Kaynak kanal erişimi OK: {channel_name} ({channel_id})")
 
         except (ChannelPrivateError, ChannelInvalidError) as e:
+            drop_source_channel(channel_id)
             inaccessible_channels.add(channel_id)
             log_error(f"Kaynak kanal ERİŞİM YOK: {channel_name} ({channel_id}) - {type(e).__name__}")
         except Exception as e:
+            drop_source_channel(channel_id)
             inaccessible_channels.add(channel_id)
             log_error(f"Kaynak kanal HATA: {channel_name} ({channel_id}) - {e}")
 
-    log_info(f"📡 Erişilebilir kaynak kanal: {len(channel_entities)}/{len(LISTENING_CHANNELS)}")
+def drop_source_channel(channel_id: int):
+    update_engine.remove_channel(channel_id)
+    channel_entities.pop(channel_id, None)
 
 # ══════════════════════════════════════════════════════════════════════════════
-# AGRESİF POLLİNG
+# KAYNAK KANAL / KELİME LİSTESİ (DB)
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def aggressive_polling():
-    log_info("🚀 Aggressive polling başlatıldı...")
-    while True:
-        try:
-            for channel_id in LISTENING_CHANNELS:
-                if channel_id in inaccessible_channels:
-                    continue
+sources_lock = asyncio.Lock()
+sources_reload_task = None
 
-                entity = channel_entities.get(channel_id)
-                if not entity:
-                    continue
+async def apply_sources(channels: dict, banned: set, keywords: set):
+    """Yeni kaynak listesini uygula: eklenenleri çözümle, çıkarılanları bırak (yeniden bağlanmadan)"""
+    global LISTENING_CHANNELS, CHANNEL_NAMES, BANNED_WORDS, KEYWORDS, banned_words_matcher
 
-                last_id = last_seen_message_ids.get(channel_id, 0)
+    if banned != BANNED_WORDS:
+        banned_words_matcher = AhoCorasick(banned)
+    BANNED_WORDS = banned
+    KEYWORDS = keywords
 
-                try:
-                    messages = await client.get_messages(
-                        entity,
-                        limit=3,
-                        min_id=last_id
-                    )
+    # Yeni kanallar ve daha önce erişilemeyenler (yeniden denenir) çözümlenir
+    added = [ch for ch in channels if ch not in channel_entities]
+    removed = [ch for ch in set(LISTENING_CHANNELS) | channel_entities.keys() if ch not in channels]
+    LISTENING_CHANNELS = list(channels)
+    CHANNEL_NAMES = channels
 
-                    if messages:
-                        for msg in reversed(messages):
-                            if msg.id > last_id:
-                                await process_message_from_polling(msg, channel_id)
-                                last_seen_message_ids[channel_id] = msg.id
+    for channel_id in removed:
+        drop_source_channel(channel_id)
+        inaccessible_channels.discard(channel_id)
+    if removed:
+        log_info(f"➖ Dinlemeden çıkarılan kaynak kanal: {len(removed)}")
 
-                except Exception as e:
-                    log_warning(f"Polling hatası ({channel_id}): {e}")
+    if added:
+        await check_channel_access(added)
+    else:
+        refresh_listening_set()
 
-            await asyncio.sleep(POLLING_INTERVAL)
+async def load_sources(fetched=None):
+    """Kaynak kanalları ve kelime listelerini DB'den yükle (tablo / kelime türü yoksa varsayılanlar)
 
-        except Exception as e:
-            log_error(f"Polling döngü hatası: {e}")
-            await asyncio.sleep(1)
+    fetched: önceden okunmuş fetch_sources sonucu (başlangıçta bağlantıyla paralel okunur)
+    """
+    async with sources_lock:
+        if fetched is None:
+            try:
+                fetched = await db.run_async(fetch_sources)
+            except Exception as e:
+                log_warning(f"Kaynak listesi DB'den okunamadı, mevcut/varsayılan liste kullanılıyor: {e}")
+                if listening_chat_ids:
+                    return
+                fetched = (None, None, None)
+        channels, banned, keywords = fetched
+        if channels is not None and not channels:
+            log_warning("Tüm kaynak kanallar pasif: hiçbir kanal dinlenmiyor")
+
+        await apply_sources(
+            channels if channels is not None else dict(DEFAULT_CHANNEL_NAMES),
+            banned if banned is not None else {word.lower() for word in DEFAULT_BANNED_WORDS},
+            keywords if keywords is not None else set(DEFAULT_KEYWORDS),
+        )
+
+entity_cache = EntityCache(ENTITY_CACHE_FILE) if ENTITY_CACHE_FILE else None
+
+def seed_cached_entities(cached: dict) -> list:
+    """Cache'teki kanalları Telegram'a sormadan kullanıma al; arka planda doğrulanacak id'leri döner"""
+    for channel_id, (access_hash, last_seen) in cached.items():
+        channel_entities[channel_id] = InputPeerChannel(resolve_id(channel_id)[0], access_hash)
+        if last_seen > last_seen_message_ids.get(channel_id, 0):
+            last_seen_message_ids[channel_id] = last_seen
+        # pts ilk update'te veya motorun ilk çekiminde alınır
+        update_engine.add_channel(channel_id)
+    return list(cached)
+
+async def verify_cached_channels(channel_ids: list):
+    """Cache'ten gelen kanalları yeniden çözümle (erişim kaybolduysa dinlemeden çıkar)"""
+    async with sources_lock:
+        await check_channel_access([ch for ch in channel_ids if ch in CHANNEL_NAMES])
+    save_entity_cache()
+
+def save_entity_cache():
+    if entity_cache is None:
+        return
+    entries = {
+        channel_id: (entity.access_hash, last_seen_message_ids.get(channel_id, 0))
+        for channel_id, entity in channel_entities.items()
+        if channel_id in listening_chat_ids
+    }
+    # Başlangıç tamamlanmadan kapanırsa iyi bir cache'in üzerine boş yazılmasın
+    if not entries:
+        return
+    try:
+        entity_cache.save(entries)
+    except Exception as e:
+        log_warning(f"Entity cache yazılamadı: {e}")
+
+async def save_entity_cache_periodically():
+    while True:
+        await asyncio.sleep(ENTITY_CACHE_INTERVAL)
+        save_entity_cache()
+
+def schedule_sources_reload():
+    """Bildirim işleyicisini bekletmeden kaynak listesini arka planda yenile"""
+    global sources_reload_task
+    if sources_reload_task is not None and not sources_reload_task.done():
+        return
+    sources_reload_task = asyncio.create_task(load_sources())
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GÜNCELLEME MOTORU (pts / getChannelDifference)
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def fetch_channel_difference(channel_id: int, pts: int):
+    """Kanal için pts'den sonraki mesajları çek: (yeni_pts, mesajlar, final, timeout)"""
+    result = await client(GetChannelDifferenceRequest(
+        channel=channel_entities[channel_id],
+        filter=ChannelMessagesFilterEmpty(),
+        pts=pts,
+        limit=100,
+        force=False
+    ))
+
+    if isinstance(result, ChannelDifferenceEmpty):
+        return result.pts, [], result.final, result.timeout
+
+    if isinstance(result, ChannelDifferenceTooLong):
+        # Çok geride kaldık: sunucu son mesajları ve güncel pts'yi döner
+        messages = [m for m in result.messages if isinstance(m, Message)]
+        return result.dialog.pts, messages, True, result.timeout
+
+    messages = [m for m in result.new_messages if isinstance(m, Message)]
+    return result.pts, messages, result.final, result.timeout
+
+async def fetch_channel_pts(channel_id: int) -> int:
+    full = await client(GetFullChannelRequest(channel_entities[channel_id]))
+    return full.full_chat.pts
+
+async def on_difference_message(channel_id: int, message):
+    if not accepting_messages():
+        return
+    # update_engine.claim'den geçti: bu yoldan ilk kopya (ek oturumların geç kopyası ölçülür)
+    arrivals.claim("difference", channel_id, message.id)
+    if message.id > last_seen_message_ids.get(channel_id, 0):
+        last_seen_message_ids[channel_id] = message.id
+    await process_message_from_polling(message, channel_id)
+
+def on_difference_error(channel_id: int, error: Exception):
+    log_warning(f"Difference hatası ({CHANNEL_NAMES.get(channel_id, channel_id)}): {error}")
+
+# Sadece boşluk algılandığında veya kanalın kontrol vakti geldiğinde çekim yapar
+update_engine = UpdateEngine(
+    fetch_channel_difference,
+    on_difference_message,
+    get_pts=fetch_channel_pts,
+    on_error=on_difference_error,
+    min_interval=POLLING_INTERVAL,
+    max_interval=IDLE_POLLING_INTERVAL,
+)
 
 async def process_message_from_polling(message, channel_id):
     class FakeEvent:
@@ -409,109 +920,454 @@ async def process_message_from_polling(message, channel_id):
             self.chat_id = chat_id
 
     fake_event = FakeEvent(message, channel_id)
-    await process_message(fake_event)
+    await process_message(fake_event, path="polling")
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CATCH_UP
 # ══════════════════════════════════════════════════════════════════════════════
 
+catching_up = False  # catch_up sırasında handler'a gelen mesajlar metriklerde ayrı sayılır
+
 async def periodic_catch_up():
+    global catching_up
     while True:
         try:
             await asyncio.sleep(CATCH_UP_INTERVAL)
+            catching_up = True
             await client.catch_up()
         except Exception:
             pass
+        finally:
+            catching_up = False
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MESAJ GÖNDERME
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def send_message(chat_id: int, text: str, code: str) -> dict:
+_send_url = (None, None)  # (TELEGRAM_BOT_API, parse edilmiş sendMessage URL'i)
+
+def send_message_url() -> httpx.URL:
+    global _send_url
+    if _send_url[0] != TELEGRAM_BOT_API:
+        _send_url = (TELEGRAM_BOT_API, httpx.URL(f"{TELEGRAM_BOT_API}/sendMessage"))
+    return _send_url[1]
+
+def warm_url() -> str:
+    return f"{TELEGRAM_BOT_API}/getMe"
+
+async def send_message(chat_id: int, text, code: str) -> dict:
+    """text: hazır MessagePayload (hedefler arasında paylaşılır) veya düz metin"""
     try:
-        url = f"{TELEGRAM_BOT_API}/sendMessage"
-        payload = {
-            "chat_id": chat_id,
-            "text": text,
-            "parse_mode": "Markdown",
-            "disable_web_page_preview": True
-        }
-        response = await http_client.post(url, json=payload)
+        payload = text if isinstance(text, MessagePayload) else MessagePayload(text)
+        response = await transport.post(send_message_url(), payload.body(chat_id))
         result = response.json()
 
         if result.get("ok"):
-            log_success(f"GÖNDERİM BAŞARILI | Kanal: {chat_id} | Kod: {code}")
+            if success_log.record(code):
+                log_success("GÖNDERİM BAŞARILI | Kanal: %s | Kod: %s", chat_id, code, code=code, target=chat_id)
             return {"success": True, "chat_id": chat_id}
+
+        error_desc = result.get("description", "Bilinmeyen hata")
+        error_code = result.get("error_code", response.status_code)
+        retry_after = (result.get("parameters") or {}).get("retry_after")
+
+        if retry_after:
+            log_warning("RATE LIMIT | Kanal: %s | Kod: %s | %s sn sonra tekrar denenecek", chat_id, code, retry_after,
+                        code=code, target=chat_id, retry_after=retry_after)
         else:
-            error_desc = result.get("description", "Bilinmeyen hata")
-            error_code = result.get("error_code", "?")
-            log_error(f"GÖNDERİM BAŞARISIZ | Kanal: {chat_id} | Kod: {code} | Hata: [{error_code}] {error_desc}")
-            return {"success": False, "chat_id": chat_id, "error": error_desc}
+            log_error("GÖNDERİM BAŞARISIZ | Kanal: %s | Kod: %s | Hata: [%s] %s", chat_id, code, error_code, error_desc,
+                      code=code, target=chat_id, error_code=error_code)
+        return {"success": False, "chat_id": chat_id, "error": error_desc, "error_code": error_code, "retry_after": retry_after}
 
     except Exception as e:
-        log_error(f"GÖNDERİM EXCEPTION | Kanal: {chat_id} | Kod: {code} | Hata: {e}")
-        return {"success": False, "chat_id": chat_id, "error": str(e)}
+        log_error("GÖNDERİM EXCEPTION | Kanal: %s | Kod: %s | Hata: %s", chat_id, code, e, code=code, target=chat_id)
+        return {"success": False, "chat_id": chat_id, "error": str(e), "error_code": None}
+
+# Tüm gönderimler bu zamanlayıcıdan geçer (global + kanal bazlı rate limit)
+delivery_scheduler = DeliveryScheduler(
+    send_message,
+    global_rate=GLOBAL_SEND_RATE,
+    global_burst=GLOBAL_SEND_RATE,
+    chat_rate=CHAT_SEND_RATE,
+    chat_burst=CHAT_SEND_BURST,
+    concurrency=SEND_CONCURRENCY,
+    deadline=DELIVERY_DEADLINE,
+    max_attempts=DELIVERY_MAX_ATTEMPTS,
+)
 
-async def send_to_all_channels(code: str, link: str, source_channel: int):
-    source_name = CHANNEL_NAMES.get(source_channel, str(source_channel))
+# ══════════════════════════════════════════════════════════════════════════════
+# SHARDING (ÇOKLU GÖNDERİCİ WORKER)
+# ══════════════════════════════════════════════════════════════════════════════
 
-    if not user_channel_cache:
-        log_warning(f"HEDEF KANAL YOK! Kod: {code} | Kaynak: {source_name}")
+# Listener modunda her hedef kanal consistent-hash ile tek bir worker'a düşer
+shard_ring = HashRing(range(SHARD_COUNT)) if SHARD_ROLE == "listener" and SHARD_COUNT > 0 else None
+shard_clients = {i: ShardClient(socket_path(SHARD_SOCKET_DIR, i)) for i in range(SHARD_COUNT)} if shard_ring else {}
+worker_processes = {}  # shard -> asyncio.subprocess.Process
+
+async def deliver_local(code: str, jobs: list) -> list:
+    """jobs: [(chat_id, text), ...] -> hedef başına sonuç sözlüğü (JSON'a uygun)"""
+    # Aynı metni alan hedefler tek bir serileştirilmiş gövdeyi paylaşır
+    results = await asyncio.gather(
+        *[delivery_scheduler.submit(chat_id, payload, code) for chat_id, payload in build_payloads(jobs)],
+        return_exceptions=True
+    )
+    return [
+        r if isinstance(r, dict) else {"success": False, "chat_id": chat_id, "error": str(r), "error_code": None}
+        for (chat_id, _), r in zip(jobs, results)
+    ]
+
+async def deliver_to_shard(shard: int, code: str, jobs: list) -> list:
+    try:
+        return await shard_clients[shard].deliver(code, jobs)
+    except ShardUnreachable as e:
+        # Batch worker'a hiç ulaşmadı: dilim kaybolmasın, bu process'ten gönder
+        log_warning("SHARD %s ULAŞILAMIYOR | Kod: %s | %d hedef yerelde gönderiliyor | %s", shard, code, len(jobs), e,
+                    code=code, shard=shard)
+        return await deliver_local(code, jobs)
+    except ConnectionError as e:
+        # Batch yazıldı ama cevap gelmedi: worker bir kısmını göndermiş olabilir, yerelde tekrar
+        # gönderilmez (çift gönderim). Hedefler outbox'ta pending kalır, replay ile tamamlanır
+        log_warning("SHARD %s CEVAP VERMEDİ | Kod: %s | %d hedefin sonucu bilinmiyor | %s", shard, code, len(jobs), e,
+                    code=code, shard=shard)
+        return [
+            {"success": False, "chat_id": chat_id, "error": f"shard cevabı alınamadı: {e}", "error_code": None,
+             "outcome_unknown": True}
+            for chat_id, _ in jobs
+        ]
+
+async def deliver_jobs(code: str, jobs: list) -> list:
+    if shard_ring is None:
+        return await deliver_local(code, jobs)
+    groups = shard_ring.split(jobs, key=lambda job: job[0])
+    parts = await asyncio.gather(*[deliver_to_shard(shard, code, part) for shard, part in groups.items()])
+    return [result for part in parts for result in part]
+
+def delivery_fenced() -> bool:
+    """Liderliği kaybetmiş (lease'i dolmuş / epoch'u geçmiş) process gönderim yapmaz"""
+    return leader is not None and not leader.is_leader
+
+def release_fenced(codes: tuple, jobs: list):
+    """Gönderilmeyen hedefler outbox'ta pending kalır: yeni lider replay ile gönderir"""
+    log_warning("⛔ LİDER DEĞİL | Kod: %s | %d hedef gönderilmedi, yeni lidere bırakıldı", "+".join(codes), len(jobs),
+                code="+".join(codes), targets=len(jobs))
+    if outbox is not None:
+        for chat_id, _ in jobs:
+            for code in codes:
+                outbox.release(code, chat_id)
+
+async def deliver_recorded(code: str, jobs: list) -> list:
+    """Outbox'a kaydederek gönder: zaten bekleyen hedef tekrar kuyruğa alınmaz"""
+    if outbox is None:
+        if delivery_fenced():
+            release_fenced((code,), jobs)
+            return []
+        return await deliver_jobs(code, jobs)
+    jobs = outbox.claim(code, jobs)
+    # Fencing kontrolü claim'den sonra: gönderilmeyen hedefin satırı pending yazılır
+    if delivery_fenced():
+        release_fenced((code,), jobs)
+        return []
+    results = await deliver_jobs(code, jobs)
+    complete_outbox((code,), results)
+    return results
+
+def complete_outbox(codes: tuple, results: list):
+    """Hedef sonuçlarını kodların outbox satırlarına yaz; sonucu bilinmeyenler pending kalır"""
+    for r in results:
+        for code in codes:
+            if r.get("outcome_unknown"):
+                outbox.release(code, r["chat_id"])
+            else:
+                outbox.complete(code, r["chat_id"], bool(r.get("success")), r.get("attempts", 1))
+
+async def replay_outbox():
+    """Önceki çalışmadan pending kalan hedefleri tekrar gönder (kod TTL'i içindekiler)"""
+    try:
+        pending = await outbox.load_pending(CODE_TTL)
+    except Exception as e:
+        log_warning(f"Outbox okunamadı: {e}")
         return
+    if not pending:
+        return
+
+    log_info(f"♻️ Outbox: {len(pending)} kod için {sum(len(jobs) for jobs in pending.values())} yarım kalan hedef tekrar gönderiliyor")
+    # Güncel durumla süzülür: artık hedef olmayan veya karantinadaki kanallara gönderilmez
+    current_targets = set(user_channel_rows.channel_ids)
+    for code, jobs in pending.items():
+        now = time.monotonic()
+        allowed = [job for job in jobs if job[0] in current_targets and target_health.allow(job[0], now)]
+        skipped = len(jobs) - len(allowed)
+        if skipped:
+            # Satır pending kalırsa her restart'ta tekrar okunur: gönderilmedi olarak kapatılır
+            kept = {job[0] for job in allowed}
+            for chat_id, _ in jobs:
+                if chat_id not in kept:
+                    outbox.complete(code, chat_id, False, attempts=0)
+        if not allowed:
+            log_info("♻️ OUTBOX TEKRAR | Kod: %s | %d hedef artık hedef değil / karantinada, atlandı", code, skipped,
+                     code=code, skipped=skipped)
+            continue
 
-    # Filtre kontrolü ile gönderilecek user-channel kombinasyonlarını belirle
-    user_channels_to_send = []
-    filtered_out_count = 0
+        submitted_at = time.monotonic()
+        results = await deliver_recorded(code, allowed)
+        account_results(code, results, submitted_at)
+        ok = sum(1 for r in results if r.get("success"))
+        log_info("♻️ OUTBOX TEKRAR | Kod: %s | Başarılı: %d/%d | Atlanan: %d", code, ok, len(results), skipped,
+                 code=code, ok=ok, skipped=skipped)
 
-    # Aynı kanala birden fazla kez gönderilmemesi için kanal bazlı takip
-    sent_channels = set()
+def on_outbox_error(error: Exception):
+    log_warning(f"Outbox yazılamadı (tekrar denenecek): {error}")
+
+def on_delivery_log_error(error: Exception):
+    log_warning(f"Teslimat logu yazılamadı (tekrar denenecek): {error}")
+
+async def supervise_worker(shard: int):
+    """Gönderici worker process'ini başlat, düşerse yeniden başlat"""
+    env = dict(os.environ, SHARD_ROLE="worker", SHARD_INDEX=str(shard))
+    while True:
+        process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env)
+        worker_processes[shard] = process
+        returncode = await process.wait()
+        log_warning(f"Gönderici worker {shard} kapandı (kod {returncode}), yeniden başlatılıyor", shard=shard)
+        await asyncio.sleep(1)
+
+def stop_workers():
+    for process in worker_processes.values():
+        if process.returncode is None:
+            process.terminate()
+
+# Sadece listener/tek process tutar: worker'ların sonuçları da buraya döner
+target_health = TargetHealth(
+    failure_threshold=HEALTH_FAILURE_THRESHOLD,
+    probe_interval=HEALTH_PROBE_INTERVAL,
+    max_probe_interval=HEALTH_MAX_PROBE_INTERVAL,
+)
 
-    for user_id, channel_id in user_channel_cache:
-        # Aynı kanala zaten gönderilmişse atla (ilk user'ın ayarları geçerli)
-        if channel_id in sent_channels:
+async def restore_target_health():
+    """Restart sonrası kalıcı hatalı hedefler tekrar denenene kadar karantinada başlar"""
+    try:
+        rows = await db.run_async(fetch_unhealthy_targets)
+    except Exception as e:
+        log_warning(f"Hedef sağlık durumu okunamadı: {e}")
+        return
+    for channel_id, join_error in rows:
+        # Liderlik devrinde tekrar okunur: zaten karantinadaki hedefin süresi uzatılmaz
+        if not target_health.is_quarantined(channel_id):
+            target_health.quarantine(channel_id, join_error)
+    target_health.drain_changes()  # DB'de zaten bu durum var
+    metric_quarantined.set(target_health.quarantined)
+    if rows:
+        log_info(f"🚧 Karantinada başlayan hedef kanal: {len(rows)}")
+
+async def flush_target_health_periodically():
+    while True:
+        await asyncio.sleep(HEALTH_FLUSH_INTERVAL)
+        changes = target_health.drain_changes()
+        metric_quarantined.set(target_health.quarantined)
+        if not changes:
             continue
+        try:
+            await db.run_async(write_target_health, changes)
+        except Exception as e:
+            log_warning(f"Hedef sağlık durumu yazılamadı: {e}")
+
+def record_target_result(code: str, result: dict):
+    chat_id = result.get("chat_id")
+    was_quarantined = target_health.is_quarantined(chat_id)
+    kind = target_health.record(chat_id, result)
+    now_quarantined = target_health.is_quarantined(chat_id)
+    if now_quarantined and not was_quarantined:
+        log_warning("🚧 HEDEF KARANTİNADA | Kanal: %s | %s hata: %s", chat_id,
+                    "Kalıcı" if kind == PERMANENT else "Tekrarlayan", result.get("error"),
+                    code=code, target=chat_id, error_code=result.get("error_code"))
+    elif was_quarantined and not now_quarantined:
+        log_success("HEDEF KARANTİNADAN ÇIKTI | Kanal: %s", chat_id, code=code, target=chat_id)
+
+async def send_to_all_channels(code: str, link: str, source_channel: int, intake_at: float = None):
+    source_name = CHANNEL_NAMES.get(source_channel, str(source_channel))
 
-        should_send, reason = should_send_to_user_channel(user_id, channel_id, code, link)
-        if should_send:
-            user_channels_to_send.append((user_id, channel_id))
-            sent_channels.add(channel_id)
-        else:
-            filtered_out_count += 1
+    # Tablo referansı başta alınır, cache yenilense bile bu kod aynı tabloyla devam eder
+    table = routing_table
 
-    if not user_channels_to_send:
-        log_info(f"⛔ Tüm kanallar filtrelendi ({filtered_out_count}) | Kod: {code} | Kaynak: {source_name}")
+    if not table.target_count:
+        log_warning(f"HEDEF KANAL YOK! Kod: {code} | Kaynak: {source_name}")
         return
 
-    # Sadece özet bilgi logla
-    log_info(f"📤 GÖNDERİM | Kod: {code} | Kaynak: {source_name} | Hedef: {len(user_channels_to_send)} kanal (filtrelenen: {filtered_out_count})")
+    # Filtre ve link eşleştirmesi tüm hedefler için tek taramada çözülür
+    route_started = time.monotonic()
+    user_channels_to_send, filtered_out_count = table.route(code.lower(), link.lower())
+    metric_route.observe(time.monotonic() - route_started)
 
-    tasks = []
-    for user_id, channel_id in user_channels_to_send:
-        final_link = get_link_for_user_channel(user_id, channel_id, code, link)
-        message = f"`{code}`\n\n{final_link}"
-        tasks.append(send_message(channel_id, message, code))
+    if not user_channels_to_send:
+        log_info("⛔ Tüm kanallar filtrelendi (%d) | Kod: %s | Kaynak: %s", filtered_out_count, code, source_name,
+                 code=code, source=source_name)
+        return
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Karantinadaki hedefler atlanır (deneme vakti gelmişse biri probe olarak gönderilir)
+    now = time.monotonic()
+    healthy = [target for target in user_channels_to_send if target_health.allow(target[1], now)]
+    skipped = len(user_channels_to_send) - len(healthy)
+    if skipped:
+        metric_quarantine_skips.inc(amount=skipped)
+        user_channels_to_send = healthy
+        if not healthy:
+            log_info("🚧 Tüm hedefler karantinada (%d) | Kod: %s", skipped, code, code=code, source=source_name)
+            return
 
-    # Sonuçları say
+    # Sadece özet bilgi logla
+    log_info("📤 GÖNDERİM | Kod: %s | Kaynak: %s | Hedef: %d kanal (filtrelenen: %d, karantina: %d)",
+             code, source_name, len(user_channels_to_send), filtered_out_count, skipped,
+             code=code, source=source_name, targets=len(user_channels_to_send))
+
+    submitted_at = time.monotonic()
+    # Metin link varyantı başına bir kez üretilir (çoğu hedef aynı metni alır)
+    rendered = {}
+    jobs = []
+    windowed = []  # (chat_id, metin, pencere sn)
+    for user_id, channel_id, custom_link in user_channels_to_send:
+        final_link = custom_link or link
+        text = rendered.get(final_link)
+        if text is None:
+            text = rendered[final_link] = render_message(code, final_link)
+        window = coalesce_windows.get(user_id, COALESCE_WINDOW_MS)
+        if window:
+            windowed.append((channel_id, text, window / 1000))
+        else:
+            jobs.append((channel_id, text))
+
+    if windowed:
+        # Pencereye girerken outbox'a kod bazında kaydedilir: pencere dolmadan process
+        # düşerse hedef replay'de tek kodluk metinle gönderilir
+        if outbox is not None:
+            claimed = {chat_id for chat_id, _ in outbox.claim(code, [(chat_id, text) for chat_id, text, _ in windowed])}
+            windowed = [target for target in windowed if target[0] in claimed]
+        for channel_id, text, window in windowed:
+            # Pencere içinde bu hedefe gelecek diğer kodlarla birlikte gönderilir
+            coalescer.add(channel_id, code, text, window, intake_at)
+
+    if jobs:
+        results = await deliver_recorded(code, jobs)
+        account_results(code, results, submitted_at, intake_at)
+
+def account_results(code: str, results: list, submitted_at: float, intake_at: float = None):
+    """Teslimat sonuçlarını metriklere, hedef sağlığına ve loga işle"""
     success_count = 0
     fail_count = 0
+    latencies = []
     for r in results:
-        if isinstance(r, dict) and r.get("success"):
+        record_target_result(code, r)
+        if delivery_audit is not None:
+            delivery_audit.record(code, r)
+        if r.get("success"):
             success_count += 1
+            latencies.append(r["latency"])
         else:
             fail_count += 1
+            metric_delivery_failures.inc(str(r.get("chat_id")))
+
+    metric_deliveries.inc("ok", amount=success_count)
+    metric_deliveries.inc("error", amount=fail_count)
+
+    if latencies:
+        queued = submitted_at - (intake_at or submitted_at)
+        metric_intake_to_first.observe(queued + min(latencies))
+        metric_intake_to_last.observe(queued + max(latencies))
+        first_ms = min(latencies) * 1000
+        last_ms = max(latencies) * 1000
+        log_info("⏱️ TESLİMAT SÜRESİ | Kod: %s | İlk: %.0f ms | Son: %.0f ms", code, first_ms, last_ms,
+                 code=code, first_ms=round(first_ms), last_ms=round(last_ms))
 
     # Sadece başarısız varsa detaylı log
     if fail_count > 0:
-        log_info(f"📊 SONUÇ | Kod: {code} | Başarılı: {success_count} | Başarısız: {fail_count}")
+        log_info("📊 SONUÇ | Kod: %s | Başarılı: %d | Başarısız: %d", code, success_count, fail_count,
+                 code=code, ok=success_count, failed=fail_count)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PATLAMA BİRLEŞTİRME
+# ══════════════════════════════════════════════════════════════════════════════
+
+coalesce_windows = {}  # user_id -> pencere (ms), users.coalesce_window_ms
+
+async def flush_coalesced(batch: list):
+    """Penceresi dolan hedefler: aynı kod kombinasyonunu alanlar tek teslimat grubunda"""
+    groups = {}  # (KOD1, KOD2) -> ([(chat_id, metin), ...], en erken alım)
+    for chat_id, items in batch:
+        codes = tuple(code for code, _, _ in items)
+        jobs, intake_at = groups.get(codes, ([], None))
+        first = min(item[2] for item in items)
+        jobs.append((chat_id, merge_texts(items)))
+        groups[codes] = (jobs, first if intake_at is None else min(intake_at, first))
+        metric_coalesce_saved.inc(amount=len(items) - 1)
+    await asyncio.gather(*[deliver_coalesced(codes, jobs, intake_at) for codes, (jobs, intake_at) in groups.items()])
+
+async def deliver_coalesced(codes: tuple, jobs: list, intake_at: float):
+    submitted_at = time.monotonic()
+    key = "+".join(codes)
+    if len(codes) > 1:
+        log_info("🧺 BİRLEŞİK GÖNDERİM | Kodlar: %s | Hedef: %d kanal", key, len(jobs), code=key, targets=len(jobs))
+    if delivery_fenced():
+        release_fenced(codes, jobs)
+        return
+    # Outbox satırları pencereye girişte kod bazında alındı: sonuç her kodun satırına yazılır
+    results = await deliver_jobs(key, jobs)
+    if outbox is not None:
+        complete_outbox(codes, results)
+    account_results(key, results, submitted_at, intake_at)
+
+def on_coalesce_error(error: Exception):
+    log_error(f"Birleşik gönderim hatası: {error}")
+
+coalescer = Coalescer(flush_coalesced, max_codes=COALESCE_MAX_CODES, on_error=on_coalesce_error)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ALIM -> GÖNDERİM HATTI
+# ══════════════════════════════════════════════════════════════════════════════
+
+def on_code_shed(item, reason: str, waited: float):
+    code, _, source_channel, _ = item
+    metric_shed.inc(reason)
+    metric_code_queue.set(len(code_queue))
+    log_warning("🗑️ KOD ATILDI | Kod: %s | Neden: %s | Bekleme: %.1f sn", code, reason, waited,
+                code=code, source=CHANNEL_NAMES.get(source_channel, str(source_channel)), reason=reason)
+
+async def deliver_queued_code(item):
+    metric_code_queue.set(len(code_queue))
+    persist_code_sent(item[0])
+    await send_to_all_channels(*item)
+
+def on_sender_error(item, error: Exception):
+    log_error(f"Gönderim hatası ({item[0]}): {error}")
+
+code_queue = CodeQueue(CODE_QUEUE_SIZE, CODE_MAX_AGE, SHED_POLICY, on_shed=on_code_shed)
+sender_pool = SenderPool(code_queue, deliver_queued_code, DELIVERY_WORKERS, on_error=on_sender_error)
+
+async def drain_code_queue():
+    """Kapanış: alımı durdur, kuyruktaki kodları SHUTDOWN_DRAIN_TIMEOUT içinde gönder"""
+    global intake_open
+    intake_open = False
+    waiting = len(code_queue)
+    if waiting:
+        log_info(f"⏳ Kapanış: kuyrukta {waiting} kod gönderiliyor (en fazla {SHUTDOWN_DRAIN_TIMEOUT:.0f} sn)")
+    left = await sender_pool.stop(SHUTDOWN_DRAIN_TIMEOUT)
+    if left:
+        # Kalıcı kayda yazılmadılar: catch_up / yedek lider aynı mesajı tekrar işleyebilir
+        log_warning(f"Kapanışta gönderilemeyen kod: {len(left)} ({', '.join(item[0] for item in left)})")
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MESAJ İŞLEME
 # ══════════════════════════════════════════════════════════════════════════════
 
-async def process_message(event):
+async def process_message(event, path: str = "event"):
+    """path: mesajın geldiği yol (event / polling / catch_up), metrikler için"""
     try:
+        intake_at = time.monotonic()
+        metric_messages.inc(path)
+
+        # Kaynak mesaj zamanı (saniye hassasiyetinde) -> işleme girişi
+        message_date = getattr(event.message, 'date', None)
+        if message_date is not None:
+            metric_source_to_intake.observe(max(0.0, time.time() - message_date.timestamp()))
+
         source_channel = event.chat_id
         source_name = CHANNEL_NAMES.get(source_channel, str(source_channel))
 
@@ -519,74 +1375,49 @@ async def process_message(event):
         if not text:
             return
 
-        text = text.strip()
-        lines = [l.strip() for l in text.splitlines() if l.strip()]
-
-        # Format kontrolü: en az 2 satır gerekli
-        if len(lines) < 2:
-            log_info(f"📥 MESAJ ALINDI | Kaynak: {source_name} | FORMAT UYMUYOR: 2 satırdan az | İçerik: {text[:50]}...")
+        # Sohbet/duyuru mesajları ucuz ön filtrede elenir; satır satır log yerine kanal bazlı sayılır
+        reason = quick_reject(text, KEYWORDS)
+        parsed = parse_message(text, KEYWORDS) if reason is None else None
+        if parsed is None:
+            metric_rejects.inc(source_name, reason or REJECT_FORMAT)
             return
 
-        link_pattern = r'^(?:https?://)?(?:www\.)?[a-zA-Z0-9][-a-zA-Z0-9]*(?:\.[a-zA-Z0-9][-a-zA-Z0-9]*)+(?:/[^\s]*)?$'
-        code_pattern = r'^[\wÇçĞğİıÖöŞşÜü-]+$'
-
-        code = None
-        link = None
-        format_type = None
-
-        # FORMAT 1: anahtar_kelime\nkod\nlink
-        if len(lines) >= 3:
-            first_line_lower = lines[0].lower()
-            # Tek kelimelik ise direkt kabul et, yoksa KEYWORDS'de olmalı
-            is_single_word = ' ' not in first_line_lower and '\t' not in first_line_lower
-            if is_single_word or first_line_lower in KEYWORDS:
-                potential_code = lines[1]
-                potential_link = lines[2]
-
-                if re.match(code_pattern, potential_code) and re.match(link_pattern, potential_link, re.IGNORECASE):
-                    code = potential_code
-                    link = potential_link
-                    if is_single_word:
-                        format_type = f"FORMAT-1 (tek_kelime:{lines[0]}+kod+link)"
-                    else:
-                        format_type = f"FORMAT-1 (keyword:{lines[0]}+kod+link)"
-
-        # FORMAT 2: kod\nlink
-        if not code:
-            potential_code = lines[0]
-            potential_link = lines[1]
-
-            if re.match(code_pattern, potential_code) and re.match(link_pattern, potential_link, re.IGNORECASE):
-                code = potential_code
-                link = potential_link
-                format_type = "FORMAT-2 (kod+link)"
-
-        if not code or not link:
-            log_info(f"📥 MESAJ ALINDI | Kaynak: {source_name} | FORMAT UYMUYOR: Kod veya link bulunamadı | Satırlar: {lines[:3]}")
-            return
+        code = parsed.code
+        link = parsed.link
+        format_type = parsed.format_type
 
         # Yasak kelime kontrolü
         banned = has_banned_word(code)
         if banned:
-            log_info(f"📥 MESAJ ALINDI | Kaynak: {source_name} | YASAK KELİME (kod): '{banned}' | Kod: {code}")
+            log_info("📥 MESAJ ALINDI | Kaynak: %s | YASAK KELİME (kod): '%s' | Kod: %s", source_name, banned, code,
+                     code=code, source=source_name, reason="banned")
             return
 
         banned_link = has_banned_word(link)
         if banned_link:
-            log_info(f"📥 MESAJ ALINDI | Kaynak: {source_name} | YASAK KELİME (link): '{banned_link}' | Link: {link}")
+            log_info("📥 MESAJ ALINDI | Kaynak: %s | YASAK KELİME (link): '%s' | Link: %s", source_name, banned_link, link,
+                     code=code, source=source_name, reason="banned")
             return
 
-        # Tekrar kontrolü
+        # Tekrar kontrolü - kontrol ve işaretleme arasında await yok: event ve
+        # difference yolu aynı kodu aynı anda işleyemez
         if is_code_sent(code):
-            log_info(f"📥 MESAJ ALINDI | Kaynak: {source_name} | TEKRAR KOD: {code}")
+            log_info("📥 MESAJ ALINDI | Kaynak: %s | TEKRAR KOD: %s", source_name, code,
+                     code=code, source=source_name, reason="duplicate")
             return
 
+        metric_parse.observe(time.monotonic() - intake_at)
+        metric_codes.inc(path)
+
         # ✅ FORMAT UYGUN - İşleme al
-        log_success(f"FORMAT UYGUN | Kaynak: {source_name} | {format_type} | Kod: {code} | Link: {link}")
+        log_success("FORMAT UYGUN | Kaynak: %s | %s | Kod: %s | Link: %s", source_name, format_type, code, link,
+                    code=code, source=source_name, link=link, path=path)
 
         mark_code_sent(code)
 
-        await send_to_all_channels(code, link, source_channel)
+        # Gönderim beklenmez: alım bir sonraki mesaja hemen geçer
+        sender_pool.submit((code, link, source_channel, intake_at), intake_at)
+        metric_code_queue.set(len(code_queue))
 
     except Exception as e:
         log_error(f"process_message hatası: {e}")
@@ -595,24 +1426,164 @@ async def process_message(event):
 # EVENT HANDLER
 # ══════════════════════════════════════════════════════════════════════════════
 
-def setup_handler():
-    if LISTENING_CHANNELS:
-        accessible_channels = [ch for ch in LISTENING_CHANNELS if ch not in inaccessible_channels]
+def make_handler(session: str, primary: bool):
+    async def handler(event):
+        channel_id = event.chat_id
+        if channel_id not in listening_chat_ids or not accepting_messages():
+            return
+        msg_id = event.message.id
+
+        # pts boşluğu varsa motor sadece bu kanal için difference çeker (pts takibi ana oturumda)
+        if primary:
+            update = event.original_update
+            if getattr(update, 'pts', None) is not None:
+                update_engine.on_update(channel_id, update.pts, update.pts_count)
 
-        if accessible_channels:
-            log_info(f"🎯 Event handler kuruldu: {len(accessible_channels)} kanal")
+        # Başka oturum aynı mesajı önce getirdiyse ucuzca at
+        if not arrivals.claim(session, channel_id, msg_id):
+            metric_session_arrivals.inc(session, "late")
+            return
+        metric_session_arrivals.inc(session, "first")
 
-            @client.on(events.NewMessage(chats=accessible_channels))
-            async def handler(event):
-                channel_id = event.chat_id
-                msg_id = event.message.id
+        # Aynı mesaj difference yolundan geldiyse tekrar işleme
+        if not update_engine.claim(channel_id, msg_id):
+            return
 
-                last_id = last_seen_message_ids.get(channel_id, 0)
-                if msg_id <= last_id:
-                    return
+        if msg_id > last_seen_message_ids.get(channel_id, 0):
+            last_seen_message_ids[channel_id] = msg_id
+        await process_message(event, path="catch_up" if catching_up else "event")
 
-                last_seen_message_ids[channel_id] = msg_id
-                await process_message(event)
+    return handler
+
+def setup_handler():
+    # Handler bir kez kurulur; dinlenen kanal kümesi (listening_chat_ids) çalışırken değiştirilir
+    client.add_event_handler(make_handler("s0", primary=True), events.NewMessage())
+    for session, extra in extra_clients.items():
+        extra.add_event_handler(make_handler(session, primary=False), events.NewMessage())
+    log_info(f"🎯 Event handler kuruldu: {len(listening_chat_ids)} kanal, {1 + len(extra_clients)} oturum")
+
+async def start_extra_session(session: str, extra: TelegramClient):
+    """Ek oturumu bağla; yetkisizse/bağlanamazsa alımdan çıkar (ana oturum etkilenmez)"""
+    try:
+        await extra.connect()
+        if not await extra.is_user_authorized():
+            raise RuntimeError("oturum yetkisiz (session string geçersiz)")
+        # Update akışının başlaması için en az bir istek gerekir
+        me = await extra.get_me()
+        log_success(f"Ek oturum bağlandı: {session} ({me.id})")
+    except Exception as e:
+        log_error(f"Ek oturum {session} kullanılamıyor: {e}")
+        extra_clients.pop(session, None)
+        try:
+            await extra.disconnect()
+        except Exception:
+            pass
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SICAK YEDEK (LİDERLİK)
+# ══════════════════════════════════════════════════════════════════════════════
+
+intake_open = False  # Yedekte kapalı: handler ve difference yolu mesajları atlar
+intake_tasks_started = False
+
+def accepting_messages() -> bool:
+    """Bu process mesaj alıp gönderime sokabilir mi (lider seçimi kapalıysa alım açıldığı andan itibaren)"""
+    return intake_open and (leader is None or leader.is_leader)
+
+def start_intake():
+    """Mesaj alımını aç; gap takibi ve periyodik catch_up sadece alım yapan process'te çalışır"""
+    global intake_open, intake_tasks_started
+    intake_open = True
+    metric_leader.set(1)
+    if not intake_tasks_started:
+        intake_tasks_started = True
+        asyncio.create_task(update_engine.run())
+        asyncio.create_task(periodic_catch_up())
+
+def leader_state() -> dict:
+    """Devralan process'e bırakılan durum: kanal bazlı son mesaj id'si ve pts"""
+    return {
+        "last_seen": {str(ch): msg_id for ch, msg_id in last_seen_message_ids.items()},
+        "pts": {str(ch): state.pts for ch, state in update_engine.channels.items() if state.pts is not None},
+    }
+
+def inherit_leader_state(state) -> int:
+    """Önceki liderin kaldığı yerden devam et; devralınan kanal sayısı"""
+    last_seen = {int(ch): msg_id for ch, msg_id in ((state or {}).get("last_seen") or {}).items()}
+    pts = {int(ch): value for ch, value in ((state or {}).get("pts") or {}).items()}
+    for channel_id, msg_id in last_seen.items():
+        if msg_id > last_seen_message_ids.get(channel_id, 0):
+            last_seen_message_ids[channel_id] = msg_id
+    # Yedeğin kendi pts'i (başlangıçtaki) eskidir: liderin pts'inden difference çekilir,
+    # durum yoksa güncel pts alınır (eski mesajlar tekrar işlenmez)
+    for channel_id in list(update_engine.channels):
+        update_engine.set_pts(channel_id, pts.get(channel_id))
+    return len(pts)
+
+async def on_leader_promoted(epoch: int, state):
+    started = time.monotonic()
+    inherited = inherit_leader_state(state)
+    # Önceki liderin son gönderdiği kodlar tekrar gönderilmesin
+    try:
+        await sent_codes.restore()
+    except Exception as e:
+        log_warning(f"Gönderilmiş kodlar yüklenemedi: {e}")
+    await restore_target_health()
+
+    start_intake()
+    asyncio.create_task(update_engine.fetch_all())
+    if outbox is not None:
+        asyncio.create_task(replay_outbox_after(LEADER_REPLAY_DELAY))
+    log_success("LİDERLİK ALINDI | %s | epoch %d | Alım %.0f ms'de açıldı | Devralınan kanal durumu: %d",
+                LEADER_NAME, epoch, (time.monotonic() - started) * 1000, inherited, epoch=epoch)
+
+def on_leader_demoted(reason: str):
+    global intake_open
+    intake_open = False
+    metric_leader.set(0)
+    # Kuyruktaki kodlar bu process'ten gönderilmez (kalıcı kayda yazılmadılar: yeni lider
+    # devraldığı pts'ten tekrar işler). Gönderimdekiler deliver_recorded'da fencing'e takılır
+    dropped = code_queue.clear()
+    for item in dropped:
+        sent_codes.discard(item[0])
+    metric_code_queue.set(0)
+    log_error("LİDERLİK KAYBEDİLDİ | %s | Mesaj alımı durduruldu, kuyruktan %d kod bırakıldı, yedekte bekleniyor",
+              reason, len(dropped))
+
+def on_leader_error(error: Exception):
+    log_warning(f"Lider seçimi bağlantı hatası: {error}")
+
+async def replay_outbox_after(delay: float):
+    # Önceki liderin kapanırken bitirdiği gönderimler pending görünmesin
+    await asyncio.sleep(delay)
+    if accepting_messages():
+        await replay_outbox()
+
+async def hand_over_leadership():
+    """Kapanışta: alımı durdur, gönderilmiş kodları yaz, son durumla lock'u bırak"""
+    global intake_open
+    intake_open = False
+    was_leader = leader.epoch is not None
+    try:
+        await sent_codes.join()
+        await leader.release(leader_state())
+        if was_leader:
+            log_info("👋 Liderlik bırakıldı, yedek devralabilir")
+    except Exception as e:
+        log_warning(f"Liderlik temiz devredilemedi (lock bağlantıyla birlikte düşer): {e}")
+
+leader = LeaderElection(
+    DATABASE_URL,
+    LEADER_NAME,
+    poll_interval=LEADER_POLL_INTERVAL,
+    heartbeat_interval=LEADER_HEARTBEAT_INTERVAL,
+    lease=LEADER_LEASE,
+    state_max_age=LEADER_STATE_MAX_AGE,
+    on_promote=on_leader_promoted,
+    on_demote=on_leader_demoted,
+    get_state=leader_state,
+    on_error=on_leader_error,
+) if LEADER_ELECTION else None
 
 # ══════════════════════════════════════════════════════════════════════════════
 # KEEP ALIVE
@@ -622,12 +1593,9 @@ async def keep_alive():
     while True:
         try:
             await client.get_me()
-            maybe_refresh_cache()
+            await maybe_refresh_cache()
 
-            now = time.time()
-            expired = [k for k, v in sent_codes.items() if now - v > CODE_TTL]
-            for k in expired:
-                del sent_codes[k]
+            sent_codes.expire()
 
         except Exception as e:
             log_warning(f"Keep-alive hatası: {e}")
@@ -638,40 +1606,174 @@ async def keep_alive():
 # BAŞLANGIÇ
 # ══════════════════════════════════════════════════════════════════════════════
 
+async def load_startup_state():
+    """Telegram bağlantısını beklemeyen yüklemeler: hedef cache, gönderilmiş kodlar, kaynak listesi"""
+    # İlk cache_version'ı yükle
+    await check_cache_version()
+    await load_target_channels()
+
+    try:
+        restored = await sent_codes.restore()
+        log_info(f"♻️ Son {CODE_TTL} sn içinde gönderilen {restored} kod yüklendi ({DEDUPE_STORE})")
+    except Exception as e:
+        log_warning(f"Gönderilmiş kodlar yüklenemedi: {e}")
+
+    await restore_target_health()
+
+    try:
+        return await db.run_async(fetch_sources)
+    except Exception as e:
+        log_warning(f"Kaynak listesi DB'den okunamadı: {e}")
+        return None
+
 async def main():
+    metrics_server = None
     try:
         log_info("=" * 60)
         log_info("🤖 TELEGRAM KOD BOTU BAŞLATILIYOR")
         log_info("=" * 60)
+        started = time.monotonic()
+
+        # Heroku SIGTERM ile durdurur: finally çalışsın (kuyruklar yazılır, liderlik devredilir)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(client.disconnect()))
+
+        # DB yüklemesi Telegram bağlantısıyla paralel yürür
+        cached = entity_cache.load() if entity_cache is not None else {}
+        startup_state = asyncio.create_task(load_startup_state())
+        extra_sessions = asyncio.gather(*[start_extra_session(name, c) for name, c in list(extra_clients.items())])
 
         await client.start()
         log_success("Telegram client bağlandı")
 
-        await check_channel_access()
+        fetched = await startup_state
+        await extra_sessions
+        seeded = seed_cached_entities(cached)
+        # Cache'te olan kanallar beklenmez, sadece yeni kanallar burada çözümlenir
+        await load_sources(fetched)
 
-        # İlk cache_version'ı yükle
-        check_cache_version()
-        load_target_channels()
+        delivery_scheduler.start()
+        sender_pool.start()
         setup_handler()
+        if leader is None:
+            start_intake()
+        log_info(f"⏱️ Handler {time.monotonic() - started:.2f} sn'de hazır ({len(seeded)} kanal entity cache'ten)")
+
+        if seeded:
+            asyncio.create_task(verify_cached_channels(seeded))
+        else:
+            save_entity_cache()
+        await transport.warm(warm_url())
+        log_info(f"🔌 Bot API: {'HTTP/2' if transport.http2 else 'HTTP/1.1'} | Bağlantı havuzu: {transport.size}")
+
+        if shard_ring is not None:
+            for shard in range(SHARD_COUNT):
+                asyncio.create_task(supervise_worker(shard))
+            log_info(f"🧩 Sharding: {SHARD_COUNT} gönderici worker ({SHARD_SOCKET_DIR})")
+
+        if outbox is not None:
+            asyncio.create_task(outbox.run(on_outbox_error))
+            if leader is None:
+                asyncio.create_task(replay_outbox())
+        if delivery_audit is not None:
+            asyncio.create_task(delivery_audit.run(on_delivery_log_error))
 
         log_info("=" * 60)
-        log_info("✅ BOT HAZIR - DİNLEME BAŞLADI")
+        if leader is None:
+            log_info("✅ BOT HAZIR - DİNLEME BAŞLADI")
+        else:
+            log_info(f"🟡 BOT HAZIR - YEDEK ({LEADER_NAME}): liderlik bekleniyor")
         log_info(f"📡 Dinlenen kaynak kanal: {len(channel_entities)}")
-        log_info(f"📤 Hedef user-channel sayısı: {len(user_channel_cache)}")
+        log_info(f"📤 Hedef user-channel sayısı: {len(user_channel_rows)}")
         log_info("=" * 60)
 
         asyncio.create_task(keep_alive())
-        asyncio.create_task(aggressive_polling())
-        asyncio.create_task(periodic_catch_up())
+        asyncio.create_task(cache_listener())
+        asyncio.create_task(monitor_loop_lag(metric_loop_lag, metric_loop_lag_last))
+        asyncio.create_task(success_log.run())
+        asyncio.create_task(transport.keep_warm(warm_url, WARM_INTERVAL))
+        asyncio.create_task(flush_target_health_periodically())
+        asyncio.create_task(coalescer.run())
+        if entity_cache is not None:
+            asyncio.create_task(save_entity_cache_periodically())
+        if METRICS_LOG_INTERVAL:
+            asyncio.create_task(log_metrics_periodically())
+        if METRICS_PORT:
+            metrics_server = await metrics.serve("0.0.0.0", METRICS_PORT)
+            log_info(f"📈 Metrik endpoint: http://0.0.0.0:{METRICS_PORT}/metrics")
+        # Her şey ısındıktan sonra lock denenir: devralınca sadece alım açılır
+        if leader is not None:
+            asyncio.create_task(leader.run())
 
         await client.run_until_disconnected()
 
     except Exception as e:
         log_error(f"Bot kritik hatası: {e}")
     finally:
-        await http_client.aclose()
+        # Önce alım kapatılır ve kuyruktaki kodlar gönderilir (worker'lar ve liderlik bu sırada bırakılmaz)
+        await drain_code_queue()
+        await coalescer.drain()
+        if metrics_server is not None:
+            metrics_server.close()
+        if leader is not None:
+            await hand_over_leadership()
+        stop_workers()
+        save_entity_cache()
+        await delivery_scheduler.stop()
+        await transport.aclose()
         await client.disconnect()
+        for extra in extra_clients.values():
+            await extra.disconnect()
+        if outbox is not None:
+            try:
+                await outbox.flush()
+            except Exception as e:
+                log_warning(f"Outbox son yazımı başarısız: {e}")
+        if delivery_audit is not None:
+            try:
+                await delivery_audit.flush()
+            except Exception as e:
+                log_warning(f"Teslimat logu son yazımı başarısız: {e}")
+        try:
+            changes = target_health.drain_changes()
+            if changes:
+                await db.run_async(write_target_health, changes)
+        except Exception as e:
+            log_warning(f"Hedef sağlık durumu yazılamadı: {e}")
+        db.close()
+        success_log.flush()
         log_info("Bot kapatıldı")
+        log_listener.stop()
+
+async def run_sender_worker():
+    """SHARD_ROLE=worker: Telegram dinlemez, listener'dan gelen hedefleri gönderir"""
+    path = socket_path(SHARD_SOCKET_DIR, SHARD_INDEX)
+    server = metrics_server = None
+    try:
+        delivery_scheduler.start()
+        server = await serve_shard(path, deliver_local)
+        await transport.warm(warm_url())
+        asyncio.create_task(transport.keep_warm(warm_url, WARM_INTERVAL))
+        log_info(f"📮 Gönderici worker {SHARD_INDEX} hazır: {path}")
+
+        asyncio.create_task(monitor_loop_lag(metric_loop_lag, metric_loop_lag_last))
+        asyncio.create_task(success_log.run())
+        if METRICS_PORT:
+            metrics_server = await metrics.serve("0.0.0.0", METRICS_PORT + 1 + SHARD_INDEX)
+
+        await server.serve_forever()
+
+    except Exception as e:
+        log_error(f"Worker {SHARD_INDEX} kritik hatası: {e}")
+    finally:
+        if server is not None:
+            server.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await delivery_scheduler.stop()
+        await transport.aclose()
+        success_log.flush()
+        log_info(f"Gönderici worker {SHARD_INDEX} kapatıldı")
+        log_listener.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run_sender_worker() if SHARD_ROLE == "worker" else main())
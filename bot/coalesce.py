@@ -0,0 +1,113 @@
+"""
+Patlama Birleştirme - Kısa pencerede aynı hedefe giden kodlar tek mesajda
+- Promo fırtınasında farklı kaynaklar birkaç yüz ms içinde farklı kodlar atar;
+  her kod için hedef başına ayrı sendMessage yerine pencere içindeki kodlar
+  hedef başına tek mesajda birleştirilir (her kod kendi linkiyle)
+- Pencere hedefin ilk kodu geldiğinde açılır, süresi kiracıya (kullanıcıya) göre verilir
+- Mesaj en fazla `max_codes` kod / `max_length` karakter olur; dolunca hemen gönderilir
+- Vakti gelen hedefler tek seferde boşaltılır; aynı kod kombinasyonunu alan
+  hedefler birlikte gönderilir
+- Kalıcılık bu sınıfta yok: bot.py hedefi pencereye koymadan önce outbox'a kod bazında
+  kaydeder, pencere dolmadan process düşerse hedef replay ile gönderilir
+"""
+
+import asyncio
+import time
+
+# Birleştirilmiş mesajda kod blokları arası ayraç (MarkdownV2'de kaçış gerektirmez)
+SEPARATOR = "\n\n"
+
+class PendingTarget:
+    __slots__ = ("deadline", "items", "length")
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.items = []  # [(code, text, intake_at), ...]
+        self.length = 0
+
+class Coalescer:
+    """Hedef bazlı birleştirme penceresi
+
+    flush_func(batch) -> coroutine; batch: [(chat_id, [(code, text, intake_at), ...]), ...]
+    """
+
+    def __init__(self, flush_func, max_codes: int = 10, max_length: int = 4000, on_error=None):
+        self.flush_func = flush_func
+        self.max_codes = max_codes
+        self.max_length = max_length
+        self.on_error = on_error
+        self.pending = {}  # chat_id -> PendingTarget
+        self._wakeup = asyncio.Event()
+        self._tasks = set()
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def add(self, chat_id: int, code: str, text: str, window: float, intake_at: float = None, now: float = None):
+        now = time.monotonic() if now is None else now
+        target = self.pending.get(chat_id)
+        if target is not None and (len(target.items) >= self.max_codes
+                                   or target.length + len(SEPARATOR) + len(text) > self.max_length):
+            # Mesaj doldu: bekleyenleri hemen gönder, yeni kod yeni pencere açar
+            self._dispatch([(chat_id, self.pending.pop(chat_id).items)])
+            target = None
+        if target is None:
+            target = self.pending[chat_id] = PendingTarget(now + window)
+            self._wakeup.set()
+        elif target.items:
+            target.length += len(SEPARATOR)
+        target.items.append((code, text, now if intake_at is None else intake_at))
+        target.length += len(text)
+
+    def _dispatch(self, batch: list):
+        task = asyncio.create_task(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: list):
+        try:
+            await self.flush_func(batch)
+        except Exception as e:
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def flush_due(self, now: float = None) -> int:
+        """Vakti gelen hedefleri gönder; gönderilen hedef sayısı"""
+        now = time.monotonic() if now is None else now
+        due = [chat_id for chat_id, target in self.pending.items() if target.deadline <= now]
+        if due:
+            self._dispatch([(chat_id, self.pending.pop(chat_id).items) for chat_id in due])
+        return len(due)
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            if self.pending:
+                sleep_for = min(target.deadline for target in self.pending.values()) - time.monotonic()
+                if sleep_for > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), sleep_for)
+                    except asyncio.TimeoutError:
+                        pass
+                self.flush_due()
+            else:
+                await self._wakeup.wait()
+
+    async def join(self):
+        """Bekleyen pencereler dolup gönderimler bitene kadar bekle (benchmark / test)"""
+        while self.pending or self._tasks:
+            if self._tasks:
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+            else:
+                await asyncio.sleep(0.01)
+
+    async def drain(self):
+        """Bekleyen tüm hedefleri hemen gönder ve gönderimlerin bitmesini bekle"""
+        if self.pending:
+            self._dispatch([(chat_id, target.items) for chat_id, target in self.pending.items()])
+            self.pending = {}
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+def merge_texts(items: list) -> str:
+    return SEPARATOR.join(text for _, text, _ in items)
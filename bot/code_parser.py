@@ -0,0 +1,106 @@
+"""
+Kod/Link Ayrıştırıcı - process_message için tek geçişli format kontrolü
+- FORMAT 1: anahtar_kelime\\nkod\\nlink
+- FORMAT 2: kod\\nlink
+- Ön filtre (quick_reject): kesin uymayan mesajları tam ayrıştırmadan eler
+"""
+
+import re
+
+# Desenler modül yüklenirken bir kez derlenir
+LINK_RE = re.compile(
+    r'^(?:https?://)?(?:www\.)?[a-zA-Z0-9][-a-zA-Z0-9]*(?:\.[a-zA-Z0-9][-a-zA-Z0-9]*)+(?:/[^\s]*)?$',
+    re.IGNORECASE
+)
+CODE_RE = re.compile(r'^[\wÇçĞğİıÖöŞşÜü-]+$')
+
+# Ön filtre ret nedenleri (kanal bazlı sayaç etiketi olarak kullanılır)
+REJECT_SHORT = "short"
+REJECT_NO_DOT = "no_dot"
+REJECT_SINGLE_LINE = "single_line"
+REJECT_FIRST_LINE = "first_line"
+REJECT_FORMAT = "format"
+
+MIN_MESSAGE_LENGTH = 5  # En kısa geçerli mesaj: "k\na.b"
+
+class ParsedCode:
+    __slots__ = ("code", "link", "format_type")
+
+    def __init__(self, code: str, link: str, format_type: str):
+        self.code = code
+        self.link = link
+        self.format_type = format_type
+
+    def __repr__(self):
+        return f"ParsedCode(code={self.code!r}, link={self.link!r}, format_type={self.format_type!r})"
+
+def first_lines(text: str, limit: int = 3) -> list:
+    """Boş olmayan ilk `limit` satırı (strip edilmiş) döndür, gerisini okumadan dur"""
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            lines.append(line)
+            if len(lines) == limit:
+                break
+    return lines
+
+def quick_reject(text: str, keywords=frozenset()):
+    """parse_message'ın kesin reddedeceği mesajları ucuz kontrollerle ele
+
+    Ret nedenini, karar verilemiyorsa None döndürür. Yanlış ret yapmaz:
+    None dönen her mesaj yine parse_message'tan geçmelidir.
+    """
+    if len(text) < MIN_MESSAGE_LENGTH:
+        return REJECT_SHORT
+    # Link en az bir nokta içerir
+    if "." not in text:
+        return REJECT_NO_DOT
+
+    # İlk boş olmayan satırı bütün metni bölmeden bul
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        line = (text[start:] if end == -1 else text[start:end]).strip()
+        if line:
+            break
+        if end == -1:
+            return REJECT_SHORT
+        start = end + 1
+
+    # \r, \u2028 vb. başka satır ayırıcılar varsa karar tam ayrıştırmaya kalır
+    if not line.isprintable():
+        return None
+    if end == -1:
+        return REJECT_SINGLE_LINE
+
+    # Boşluklu ilk satır sadece anahtar kelime ise FORMAT-1 olabilir,
+    # kod olamaz (FORMAT-2): ikisi de değilse mesaj uymaz
+    if (" " in line or "\t" in line) and line.lower() not in keywords:
+        return REJECT_FIRST_LINE
+    return None
+
+def parse_message(text: str, keywords=frozenset()):
+    """Mesajdan kod ve linki çıkar. Format uymuyorsa None döner."""
+    lines = first_lines(text)
+    if len(lines) < 2:
+        return None
+
+    # FORMAT 1: anahtar_kelime\nkod\nlink
+    if len(lines) == 3:
+        first_line = lines[0]
+        # Tek kelimelik ise direkt kabul et, yoksa KEYWORDS'de olmalı
+        is_single_word = ' ' not in first_line and '\t' not in first_line
+        if is_single_word or first_line.lower() in keywords:
+            code, link = lines[1], lines[2]
+            if CODE_RE.match(code) and LINK_RE.match(link):
+                if is_single_word:
+                    return ParsedCode(code, link, f"FORMAT-1 (tek_kelime:{first_line}+kod+link)")
+                return ParsedCode(code, link, f"FORMAT-1 (keyword:{first_line}+kod+link)")
+
+    # FORMAT 2: kod\nlink
+    code, link = lines[0], lines[1]
+    if CODE_RE.match(code) and LINK_RE.match(link):
+        return ParsedCode(code, link, "FORMAT-2 (kod+link)")
+
+    return None
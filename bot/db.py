@@ -0,0 +1,116 @@
+"""
+Veritabanı Katmanı - event loop'u bloklamayan psycopg2 havuzu
+- Kalıcı bağlantılar (ThreadedConnectionPool), her sorguda yeni bağlantı yok
+- Sorgular sınırlı bir thread havuzunda çalışır, loop sadece sonucu bekler
+- Kopan bağlantı (Neon idle timeout vb.) atılır ve sorgu bir kez tekrar denenir
+- LISTEN bildirimleri loop üzerinde add_reader ile okunur
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.pool
+
+# Uzun ömürlü bağlantılarda sessizce kopan TCP'yi ~1 dakikada fark et
+KEEPALIVE_OPTIONS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+class Database:
+    def __init__(self, dsn: str, max_connections: int = 2, connect_timeout: int = 10):
+        self.dsn = dsn
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="db")
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        # Havuz ilk sorguda (thread içinde) kurulur, import sırasında bağlantı açılmaz
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    0,
+                    self.max_connections,
+                    self.dsn,
+                    connect_timeout=self.connect_timeout,
+                    **KEEPALIVE_OPTIONS,
+                )
+            return self._pool
+
+    def run(self, func, *args):
+        """func(cursor, *args) çağrısını havuzdan alınan bağlantıyla çalıştır (senkron)"""
+        pool = self._get_pool()
+        for attempt in range(2):
+            conn = pool.getconn()
+            broken = False
+            try:
+                if conn.closed:
+                    broken = True
+                    continue
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    return func(cursor, *args)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                if attempt:
+                    raise
+            finally:
+                pool.putconn(conn, close=broken)
+        raise psycopg2.OperationalError("Veritabanı bağlantısı kurulamadı")
+
+    async def run_async(self, func, *args):
+        """run() çağrısını thread havuzunda çalıştır, event loop'u bloklama"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.run, func, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def _listen_connection(self, channel: str):
+        conn = psycopg2.connect(
+            self.dsn,
+            connect_timeout=self.connect_timeout,
+            **KEEPALIVE_OPTIONS,
+        )
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {channel}")
+        return conn
+
+    async def listen(self, channel: str, callback):
+        """LISTEN bağlantısı aç, bağlantı kopana kadar her bildirimi callback(payload) ile ilet
+
+        Bağlantı sadece okunabilir olduğunda (add_reader) poll edilir, loop hiç beklemez.
+        Bağlantı koptuğunda istisna fırlatır; yeniden bağlanmak çağıranın işidir.
+        """
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(self.executor, self._listen_connection, channel)
+        closed = loop.create_future()
+
+        def on_readable():
+            try:
+                conn.poll()
+            except Exception as e:
+                if not closed.done():
+                    closed.set_exception(e)
+                return
+            while conn.notifies:
+                callback(conn.notifies.pop(0).payload)
+
+        fd = conn.fileno()
+        loop.add_reader(fd, on_readable)
+        try:
+            await closed
+        finally:
+            loop.remove_reader(fd)
+            conn.close()
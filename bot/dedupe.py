@@ -0,0 +1,195 @@
+"""
+Gönderilmiş Kod Deposu - tekrar gönderimi engeller, restart sonrası da hatırlar
+- OrderedDict eklenme sırasıyla tutulur: süresi dolanlar baştan O(1) ile atılır
+- max_entries ile sert bellek sınırı (doluysa en eski kod atılır)
+- İsteğe bağlı kalıcılık: yerel append-only dosya veya Postgres sent_codes tablosu
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+class SentCodeStore:
+    __slots__ = ("ttl", "max_entries", "journal", "_codes")
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 50000, journal=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.journal = journal
+        self._codes = OrderedDict()  # code -> gönderim zamanı (eskiden yeniye)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def expire(self, now: float = None):
+        """Süresi dolan kodları baştan at (sadece dolanlar kadar iş)"""
+        cutoff = (time.time() if now is None else now) - self.ttl
+        codes = self._codes
+        while codes:
+            code, sent_at = next(iter(codes.items()))
+            if sent_at > cutoff:
+                break
+            codes.popitem(last=False)
+
+    def contains(self, code: str) -> bool:
+        now = time.time()
+        self.expire(now)
+        return code in self._codes
+
+    def add(self, code: str, sent_at: float = None, persist: bool = True):
+        sent_at = time.time() if sent_at is None else sent_at
+        codes = self._codes
+        if code in codes:
+            codes.move_to_end(code)
+        codes[code] = sent_at
+        while len(codes) > self.max_entries:
+            codes.popitem(last=False)
+        if persist:
+            self.persist(code)
+
+    def discard(self, code: str):
+        """Bellekteki işareti kaldır (gönderilmeden bırakılan, kalıcı kayda yazılmamış kod)"""
+        self._codes.pop(code, None)
+
+    def persist(self, code: str):
+        """Bellekte işaretlenmiş kodu kalıcı kayda yaz (add(..., persist=False) sonrası)"""
+        sent_at = self._codes.get(code)
+        if sent_at is not None and self.journal is not None:
+            self.journal.append(code, sent_at)
+            if self.journal.needs_compaction(len(self._codes)):
+                self.journal.compact(self._codes.items())
+
+    async def restore(self) -> int:
+        """Kalıcı kayıttan son TTL içindeki kodları yükle"""
+        if self.journal is None:
+            return 0
+        since = time.time() - self.ttl
+        entries = await self.journal.load(since)
+        for code, sent_at in sorted(entries, key=lambda e: e[1]):
+            if sent_at > since:
+                self.add(code, sent_at, persist=False)
+        return len(self._codes)
+
+    async def join(self):
+        """Kalıcı kayda bekleyen yazımların bitmesini bekle (kapanış / liderlik devri)"""
+        if self.journal is not None:
+            await self.journal.join()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# KALICI KAYIT (JOURNAL)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class FileJournal:
+    """Yerel append-only dosya: her satır "zaman<TAB>kod"
+
+    Dosya canlı kayıt sayısının `compact_ratio` katını geçince sadece
+    canlı kodlarla yeniden yazılır (atomic rename).
+    """
+
+    def __init__(self, path: str, compact_ratio: int = 4, min_compact_lines: int = 10000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact_lines = min_compact_lines
+        self._lines = 0
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        return self._file
+
+    async def load(self, since: float) -> list:
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                self._lines += 1
+                sent_at, _, code = line.rstrip("\n").partition("\t")
+                try:
+                    sent_at = float(sent_at)
+                except ValueError:
+                    continue
+                if code and sent_at > since:
+                    entries.append((code, sent_at))
+        return entries
+
+    def append(self, code: str, sent_at: float):
+        self._open().write(f"{sent_at:.3f}\t{code}\n")
+        self._lines += 1
+
+    def needs_compaction(self, live_count: int) -> bool:
+        return self._lines > max(self.min_compact_lines, live_count * self.compact_ratio)
+
+    def compact(self, entries):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            lines = 0
+            for code, sent_at in entries:
+                f.write(f"{sent_at:.3f}\t{code}\n")
+                lines += 1
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp_path, self.path)
+        self._lines = lines
+
+    async def join(self):
+        # Satırlar yazıldığı anda dosyada (line buffering)
+        return
+
+class DatabaseJournal:
+    """Postgres sent_codes tablosu - dyno restart'larında da korunur
+
+    Yazmalar DB thread havuzunda arka planda yapılır, gönderimi bekletmez.
+    Eski satırlar her `prune_every` yazmada bir silinir.
+    """
+
+    def __init__(self, db, ttl: float = 3600, prune_every: int = 500):
+        self.db = db
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = 0
+        self._tasks = set()
+        self.failed_writes = 0
+
+    async def load(self, since: float) -> list:
+        def fetch(cursor):
+            cursor.execute(
+                "SELECT code, EXTRACT(EPOCH FROM sent_at) FROM sent_codes WHERE sent_at > to_timestamp(%s)",
+                (since,)
+            )
+            return [(code, float(sent_at)) for code, sent_at in cursor.fetchall()]
+        return await self.db.run_async(fetch)
+
+    def append(self, code: str, sent_at: float):
+        self._writes += 1
+        prune = self._writes % self.prune_every == 0
+
+        def write(cursor):
+            cursor.execute(
+                """
+                INSERT INTO sent_codes (code, sent_at) VALUES (%s, to_timestamp(%s))
+                ON CONFLICT (code) DO UPDATE SET sent_at = EXCLUDED.sent_at
+                """,
+                (code, sent_at)
+            )
+            if prune:
+                cursor.execute("DELETE FROM sent_codes WHERE sent_at < to_timestamp(%s)", (sent_at - self.ttl,))
+
+        task = asyncio.get_running_loop().create_task(self.db.run_async(write))
+        self._tasks.add(task)
+        task.add_done_callback(self._write_done)
+
+    def needs_compaction(self, live_count: int) -> bool:
+        return False
+
+    async def join(self):
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _write_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.failed_writes += 1
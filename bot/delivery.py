@@ -0,0 +1,217 @@
+"""
+Teslimat Zamanlayıcı - Bot API rate limit'lerine uyumlu gönderim
+- Global token bucket + kanal bazlı token bucket
+- 429 "Too Many Requests" -> parameters.retry_after kadar bekle, tekrar dene
+- Geçici hatalarda (5xx, ağ hatası) exponential backoff ile tekrar dene
+- Kuyruk deadline'a göre sıralı (en acil teslimat önce)
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TOKEN BUCKET
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TokenBucket:
+    """Saniyede `rate` token dolan, en fazla `capacity` token tutan kova"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Bir token alınabilmesi için beklenmesi gereken süre (0 = hemen)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TESLİMAT İŞİ
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DeliveryJob:
+    __slots__ = ("chat_id", "text", "code", "deadline", "enqueued_at", "attempts", "future")
+
+    def __init__(self, chat_id: int, text: str, code: str, deadline: float, enqueued_at: float, future):
+        self.chat_id = chat_id
+        self.text = text
+        self.code = code
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.future = future
+
+def is_transient_error(result: dict) -> bool:
+    """Tekrar denenebilir hata mı? (ağ hatası veya Bot API 5xx)"""
+    error_code = result.get("error_code")
+    return error_code is None or error_code >= 500
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ZAMANLAYICI
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DeliveryScheduler:
+    """Gönderim işlerini rate limit'e uygun şekilde sıraya koyar ve gönderir.
+
+    send_func(chat_id, text, code) -> dict şeklinde olmalı. Dönen dict
+    "success", "error_code" ve (429 için) "retry_after" alanlarını taşır.
+    submit() her iş için bir Future döner; sonuç dict'ine "attempts" ve
+    "latency" (kuyruğa girişten sonuca kadar geçen saniye) eklenir.
+    """
+
+    def __init__(
+        self,
+        send_func,
+        global_rate: float = 30,
+        global_burst: float = 30,
+        chat_rate: float = 20 / 60,
+        chat_burst: float = 3,
+        concurrency: int = 50,
+        deadline: float = 10.0,
+        max_attempts: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.send_func = send_func
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chat_buckets = {}  # chat_id -> TokenBucket
+        self.chat_blocked_until = {}  # chat_id -> monotonic (429 retry_after)
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._ready = []  # (deadline, seq, job)
+        self._delayed = []  # (ready_at, seq, job)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._semaphore = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def pending(self) -> int:
+        return len(self._ready) + len(self._delayed)
+
+    def submit(self, chat_id: int, text: str, code: str, deadline: float = None) -> asyncio.Future:
+        now = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        job = DeliveryJob(chat_id, text, code, now + (deadline or self.deadline), now, future)
+        heapq.heappush(self._ready, (job.deadline, next(self._seq), job))
+        self._wakeup.set()
+        return future
+
+    def _defer(self, job: DeliveryJob, ready_at: float):
+        heapq.heappush(self._delayed, (ready_at, next(self._seq), job))
+        self._wakeup.set()
+
+    def _chat_wait(self, chat_id: int, now: float) -> float:
+        blocked_until = self.chat_blocked_until.get(chat_id)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return blocked_until - now
+            del self.chat_blocked_until[chat_id]
+
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, now)
+        return bucket.wait_time(now)
+
+    async def _dispatch(self):
+        while True:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, seq, job = heapq.heappop(self._delayed)
+                heapq.heappush(self._ready, (job.deadline, seq, job))
+
+            if not self._ready:
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, seq, job = heapq.heappop(self._ready)
+
+            # Kanal limiti doluysa işi kanal müsait olana kadar ertele
+            chat_wait = self._chat_wait(job.chat_id, now)
+            if chat_wait > 0:
+                self._defer(job, now + chat_wait)
+                continue
+
+            # Global limit doluysa işi geri koy ve token dolana kadar bekle
+            global_wait = self.global_bucket.wait_time(now)
+            if global_wait > 0:
+                heapq.heappush(self._ready, (job.deadline, seq, job))
+                await asyncio.sleep(global_wait)
+                continue
+
+            await self._semaphore.acquire()
+            now = time.monotonic()
+            self.global_bucket.take(now)
+            self.chat_buckets[job.chat_id].take(now)
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job: DeliveryJob):
+        try:
+            job.attempts += 1
+            try:
+                result = await self.send_func(job.chat_id, job.text, job.code)
+            except Exception as e:
+                result = {"success": False, "chat_id": job.chat_id, "error": str(e), "error_code": None}
+
+            if not result.get("success") and job.attempts < self.max_attempts:
+                now = time.monotonic()
+                retry_after = result.get("retry_after")
+                if retry_after:
+                    # 429: kanal retry_after süresince kilitli, iş o süre sonra tekrar denenir
+                    ready_at = now + retry_after
+                    self.chat_blocked_until[job.chat_id] = max(self.chat_blocked_until.get(job.chat_id, 0), ready_at)
+                    self._defer(job, ready_at)
+                    return
+                if is_transient_error(result):
+                    backoff = min(self.max_backoff, self.base_backoff * (2 ** (job.attempts - 1)))
+                    self._defer(job, now + backoff * random.uniform(0.5, 1.0))
+                    return
+
+            result["attempts"] = job.attempts
+            result["latency"] = time.monotonic() - job.enqueued_at
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._semaphore.release()
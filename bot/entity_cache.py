@@ -0,0 +1,51 @@
+"""
+Kaynak Kanal Entity Cache'i - Soğuk başlangıcı hızlandırır
+- Çözümlenmiş kaynak kanalların access_hash'i ve son görülen mesaj id'si yerel
+  JSON dosyasında tutulur
+- Restart'ta bu bilgilerle handler Telegram'a sormadan hemen kurulur;
+  kanallar arka planda yeniden doğrulanır
+- Dosya atomik yazılır (geçici dosya + rename); okunamazsa/bozuksa yok sayılır
+"""
+
+import json
+import os
+import time
+
+class EntityCache:
+    """channel_id -> (access_hash, last_seen_message_id)
+
+    max_age: bu süreden (saniye) eski dosya yok sayılır (kanal silinmiş/erişim
+    kaybolmuş olabilir, baştan çözümlemek daha güvenli)
+    """
+
+    def __init__(self, path: str, max_age: float = 7 * 86400):
+        self.path = path
+        self.max_age = max_age
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if time.time() - data.get("saved_at", 0) > self.max_age:
+                return {}
+            return {
+                int(channel_id): (int(entry["access_hash"]), int(entry.get("last_seen", 0)))
+                for channel_id, entry in data.get("channels", {}).items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def save(self, entries: dict):
+        data = {
+            "saved_at": time.time(),
+            "channels": {
+                str(channel_id): {"access_hash": access_hash, "last_seen": last_seen}
+                for channel_id, (access_hash, last_seen) in entries.items()
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
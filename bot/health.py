@@ -0,0 +1,138 @@
+"""
+Hedef Kanal Sağlığı - Bot API hatalarına göre circuit breaker
+- Kalıcı hatalar (chat not found, bot kanaldan atıldı, yazma yetkisi yok) hedefi
+  hemen karantinaya alır; geçici hatalar (ağ, 5xx) art arda `failure_threshold`
+  kez olursa karantina
+- Karantinadaki hedefe gönderim yapılmaz; `probe_interval` sonra bir sonraki kod
+  deneme (probe) olarak gönderilir. Başarılıysa hedef açılır, değilse bekleme
+  süresi ikiye katlanır (en fazla `max_probe_interval`)
+- 429 ve içerikten kaynaklanan hatalar (ör. metin parse hatası) hedef sağlığını etkilemez
+- Durum değişiklikleri (is_joined, join_error) DB'ye toplu yazılmak üzere biriktirilir
+"""
+
+import time
+
+# Hata sınıfları
+OK = "ok"
+PERMANENT = "permanent"
+TRANSIENT = "transient"
+IGNORED = "ignored"
+
+# Bot API açıklamalarında hedefin artık kullanılamadığını gösteren ifadeler (küçük harf)
+PERMANENT_ERRORS = (
+    "chat not found",
+    "bot was kicked",
+    "bot is not a member",
+    "bot was blocked",
+    "not enough rights",
+    "need administrator rights",
+    "have no rights to send",
+    "chat_write_forbidden",
+    "channel_private",
+    "peer_id_invalid",
+    "group chat was upgraded",
+    "chat was deleted",
+)
+
+def classify(result: dict) -> str:
+    """Gönderim sonucu dict'ini sınıflandır (send_message dönüşü)"""
+    if result.get("success"):
+        return OK
+    if result.get("outcome_unknown"):
+        # Gönderilip gönderilmediği bilinmiyor (shard cevabı kayboldu): hedefin hatası sayılmaz
+        return IGNORED
+    error_code = result.get("error_code")
+    if error_code == 429 or result.get("retry_after"):
+        return IGNORED
+    if error_code is None or error_code >= 500:
+        return TRANSIENT
+    description = (result.get("error") or "").lower()
+    if error_code == 403 or any(marker in description for marker in PERMANENT_ERRORS):
+        return PERMANENT
+    return IGNORED
+
+class TargetState:
+    __slots__ = ("failures", "open_until", "interval", "error")
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0  # 0 = kapalı devre (gönderim serbest)
+        self.interval = 0.0
+        self.error = None
+
+class TargetHealth:
+    """Hedef bazlı circuit breaker
+
+    allow(chat_id) gönderimden önce, record(chat_id, result) sonuçtan sonra çağrılır.
+    drain_changes() -> [(chat_id, is_joined, join_error), ...] (son yazımdan beri değişenler)
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        probe_interval: float = 60.0,
+        max_probe_interval: float = 3600.0,
+        probe_timeout: float = 30.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.probe_timeout = probe_timeout
+        self.states = {}  # chat_id -> TargetState (sadece hata görmüş hedefler)
+        self.joined = {}  # chat_id -> son bildirilen (is_joined, join_error)
+        self._changes = {}
+
+    @property
+    def quarantined(self) -> int:
+        return sum(1 for state in self.states.values() if state.open_until)
+
+    def is_quarantined(self, chat_id: int) -> bool:
+        state = self.states.get(chat_id)
+        return state is not None and bool(state.open_until)
+
+    def allow(self, chat_id: int, now: float = None) -> bool:
+        state = self.states.get(chat_id)
+        if state is None or not state.open_until:
+            return True
+        now = time.monotonic() if now is None else now
+        if now < state.open_until:
+            return False
+        # Yarı açık: tek bir deneme gönderimi; sonucu gelmezse probe_timeout sonra tekrar denenir
+        state.open_until = now + self.probe_timeout
+        return True
+
+    def quarantine(self, chat_id: int, error: str, now: float = None):
+        """Hedefi karantinaya al (ör. restart sonrası DB'deki join_error ile)"""
+        now = time.monotonic() if now is None else now
+        state = self.states.setdefault(chat_id, TargetState())
+        state.interval = min(self.max_probe_interval, state.interval * 2) if state.interval else self.probe_interval
+        state.open_until = now + state.interval
+        state.error = error
+        self._set_joined(chat_id, False, error)
+
+    def record(self, chat_id: int, result: dict, now: float = None) -> str:
+        """Gönderim sonucunu işle; hata sınıfını döner"""
+        kind = classify(result)
+        if kind == OK:
+            self.states.pop(chat_id, None)
+            self._set_joined(chat_id, True, None)
+        elif kind == PERMANENT:
+            self.quarantine(chat_id, result.get("error"), now)
+        elif kind == TRANSIENT:
+            state = self.states.setdefault(chat_id, TargetState())
+            state.failures += 1
+            # Yarı açık denemesi başarısızsa veya eşik aşıldıysa karantina
+            if state.open_until or state.failures >= self.failure_threshold:
+                self.quarantine(chat_id, result.get("error"), now)
+        return kind
+
+    def _set_joined(self, chat_id: int, joined: bool, error):
+        # Aynı durum tekrar yazılmaz (her başarılı gönderimde veya her başarısız denemede)
+        if self.joined.get(chat_id) == (joined, error):
+            return
+        self.joined[chat_id] = (joined, error)
+        self._changes[chat_id] = (joined, error)
+
+    def drain_changes(self) -> list:
+        changes, self._changes = self._changes, {}
+        return [(chat_id, joined, error) for chat_id, (joined, error) in changes.items()]
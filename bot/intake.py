@@ -0,0 +1,73 @@
+"""
+Çoklu Oturum Alımı - Aynı kaynak kanalları birden fazla Telegram oturumu dinler
+- Her mesaj (channel_id, message_id) ile anahtarlanır: ilk gelen kopya işlenir,
+  diğer oturumlardan gelen kopyalar tek sözlük kontrolüyle atılır
+- Oturum bazlı istatistik: kaç mesajı ilk getirdi, geç kopyalar ilk kopyadan
+  ne kadar sonra geldi (en hızlı oturumu görmek için)
+"""
+
+import time
+from collections import OrderedDict
+
+from metrics import Histogram
+
+# Oturumlar arası fark genelde ms - birkaç sn mertebesinde
+LAG_BUCKETS = (0.0, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class SessionStats:
+    __slots__ = ("first", "late", "lag")
+
+    def __init__(self, name: str):
+        self.first = 0  # ilk gelen kopya bu oturumdan
+        self.late = 0   # başka oturum önce getirmiş
+        self.lag = Histogram(f"session_lag_{name}", "", LAG_BUCKETS)  # sadece geç kopyalar: ilk kopyadan sonra geçen süre
+
+class ArrivalTracker:
+    """(channel_id, message_id) için ilk varışı kaydeder
+
+    claim(session, channel_id, message_id) -> True: ilk kopya (işlenmeli), False: tekrar
+    Son `max_entries` mesaj hatırlanır; daha eski bir mesajın geç kopyası ilk kopya
+    sayılır (sonraki dedupe katmanları yine de yakalar).
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self.arrivals = OrderedDict()  # (channel_id, message_id) -> ilk varış (monotonic)
+        self.sessions = {}  # oturum adı -> SessionStats
+
+    def _stats(self, session: str) -> SessionStats:
+        stats = self.sessions.get(session)
+        if stats is None:
+            stats = self.sessions[session] = SessionStats(session)
+        return stats
+
+    def claim(self, session: str, channel_id: int, message_id: int, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        key = (channel_id, message_id)
+        first_at = self.arrivals.get(key)
+        stats = self._stats(session)
+
+        if first_at is not None:
+            stats.late += 1
+            stats.lag.observe(now - first_at)
+            return False
+
+        self.arrivals[key] = now
+        if len(self.arrivals) > self.max_entries:
+            self.arrivals.popitem(last=False)
+        stats.first += 1
+        return True
+
+    def summary(self) -> str:
+        """ "s0: ilk 120 geç 30 (geç p50/p99 12/80 ms) | ..." """
+        parts = []
+        for name, stats in sorted(self.sessions.items()):
+            total = stats.first + stats.late
+            if not total:
+                continue
+            lag = (
+                f" (geç p50/p99 {stats.lag.quantile(0.5) * 1000:.0f}/{stats.lag.quantile(0.99) * 1000:.0f} ms)"
+                if stats.late else ""
+            )
+            parts.append(f"{name}: ilk {stats.first} geç {stats.late}{lag}")
+        return " | ".join(parts) or "-"
@@ -0,0 +1,233 @@
+"""
+Lider Seçimi - Sıcak yedek (hot standby) için Postgres advisory lock
+- Aynı bottan iki process çalışır; sadece lock'u tutan (lider) mesaj alır ve gönderir
+- Yedek process bağlanır, kanalları çözümler, cache'leri ve bağlantı havuzunu ısıtır,
+  lock'u `poll_interval` aralıkla dener: lider ölünce/bıraktığında bir saniyenin altında devralır
+- Lock ayrı, kalıcı bir bağlantıda tutulur; process ölürse bağlantıyla birlikte lock da düşer
+- Fencing: her devralmada bot_leader.epoch artar, lider durumunu sadece kendi epoch'u geçerliyse
+  yazar. `lease` süresince heartbeat yazamayan lider kendini yedeğe düşürür; heartbeat'i
+  2 x lease eskimiş (donmuş) liderin bağlantısı yedek tarafından sonlandırılır
+- Lider son mesaj id'lerini / pts'leri heartbeat ile yazar, yeni lider buradan devam eder
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from db import KEEPALIVE_OPTIONS
+
+DEFAULT_LOCK_KEY = 73110001
+
+# Lock bağlantısında sunucu tarafı keepalive: host'u düşen liderin lock'u ~10 sn'de bırakılır
+LOCK_SESSION_SQL = "SET tcp_keepalives_idle = 5; SET tcp_keepalives_interval = 2; SET tcp_keepalives_count = 2"
+
+# Lock alınamadıysa: lock'u tutan process bot_leader'a kayıtlı lider mi ve heartbeat'i eskimiş mi?
+TRY_LOCK_SQL = """
+    SELECT pg_try_advisory_lock(%(key)s), (
+        SELECT l.pid FROM pg_locks l
+        JOIN bot_leader b ON b.id = 1 AND b.pid = l.pid
+        WHERE l.locktype = 'advisory' AND l.granted AND l.objsubid = 1
+          AND l.classid::bigint = %(classid)s AND l.objid::bigint = %(objid)s
+          AND b.heartbeat_at < now() - %(stale)s * interval '1 second'
+    )
+"""
+
+def lock_key_parts(key: int) -> tuple:
+    """bigint advisory lock anahtarının pg_locks'taki (classid, objid) karşılığı: üst ve alt 32 bit
+
+    Python'da hesaplanır: SQL'de int4 parametre üzerinde `>> 32` kaydırma yapılmaz (sonuç tanımsız)
+    """
+    return (key >> 32) & 0xFFFFFFFF, key & 0xFFFFFFFF
+
+class LeaderElection:
+    """bot_leader tablosu + pg_try_advisory_lock ile tek lider
+
+    on_promote(epoch, state) -> coroutine: liderlik alındığında çağrılır; state önceki
+    liderin son yazdığı durum (yoksa veya `state_max_age`'den eskiyse None)
+    on_demote(reason): lease/epoch kaybedilince çağrılır
+    get_state() -> dict: heartbeat ile yazılacak durum (JSON'a uygun)
+    on_error(exception): bağlantı/sorgu hatalarında çağrılır
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        holder: str,
+        lock_key: int = DEFAULT_LOCK_KEY,
+        poll_interval: float = 0.25,
+        heartbeat_interval: float = 1.0,
+        lease: float = 5.0,
+        state_max_age: float = 300,
+        connect_timeout: int = 10,
+        on_promote=None,
+        on_demote=None,
+        get_state=None,
+        on_error=None,
+    ):
+        self.dsn = dsn
+        self.holder = holder
+        self.lock_key = lock_key
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.lease = lease
+        self.state_max_age = state_max_age
+        self.connect_timeout = connect_timeout
+        self.on_promote = on_promote
+        self.on_demote = on_demote
+        self.get_state = get_state
+        self.on_error = on_error
+        self.epoch = None  # Lider iken kendi epoch'u
+        self.promotions = 0
+        self.terminated = 0  # Sonlandırılan donmuş lider bağlantısı
+        self._renewed_at = 0.0
+        self._conn = None
+        self._closed = False
+        # Lock bağlantısı tek thread'den kullanılır (DB havuzundan bağımsız)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leader")
+
+    @property
+    def is_leader(self) -> bool:
+        # Heartbeat lease içinde yenilenmediyse lider sayılmaz (yedek devralmış olabilir)
+        return self.epoch is not None and time.monotonic() - self._renewed_at < self.lease
+
+    async def _call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        if self._conn is None or self._conn.closed:
+            conn = psycopg2.connect(self.dsn, connect_timeout=self.connect_timeout, **KEEPALIVE_OPTIONS)
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(LOCK_SESSION_SQL)
+                cursor.execute("INSERT INTO bot_leader (id, epoch) VALUES (1, 0) ON CONFLICT (id) DO NOTHING")
+            self._conn = conn
+        return self._conn
+
+    def _close(self):
+        # Bağlantı kapanınca session lock'u da bırakılır
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _try_acquire(self):
+        """Lock alındıysa (epoch, önceki durum), alınamadıysa None"""
+        conn = self._connect()
+        with conn.cursor() as cursor:
+            classid, objid = lock_key_parts(self.lock_key)
+            cursor.execute(
+                TRY_LOCK_SQL,
+                {"key": self.lock_key, "classid": classid, "objid": objid, "stale": self.lease * 2}
+            )
+            acquired, stale_pid = cursor.fetchone()
+            if not acquired:
+                if stale_pid is not None:
+                    # Lock'u tutup heartbeat yazamayan lider kendini çoktan düşürmüş olmalı
+                    cursor.execute("SELECT pg_terminate_backend(%s)", (stale_pid,))
+                    self.terminated += 1
+                return None
+            cursor.execute(
+                "SELECT state, EXTRACT(EPOCH FROM now() - heartbeat_at) FROM bot_leader WHERE id = 1"
+            )
+            state, age = cursor.fetchone()
+            cursor.execute(
+                """
+                UPDATE bot_leader
+                SET epoch = epoch + 1, holder = %s, pid = pg_backend_pid(), acquired_at = now(), heartbeat_at = now()
+                WHERE id = 1
+                RETURNING epoch
+                """,
+                (self.holder,)
+            )
+            epoch = cursor.fetchone()[0]
+        if age is None or float(age) > self.state_max_age:
+            state = None
+        return epoch, state
+
+    def _heartbeat(self, epoch: int, state) -> bool:
+        """Heartbeat + durum yaz; epoch başkasına geçtiyse False"""
+        with self._conn.cursor() as cursor:
+            cursor.execute(
+                "UPDATE bot_leader SET heartbeat_at = now(), state = COALESCE(%s::jsonb, state) "
+                "WHERE id = 1 AND epoch = %s AND pid = pg_backend_pid()",
+                (None if state is None else json.dumps(state), epoch)
+            )
+            return cursor.rowcount == 1
+
+    def _release(self, epoch: int, state):
+        try:
+            if self._conn is not None and not self._conn.closed:
+                self._heartbeat(epoch, state)
+                with self._conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (self.lock_key,))
+        finally:
+            self._close()
+
+    def _error(self, error: Exception):
+        if self.on_error is not None:
+            self.on_error(error)
+
+    async def _demote(self, reason: str):
+        self.epoch = None
+        await self._call(self._close)
+        if self.on_demote is not None:
+            self.on_demote(reason)
+
+    async def run(self):
+        while not self._closed:
+            if self.epoch is None:
+                try:
+                    acquired = await self._call(self._try_acquire)
+                except Exception as e:
+                    self._error(e)
+                    await self._call(self._close)
+                    await asyncio.sleep(self.heartbeat_interval * 2)
+                    continue
+                if acquired is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if self._closed:
+                    await self._call(self._close)
+                    return
+                self.epoch, state = acquired
+                self._renewed_at = time.monotonic()
+                self.promotions += 1
+                if self.on_promote is not None:
+                    await self.on_promote(self.epoch, state)
+                continue
+
+            await asyncio.sleep(self.heartbeat_interval)
+            if self._closed or self.epoch is None:
+                continue
+            started = time.monotonic()
+            try:
+                state = self.get_state() if self.get_state is not None else None
+                renewed = await self._call(self._heartbeat, self.epoch, state)
+                reason = "epoch başka bir process'e geçti"
+            except Exception as e:
+                renewed = False
+                reason = f"lock bağlantısı koptu: {e}"
+            if self._closed:
+                continue
+            if renewed:
+                self._renewed_at = started
+            else:
+                await self._demote(reason)
+
+    async def release(self, state=None):
+        """Liderliği bırak: son durumu yaz ve lock'u aç (yedek hemen devralır)"""
+        self._closed = True
+        epoch, self.epoch = self.epoch, None
+        try:
+            if epoch is not None:
+                await self._call(self._release, epoch, state)
+            else:
+                await self._call(self._close)
+        finally:
+            self._executor.shutdown(wait=False)
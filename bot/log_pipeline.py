@@ -0,0 +1,104 @@
+"""
+Loglama Hattı - hot path'i bloklamayan kuyruk + arka plan yazıcı
+- Kayıtlar kuyruğa atılır, biçimlendirme ve stdout yazımı ayrı thread'de yapılır
+- Mesajlar lazy biçimlendirilir (logger.info("... %s", x) argümanları yazıcıda birleşir)
+- LOG_FORMAT=json ile yapılandırılmış kayıtlar (code, source, target alanlarıyla)
+- Yüksek hacimli başarı satırları için örnekleme + periyodik özet
+"""
+
+import asyncio
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+TEXT_FORMAT = '%(asctime)s | %(levelname)s | %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Kütüphane logları: sadece uyarı ve üstü (istek başına INFO satırı yazarlar)
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+class JsonFormatter(logging.Formatter):
+    """Her kayıt tek satır JSON: ts, level, msg + extra ile verilen alanlar"""
+
+    def format(self, record):
+        data = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler mesajı çağıran thread'de biçimlendirir; bu sürüm biçimlendirmeyi yazıcıya bırakır"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging(level=logging.INFO, fmt: str = "text", queue_size: int = 10000):
+    """Root logger'ı kuyruğa bağla, stdout'a yazan arka plan dinleyicisini başlat
+
+    Kuyruk doluysa kayıt atılır (gönderim hiçbir zaman log için beklemez).
+    Dönen QueueListener kapanışta stop() ile boşaltılmalıdır; handler.dropped
+    atılan kayıt sayısını verir.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = LazyQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    listener.start()
+    return listener, queue_handler
+
+class SuccessAggregator:
+    """Hedef başına başarı satırlarını kod bazında say, periyodik tek satır özet üret
+
+    sample_every > 0 ise her N. kayıt için record() True döner (tekil satır yine
+    loglanır); 0 ise tekil satır hiç loglanmaz, sadece özet yazılır.
+    """
+
+    def __init__(self, emit, interval: float = 5.0, sample_every: int = 0):
+        self.emit = emit
+        self.interval = interval
+        self.sample_every = sample_every
+        self.counts = {}
+        self.total = 0
+
+    def record(self, key) -> bool:
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        return bool(self.sample_every) and self.total % self.sample_every == 0
+
+    def flush(self):
+        if self.counts:
+            counts, self.counts = self.counts, {}
+            self.emit(counts)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.flush()
@@ -0,0 +1,124 @@
+"""
+Çoklu Kelime Eşleştirici (Aho-Corasick)
+- BANNED_WORDS, channel_filters ve admin link kodları için tek geçişli arama
+- Otomat cache yüklenirken bir kez kurulur, mesaj başına sadece tarama yapılır
+- En uzun eşleşme önceliği: "supertotobet" varsa "otobet" yerine o seçilir
+"""
+
+from collections import deque
+
+class AhoCorasick:
+    """Verilen kelimelerin metin içinde geçip geçmediğini tek taramada bulur"""
+
+    __slots__ = ("goto", "fail", "outputs")
+
+    def __init__(self, patterns):
+        self.goto = [{}]  # node -> {karakter: node}
+        self.fail = [0]
+        self.outputs = [()]  # node -> bu noktada biten tüm kelimeler
+
+        terminal = {}
+        for pattern in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                node = nxt
+            terminal[node] = pattern
+
+        # BFS ile fail linklerini kur, çıktıları suffix zinciri boyunca birleştir
+        queue = deque(self.goto[0].values())
+        for node in queue:
+            self.outputs[node] = (terminal[node],) if node in terminal else ()
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0)
+                own = (terminal[child],) if child in terminal else ()
+                self.outputs[child] = own + self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def find_all(self, text: str, found: set = None) -> set:
+        """Metinde geçen tüm kelimeleri döndür"""
+        if found is None:
+            found = set()
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def find_first(self, text: str):
+        """Metinde geçen ilk kelimeyi döndür (yoksa None)"""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                return outputs[state][0]
+        return None
+
+class KeywordIndex:
+    """Sahip bazlı kelime tablosu için tek otomat
+
+    owners: {sahip: {kelime: değer}} -- sahip bir kanal ID'si veya
+    (user_id, channel_id) olabilir. resolve() metinleri bir kez tarar ve
+    her sahip için eşleşen EN UZUN kelimenin değerini döndürür.
+    """
+
+    __slots__ = ("automaton", "owners_by_pattern")
+
+    def __init__(self, owners: dict):
+        self._build((owner, pattern, value) for owner, patterns in owners.items() for pattern, value in patterns.items())
+
+    @classmethod
+    def from_entries(cls, entries) -> "KeywordIndex":
+        """(sahip, kelime, değer) üçlülerinden kur (sahip başına ara dict oluşturmadan)"""
+        index = cls.__new__(cls)
+        index._build(entries)
+        return index
+
+    def _build(self, entries):
+        self.owners_by_pattern = {}  # kelime -> ([sahip, ...], [değer, ...])
+        for owner, pattern, value in entries:
+            slot = self.owners_by_pattern.get(pattern)
+            if slot is None:
+                slot = self.owners_by_pattern[pattern] = ([], [])
+            slot[0].append(owner)
+            slot[1].append(value)
+        self.automaton = AhoCorasick(self.owners_by_pattern)
+
+    def resolve(self, *texts) -> dict:
+        """Metinlerde geçen kelimelere göre {sahip: (kelime, değer)} döndür"""
+        found = set()
+        for text in texts:
+            self.automaton.find_all(text, found)
+
+        result = {}
+        # Uzundan kısaya: ilk atanan kelime o sahibin en uzun eşleşmesidir
+        for pattern in sorted(found, key=lambda p: (-len(p), p)):
+            owners, values = self.owners_by_pattern[pattern]
+            for owner, value in zip(owners, values):
+                if owner not in result:
+                    result[owner] = (pattern, value)
+        return result
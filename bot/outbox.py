@@ -0,0 +1,191 @@
+"""
+Gönderim Outbox'ı - hedef bazlı teslimat durumu kalıcı tutulur
+- Her (kod, hedef kanal) için bir satır: pending -> sent / failed
+- Yazmalar bellekte biriktirilir, arka planda toplu (group commit) yazılır:
+  gönderim hiçbir zaman DB yazımını beklemez
+- Restart sonrası pending kalan hedefler tekrar gönderilir (at-least-once)
+- (kod, kanal) anahtarı tekildir: aynı hedefe ikinci kez kuyruğa alınmaz,
+  sent olan hedef replay'de atlanır
+- Bekleyen yazma tamponu sınırlı (max_buffer): DB uzun süre yazılamazsa yeni kayıt
+  atılır ve sayılır (o hedef gönderilir ama restart sonrası tamamlanamaz)
+"""
+
+import asyncio
+import time
+
+from psycopg2.extras import execute_values
+
+class Outbox:
+    """Postgres delivery_outbox tablosuna toplu yazan outbox
+
+    on_drop(): tampon dolu olduğu için atılan her kayıtta çağrılır
+
+    Not: Gönderim başarılı olup "sent" durumu flush edilmeden process
+    çökerse o hedef replay'de bir kez daha gönderilir (at-least-once).
+    Bu pencere flush_interval kadardır.
+    """
+
+    def __init__(
+        self,
+        db,
+        flush_interval: float = 0.2,
+        batch_size: int = 1000,
+        retention: float = 86400,
+        max_buffer: int = 100000,
+        on_drop=None,
+    ):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention = retention
+        self.max_buffer = max_buffer
+        self.on_drop = on_drop
+        self._inserts = []  # (code, chat_id, text)
+        self._updates = {}  # (code, chat_id) -> (status, attempts)
+        self._active = set()  # Bu process'te kuyruğa alınmış, sonucu beklenen (code, chat_id)
+        self._wakeup = asyncio.Event()
+        self.failed_flushes = 0
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._inserts) + len(self._updates)
+
+    def _drop(self, count: int = 1):
+        self.dropped += count
+        if self.on_drop is not None:
+            for _ in range(count):
+                self.on_drop()
+
+    def claim(self, code: str, jobs: list) -> list:
+        """Kuyruğa alınacak işleri kaydet; aynı hedef zaten bekliyorsa atla
+
+        jobs: [(chat_id, text), ...] -> kaydedilen (yeni) işler
+        """
+        fresh = []
+        for chat_id, text in jobs:
+            key = (code, chat_id)
+            if key in self._active:
+                continue
+            self._active.add(key)
+            if len(self) >= self.max_buffer:
+                # Tampon dolu (DB yazılamıyor): hedef yine gönderilir, sadece kalıcı kaydı olmaz
+                self._drop()
+            else:
+                self._inserts.append((code, chat_id, text))
+            fresh.append((chat_id, text))
+        if len(self._inserts) >= self.batch_size:
+            self._wakeup.set()
+        return fresh
+
+    def _update(self, key: tuple, status: str, attempts: int):
+        if key not in self._updates and len(self) >= self.max_buffer:
+            self._drop()
+            return
+        self._updates[key] = (status, attempts)
+
+    def complete(self, code: str, chat_id: int, success: bool, attempts: int = 1):
+        key = (code, chat_id)
+        self._active.discard(key)
+        self._update(key, "sent" if success else "failed", attempts)
+
+    def release(self, code: str, chat_id: int):
+        """Sonucu bilinmeyen hedef: satır pending'e döndürülür (replay'de tekrar gönderilir)
+
+        Bekleyen failed güncellemesi varsa ezilir; DB'de sent olan satır değişmez.
+        """
+        key = (code, chat_id)
+        self._active.discard(key)
+        self._update(key, "pending", 0)
+
+    def _write(self, cursor, inserts, updates):
+        if inserts:
+            execute_values(
+                cursor,
+                """
+                INSERT INTO delivery_outbox (code, chat_id, text, status, attempts, created_at, updated_at)
+                VALUES %s
+                ON CONFLICT (code, chat_id) DO NOTHING
+                """,
+                inserts,
+                template="(%s, %s, %s, 'pending', 0, now(), now())",
+                page_size=self.batch_size,
+            )
+        if updates:
+            # sent bir satır tekrar pending/failed olmaz
+            execute_values(
+                cursor,
+                """
+                UPDATE delivery_outbox o
+                SET status = v.status, attempts = o.attempts + v.attempts, updated_at = now()
+                FROM (VALUES %s) AS v(code, chat_id, status, attempts)
+                WHERE o.code = v.code AND o.chat_id = v.chat_id AND o.status <> 'sent'
+                """,
+                updates,
+                template="(%s, %s::bigint, %s, %s::int)",
+                page_size=self.batch_size,
+            )
+
+    async def flush(self):
+        if not self._inserts and not self._updates:
+            return
+        inserts, self._inserts = self._inserts, []
+        updates, self._updates = self._updates, {}
+        rows = [(code, chat_id, status, attempts) for (code, chat_id), (status, attempts) in updates.items()]
+        try:
+            await self.db.run_async(self._write, inserts, rows)
+            self.written += len(inserts) + len(rows)
+        except Exception:
+            # Yazılamayanları geri koy, bir sonraki flush'ta tekrar denenir
+            self.failed_flushes += 1
+            self._inserts[:0] = inserts
+            restored = {(code, chat_id): (status, attempts) for code, chat_id, status, attempts in rows}
+            restored.update(self._updates)  # flush sırasında gelen daha yeni durum geçerli
+            self._updates = restored
+            # Tampon sınırı aşılırsa en eski kayıtlar atılır
+            overflow = len(self) - self.max_buffer
+            if overflow > 0:
+                dropped_inserts = min(overflow, len(self._inserts))
+                del self._inserts[:dropped_inserts]
+                for key in list(self._updates)[:overflow - dropped_inserts]:
+                    del self._updates[key]
+                self._drop(overflow)
+            raise
+
+    async def run(self, on_error=None):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                if on_error is not None:
+                    on_error(e)
+                await asyncio.sleep(self.flush_interval * 5)
+
+    async def load_pending(self, max_age: float) -> dict:
+        """max_age saniyeden yeni pending hedefleri oku: {code: [(chat_id, text), ...]}
+
+        Daha eski pending satırlar "expired" yapılır (kod artık geçersiz sayılır),
+        retention'dan eski satırlar silinir.
+        """
+        def fetch(cursor):
+            cursor.execute(
+                "UPDATE delivery_outbox SET status = 'expired', updated_at = now() "
+                "WHERE status = 'pending' AND created_at < to_timestamp(%s)",
+                (time.time() - max_age,)
+            )
+            cursor.execute("DELETE FROM delivery_outbox WHERE created_at < to_timestamp(%s)", (time.time() - self.retention,))
+            cursor.execute(
+                "SELECT code, chat_id, text FROM delivery_outbox WHERE status = 'pending' ORDER BY created_at"
+            )
+            return cursor.fetchall()
+
+        pending = {}
+        for code, chat_id, text in await self.db.run_async(fetch):
+            if (code, chat_id) not in self._active:
+                pending.setdefault(code, []).append((chat_id, text))
+        return pending
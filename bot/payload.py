@@ -0,0 +1,56 @@
+"""
+Gönderim Mesajı - metin bir kez üretilir, JSON gövdesi bir kez serileştirilir
+- Kod ve link MarkdownV2 kurallarına göre kaçışlanır
+  (kodda "_" veya "*" olunca Telegram'ın parse hatası vermesi engellenir)
+- Hedefler arasında sadece chat_id değişir: gövde hazır byte'lara chat_id eklenerek kurulur
+- Aynı metni alan hedefler aynı MessagePayload nesnesini paylaşır
+"""
+
+import json
+
+PARSE_MODE = "MarkdownV2"
+
+# MarkdownV2: entity dışında bu karakterlerin hepsi "\" ile kaçışlanmalı
+_TEXT_ESCAPE = str.maketrans({c: "\\" + c for c in "\\_*[]()~`>#+-=|{}.!"})
+# `kod` entity'si içinde sadece "`" ve "\" kaçışlanır
+_CODE_ESCAPE = str.maketrans({"\\": "\\\\", "`": "\\`"})
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def escape_text(text: str) -> str:
+    return text.translate(_TEXT_ESCAPE)
+
+def escape_code(code: str) -> str:
+    return code.translate(_CODE_ESCAPE)
+
+def render_message(code: str, link: str) -> str:
+    """Hedef kanala gidecek metin: kopyalanabilir kod + link"""
+    return f"`{escape_code(code)}`\n\n{escape_text(link)}"
+
+class MessagePayload:
+    """Tek bir metin varyantı için önceden serileştirilmiş sendMessage gövdesi"""
+
+    __slots__ = ("text", "_tail")
+
+    def __init__(self, text: str):
+        self.text = text
+        rest = json.dumps(
+            {"text": text, "parse_mode": PARSE_MODE, "disable_web_page_preview": True},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        self._tail = b"," + rest[1:].encode()
+
+    def body(self, chat_id: int) -> bytes:
+        return b'{"chat_id":%d%s' % (chat_id, self._tail)
+
+def build_payloads(jobs: list) -> list:
+    """[(chat_id, text), ...] -> [(chat_id, MessagePayload), ...], aynı metin tek nesne"""
+    payloads = {}
+    result = []
+    for chat_id, text in jobs:
+        payload = payloads.get(text)
+        if payload is None:
+            payload = payloads[text] = MessagePayload(text)
+        result.append((chat_id, payload))
+    return result
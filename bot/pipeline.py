@@ -0,0 +1,145 @@
+"""
+Kod İşleme Hattı - Mesaj alımı ile gönderim arasında sınırlı kuyruk
+- Alım (event / polling) sadece parse + tekrar kontrolü yapar ve kodu kuyruğa koyar;
+  yavaş bir gönderim sonraki mesajların işlenmesini bekletmez
+- Kuyruk sınırlı ve öncelikli: en yeni kod önce gönderilir
+- Aşırı yükte shed politikası: oldest = en eski bekleyen kod atılır,
+  newest = yeni gelen kod kabul edilmez. max_age'den uzun bekleyen kod da atılır
+- Sabit sayıda gönderici (SenderPool) kuyruktan kod alıp fan-out yapar
+"""
+
+import asyncio
+import bisect
+import itertools
+import time
+
+SHED_OLDEST = "oldest"
+SHED_NEWEST = "newest"
+
+# Atılma nedenleri (metrik etiketi)
+SHED_FULL = "queue_full"
+SHED_STALE = "stale"
+
+class CodeQueue:
+    """Gönderim bekleyen kodlar için sınırlı öncelik kuyruğu (en yeni kod önce)
+
+    on_shed(item, reason, waited): atılan her kod için çağrılır
+    """
+
+    def __init__(self, maxsize: int = 100, max_age: float = 60.0, shed_policy: str = SHED_OLDEST, on_shed=None):
+        if shed_policy not in (SHED_OLDEST, SHED_NEWEST):
+            raise ValueError(f"Bilinmeyen shed politikası: {shed_policy}")
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.shed_policy = shed_policy
+        self.on_shed = on_shed
+        self._items = []  # (intake_at, sıra, item) - artan sırada, en yeni sonda
+        self._counter = itertools.count()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _shed(self, entry, reason: str):
+        if self.on_shed is not None:
+            self.on_shed(entry[2], reason, time.monotonic() - entry[0])
+
+    def put(self, item, intake_at: float = None) -> bool:
+        """Kodu kuyruğa koy (beklemez). Yeni kod atıldıysa False"""
+        entry = (time.monotonic() if intake_at is None else intake_at, next(self._counter), item)
+        if len(self._items) >= self.maxsize:
+            if self.shed_policy == SHED_NEWEST:
+                self._shed(entry, SHED_FULL)
+                return False
+            self._shed(self._items.pop(0), SHED_FULL)
+        bisect.insort(self._items, entry)
+        self._ready.set()
+        return True
+
+    async def get(self):
+        """En yeni kodu al; max_age'i aşmış olanlar atlanır"""
+        while True:
+            while not self._items:
+                self._ready.clear()
+                await self._ready.wait()
+            entry = self._items.pop()
+            if self.max_age and time.monotonic() - entry[0] > self.max_age:
+                self._shed(entry, SHED_STALE)
+                # En yeni bile bayatsa kalanlar da bayat
+                for old in self._items:
+                    self._shed(old, SHED_STALE)
+                self._items.clear()
+                continue
+            return entry[2]
+
+    def clear(self) -> list:
+        """Bekleyen kodları (en eskiden yeniye) kuyruktan çıkar"""
+        items = [entry[2] for entry in self._items]
+        self._items.clear()
+        return items
+
+class SenderPool:
+    """Kuyruktaki kodları `concurrency` kadar eşzamanlı gönderici ile işler
+
+    handler(item) -> coroutine; hata on_error(item, exception) ile bildirilir
+    """
+
+    def __init__(self, queue: CodeQueue, handler, concurrency: int = 4, on_error=None):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.on_error = on_error
+        self.active = 0
+        self._tasks = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_timeout: float = 0) -> list:
+        """Göndericileri durdur; drain_timeout verilirse önce kuyruğun boşalması beklenir
+
+        Süre içinde gönderilemeyip kuyrukta kalan kodları döndürür
+        """
+        if drain_timeout and self._tasks:
+            try:
+                await asyncio.wait_for(self.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        return self.queue.clear()
+
+    def submit(self, item, intake_at: float = None) -> bool:
+        accepted = self.queue.put(item, intake_at)
+        if accepted:
+            self._idle.clear()
+        return accepted
+
+    async def join(self):
+        """Kuyruk boşalıp tüm gönderimler bitene kadar bekle"""
+        while len(self.queue) or self.active:
+            self._idle.clear()
+            try:
+                # Kuyruktakiler bayat diye atılırsa worker bitirmeden de boşalabilir
+                await asyncio.wait_for(self._idle.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            self.active += 1
+            try:
+                await self.handler(item)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(item, e)
+            finally:
+                self.active -= 1
+                if not self.active and not len(self.queue):
+                    self._idle.set()
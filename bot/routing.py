@@ -0,0 +1,141 @@
+"""
+Yönlendirme Tablosu - send_to_all_channels için önceden hesaplanmış hedefler
+- load_target_channels her çalıştığında yeniden kurulur, sonra değiştirilmez
+- "all" kanallar hazır liste, "filtered" kanallar keyword -> kanal indeksi
+- Aynı kanal için "ilk geçen user'ın ayarları geçerli" kuralı önceden çözülür
+- Hedefler dizi kolonlarında tutulur; kurulum kanal başına küçük bir kayıtla tek geçişte yapılır
+"""
+
+from array import array
+
+from matcher import KeywordIndex
+
+class ChannelCandidates:
+    """Kurulum sırasında kanal başına: ilk "all" user'a kadar gelen "filtered" user'lar"""
+
+    __slots__ = ("first_filtered", "filtered", "all_user")
+
+    def __init__(self):
+        self.first_filtered = None
+        self.filtered = 0
+        self.all_user = None
+
+class RoutingTable:
+    """Kod başına iş sadece eşleşen hedef sayısı kadar olsun diye kurulan tablo
+
+    Kanal başına DB sırasındaki ilk user'ın ayarı geçerlidir. Filtreler kanal
+    bazlı olduğu için aynı kanalın tüm "filtered" user'ları birlikte geçer
+    veya birlikte elenir; elenirlerse sıradaki ilk "all" user'a düşülür.
+    """
+
+    __slots__ = (
+        "unfiltered_users", "unfiltered_channels", "filter_index", "filtered_owner", "filtered_fallback",
+        "filtered_counts", "base_filtered_out", "link_index", "target_count",
+    )
+
+    def __init__(self, unfiltered_users, unfiltered_channels, filter_index, filtered_owner, filtered_fallback,
+                 filtered_counts, base_filtered_out, link_index, target_count):
+        self.unfiltered_users = unfiltered_users  # array: her koda gönderilen hedeflerin user_id'leri
+        self.unfiltered_channels = unfiltered_channels  # array: ... ve channel_id'leri (aynı sırada)
+        self.filter_index = filter_index  # KeywordIndex: channel_id -> keyword
+        self.filtered_owner = filtered_owner  # channel_id -> user_id (keyword eşleşirse)
+        self.filtered_fallback = filtered_fallback  # channel_id -> user_id (eşleşmezse "all" user)
+        self.filtered_counts = filtered_counts  # channel_id -> elenen "filtered" user sayısı
+        self.base_filtered_out = base_filtered_out  # hiçbir keyword eşleşmezse elenen user sayısı
+        self.link_index = link_index  # KeywordIndex: (user_id, channel_id) -> link_url
+        self.target_count = target_count
+
+    @classmethod
+    def build(cls, rows, channel_filters: dict, link_entries) -> "RoutingTable":
+        """rows: DB sırasıyla (user_id, channel_id, filter_mode) satırları
+        link_entries: ((user_id, channel_id), link_code, link_url) üçlüleri
+        """
+        # Kanallar ilk görüldükleri sırayla; ilk "all" user'dan sonrakiler etkisiz
+        candidates = {}  # channel_id -> ChannelCandidates
+        target_count = 0
+        for user_id, channel_id, filter_mode in rows:
+            target_count += 1
+            slot = candidates.get(channel_id)
+            if slot is None:
+                slot = candidates[channel_id] = ChannelCandidates()
+            if slot.all_user is not None:
+                continue
+            if filter_mode == "all":
+                slot.all_user = user_id
+            else:
+                if slot.first_filtered is None:
+                    slot.first_filtered = user_id
+                slot.filtered += 1
+
+        unfiltered_users = array("q")
+        unfiltered_channels = array("q")
+        filtered_owner = {}
+        filtered_fallback = {}
+        filtered_counts = {}
+        base_filtered_out = 0
+
+        for channel_id, slot in candidates.items():
+            if not slot.filtered:
+                unfiltered_users.append(slot.all_user)
+                unfiltered_channels.append(channel_id)
+                continue
+
+            base_filtered_out += slot.filtered
+            if not channel_filters.get(channel_id):
+                # Keyword yoksa "filtered" user'lar hiçbir zaman geçmez
+                if slot.all_user is not None:
+                    unfiltered_users.append(slot.all_user)
+                    unfiltered_channels.append(channel_id)
+                continue
+
+            filtered_owner[channel_id] = slot.first_filtered
+            filtered_counts[channel_id] = slot.filtered
+            if slot.all_user is not None:
+                filtered_fallback[channel_id] = slot.all_user
+        candidates = None  # Kanal kayıtları indeksler kurulmadan bırakılır (kurulumdaki tepe bellek)
+
+        return cls(
+            unfiltered_users=unfiltered_users,
+            unfiltered_channels=unfiltered_channels,
+            filter_index=KeywordIndex.from_entries(
+                (channel_id, keyword, keyword) for channel_id in filtered_owner for keyword in channel_filters[channel_id]
+            ),
+            filtered_owner=filtered_owner,
+            filtered_fallback=filtered_fallback,
+            filtered_counts=filtered_counts,
+            base_filtered_out=base_filtered_out,
+            link_index=KeywordIndex.from_entries(link_entries),
+            target_count=target_count,
+        )
+
+    def route(self, code_lower: str, link_lower: str):
+        """Kod için hedefleri döndür: ([(user_id, channel_id, link_url|None), ...], filtered_out_count)"""
+        matched_filters = self.filter_index.resolve(code_lower, link_lower)
+        matched_links = self.link_index.resolve(code_lower, link_lower)
+
+        # Eşleşen linkler kanal bazında: hedef döngüsünde anahtar tuple'ı kurulmaz
+        links_by_channel = {}
+        for (user_id, channel_id), (_, link_url) in matched_links.items():
+            links_by_channel.setdefault(channel_id, {})[user_id] = link_url
+
+        targets = []
+        for user_id, channel_id in zip(self.unfiltered_users, self.unfiltered_channels):
+            links = links_by_channel.get(channel_id)
+            targets.append((user_id, channel_id, links.get(user_id) if links else None))
+
+        filtered_out = self.base_filtered_out
+        for channel_id in matched_filters:
+            filtered_out -= self.filtered_counts[channel_id]
+            user_id = self.filtered_owner[channel_id]
+            match = matched_links.get((user_id, channel_id))
+            targets.append((user_id, channel_id, match[1] if match else None))
+
+        # Eşleşmeyen "filtered" kanallarda sıradaki "all" user'a düş
+        for channel_id, user_id in self.filtered_fallback.items():
+            if channel_id not in matched_filters:
+                match = matched_links.get((user_id, channel_id))
+                targets.append((user_id, channel_id, match[1] if match else None))
+
+        return targets, filtered_out
+
+EMPTY_ROUTING_TABLE = RoutingTable.build([], {}, ())
@@ -0,0 +1,181 @@
+"""
+Sharding - gönderimi birden fazla gönderici process'e dağıtır
+- Dinleyici process kodu ayrıştırır ve tekrar kontrolünü yapar, gönderimi
+  hedef kanalın consistent-hash dilimine sahip worker'a devreder
+- Dinleyici ile worker'lar aynı makinede Unix socket üzerinden konuşur
+  (satır başına bir JSON mesaj)
+- Kanal hep aynı worker'a düşer: kanal bazlı rate limit tek yerde tutulur,
+  worker sayısı değişince sadece ~1/N kanal yer değiştirir
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from bisect import bisect
+
+STREAM_LIMIT = 16 * 1024 * 1024  # Tek satırlık batch için okuma sınırı
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+def socket_path(directory: str, index: int) -> str:
+    return os.path.join(directory, f"telegramkod-shard-{index}.sock")
+
+class HashRing:
+    """Sanal düğümlü consistent-hash halkası"""
+
+    __slots__ = ("nodes", "_points", "_owners")
+
+    def __init__(self, nodes, replicas: int = 160):
+        self.nodes = list(nodes)
+        ring = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(replicas))
+        self._points = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key) -> object:
+        index = bisect(self._points, _hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+    def split(self, items, key=lambda item: item) -> dict:
+        """Öğeleri sahibi olan düğüme göre grupla: {node: [öğe, ...]}"""
+        groups = {}
+        for item in items:
+            groups.setdefault(self.node_for(key(item)), []).append(item)
+        return groups
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DİNLEYİCİ TARAFI
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ShardUnreachable(ConnectionError):
+    """Batch worker'a hiç gönderilemedi (bağlantı / yazma hatası): yerelde gönderilebilir"""
+
+class ShardClient:
+    """Bir worker'a bağlantı: batch gönderir, cevabını future ile bekler
+
+    deliver(code, jobs) -> [{"success", "chat_id", "latency", ...}, ...]
+    Bağlanılamaz veya batch yazılamazsa ShardUnreachable fırlatır (çağıran yerelde
+    gönderebilir). Batch yazıldıktan sonra bağlantı koparsa ConnectionError: worker
+    hedeflerin bir kısmını göndermiş olabilir. Sonraki çağrıda yeniden bağlanılır.
+    """
+
+    def __init__(self, path: str, connect_timeout: float = 1.0):
+        self.path = path
+        self.connect_timeout = connect_timeout
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}  # batch id -> future
+        self._next_id = 0
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self):
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT), self.connect_timeout
+            )
+            self._writer = writer
+            self._reader_task = asyncio.create_task(self._read_replies(reader))
+
+    async def _read_replies(self, reader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._pending.pop(reply["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(reply["results"])
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._drop(ConnectionError(f"shard bağlantısı koptu: {self.path}"))
+
+    def _drop(self, error: Exception):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def deliver(self, code: str, jobs: list) -> list:
+        """jobs: [(chat_id, text), ...]"""
+        if self._writer is None:
+            try:
+                await self._connect()
+            except (OSError, asyncio.TimeoutError) as e:
+                raise ShardUnreachable(f"shard'a bağlanılamadı: {self.path}: {e}") from e
+
+        self._next_id += 1
+        batch_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[batch_id] = future
+
+        line = json.dumps({"id": batch_id, "code": code, "jobs": jobs}, ensure_ascii=False) + "\n"
+        try:
+            self._writer.write(line.encode())
+            await self._writer.drain()
+        except (ConnectionError, AttributeError) as e:
+            self._pending.pop(batch_id, None)
+            self._drop(ConnectionError(str(e)))
+            raise ShardUnreachable(f"shard'a yazılamadı: {self.path}: {e}") from e
+
+        return await future
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._drop(ConnectionError("shard istemcisi kapatıldı"))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# WORKER TARAFI
+# ══════════════════════════════════════════════════════════════════════════════
+
+async def serve_shard(path: str, deliver):
+    """Unix socket'te batch kabul et, her batch için deliver(code, jobs) sonucunu döndür
+
+    Batch'ler paralel işlenir; cevaplar hazır oldukça (sırasız) yazılır.
+    """
+    async def handle(reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def run(batch):
+            try:
+                results = await deliver(batch["code"], batch["jobs"])
+            except Exception as e:
+                results = [{"success": False, "chat_id": chat_id, "error": str(e), "error_code": None}
+                           for chat_id, _ in batch["jobs"]]
+            data = json.dumps({"id": batch["id"], "results": results}, ensure_ascii=False) + "\n"
+            async with write_lock:
+                try:
+                    writer.write(data.encode())
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # Dinleyici gitti, sonuç bekleyen yok
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(run(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(handle, path, limit=STREAM_LIMIT)
@@ -0,0 +1,168 @@
+"""
+Hedef Cache'i - Çok sayıda kiracıda az bellekli hedef / link / filtre tabloları
+- user_channels satırları dizi (array) kolonlarında: satır başına tuple ve
+  (user_id, channel_id) anahtarlı dict girişi yok, GC'nin taradığı nesne sayısı düşük
+- Link kodları, URL'ler ve filtre kelimeleri intern edilir: aynı metin tek string nesnesi
+- Aynı kelime kümesini kullanan kanallar tek frozenset'i paylaşır
+- Tablolar DB imlecinden satır satır doldurulur (fetchall listesi / ara dict oluşmaz)
+"""
+
+import sys
+from array import array
+
+MODE_ALL = 0
+MODE_FILTERED = 1
+MODE_NAMES = ("all", "filtered")
+
+def matches(user_id, channel_id, key_user, key_channel) -> bool:
+    return (key_user is None or user_id == key_user) and (key_channel is None or channel_id == key_channel)
+
+class TargetRows:
+    """user_channels satırları: uc.id sırasıyla paralel kolonlar
+
+    (user_id, channel_id) tekildir. Delta uygulaması yeni tablo üretir,
+    eski tablo o ana kadar kullananlar için değişmeden kalır.
+    """
+
+    __slots__ = ("ids", "user_ids", "channel_ids", "modes")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.user_ids = array("q")
+        self.channel_ids = array("q")
+        self.modes = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows) -> "TargetRows":
+        """rows: uc.id sıralı (id, user_id, channel_id, filter_mode) satırları (DB imleci olabilir)"""
+        table = cls()
+        for row_id, user_id, channel_id, filter_mode in rows:
+            table.add(row_id, user_id, channel_id, filter_mode)
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, row_id: int, user_id: int, channel_id: int, filter_mode: str):
+        self.ids.append(row_id)
+        self.user_ids.append(user_id)
+        self.channel_ids.append(channel_id)
+        self.modes.append(MODE_ALL if (filter_mode or "all") == "all" else MODE_FILTERED)
+
+    def __iter__(self):
+        """(user_id, channel_id, filter_mode) uc.id sırasıyla"""
+        for user_id, channel_id, mode in zip(self.user_ids, self.channel_ids, self.modes):
+            yield user_id, channel_id, MODE_NAMES[mode]
+
+    def without(self, user_id=None, channel_id=None) -> "TargetRows":
+        """Verilen user/kanala ait satırlar çıkarılmış kopya"""
+        table = TargetRows()
+        for row_id, uid, cid, mode in zip(self.ids, self.user_ids, self.channel_ids, self.modes):
+            if not matches(uid, cid, user_id, channel_id):
+                table.ids.append(row_id)
+                table.user_ids.append(uid)
+                table.channel_ids.append(cid)
+                table.modes.append(mode)
+        return table
+
+    def merged(self, other: "TargetRows") -> "TargetRows":
+        """İki id sıralı tabloyu id sırasıyla birleştir"""
+        table = TargetRows()
+        i = j = 0
+        for _ in range(len(self) + len(other)):
+            if j >= len(other) or (i < len(self) and self.ids[i] < other.ids[j]):
+                source, k = self, i
+                i += 1
+            else:
+                source, k = other, j
+                j += 1
+            table.ids.append(source.ids[k])
+            table.user_ids.append(source.user_ids[k])
+            table.channel_ids.append(source.channel_ids[k])
+            table.modes.append(source.modes[k])
+        return table
+
+class LinkTable:
+    """admin_links satırları: (user_id, channel_id) sıralı paralel kolonlar
+
+    Kodlar küçük harfle, kod ve URL'ler intern edilerek tutulur (aynı site adı /
+    kullanıcının tüm kanallarındaki aynı link tek string nesnesi).
+    """
+
+    __slots__ = ("user_ids", "channel_ids", "codes", "urls")
+
+    def __init__(self):
+        self.user_ids = array("q")
+        self.channel_ids = array("q")
+        self.codes = []
+        self.urls = []
+
+    @classmethod
+    def from_rows(cls, rows) -> "LinkTable":
+        """rows: (user_id, channel_id, link_code, link_url), anahtar sırasıyla"""
+        table = cls()
+        for user_id, channel_id, link_code, link_url in rows:
+            table.add(user_id, channel_id, link_code, link_url)
+        return table
+
+    def __len__(self):
+        return len(self.codes)
+
+    def add(self, user_id: int, channel_id: int, link_code: str, link_url: str):
+        code = sys.intern(link_code.lower())
+        url = sys.intern(link_url)
+        # Aynı hedefte aynı kod (büyük/küçük harf farkı) tekrar gelirse son URL geçerli
+        if self.codes and self.codes[-1] == code and self.user_ids[-1] == user_id and self.channel_ids[-1] == channel_id:
+            self.urls[-1] = url
+            return
+        self.user_ids.append(user_id)
+        self.channel_ids.append(channel_id)
+        self.codes.append(code)
+        self.urls.append(url)
+
+    def entries(self):
+        """KeywordIndex için (sahip, kod, url); ardışık satırlar aynı anahtar tuple'ını paylaşır"""
+        key = None
+        for user_id, channel_id, code, url in zip(self.user_ids, self.channel_ids, self.codes, self.urls):
+            if key is None or key[0] != user_id or key[1] != channel_id:
+                key = (user_id, channel_id)
+            yield key, code, url
+
+    def without(self, user_id=None, channel_id=None) -> "LinkTable":
+        table = LinkTable()
+        for uid, cid, code, url in zip(self.user_ids, self.channel_ids, self.codes, self.urls):
+            if not matches(uid, cid, user_id, channel_id):
+                table.user_ids.append(uid)
+                table.channel_ids.append(cid)
+                table.codes.append(code)
+                table.urls.append(url)
+        return table
+
+    def extended(self, other: "LinkTable") -> "LinkTable":
+        table = LinkTable()
+        for source in (self, other):
+            table.user_ids.extend(source.user_ids)
+            table.channel_ids.extend(source.channel_ids)
+            table.codes.extend(source.codes)
+            table.urls.extend(source.urls)
+        return table
+
+def compact_filters(rows, shared: dict = None) -> dict:
+    """(channel_id, keyword) satırlarından {channel_id: frozenset}
+
+    Aynı kelime kümesine sahip kanallar tek frozenset'i paylaşır; shared verilirse
+    (ör. mevcut cache'in kümeleri) onlarla da paylaşılır.
+    """
+    collected = {}
+    for channel_id, keyword in rows:
+        words = collected.get(channel_id)
+        if words is None:
+            words = collected[channel_id] = set()
+        words.add(sys.intern(keyword.lower()))
+
+    shared = {} if shared is None else shared
+    filters = {}
+    for channel_id, words in collected.items():
+        words = frozenset(words)
+        filters[channel_id] = shared.setdefault(words, words)
+    return filters
@@ -0,0 +1,29 @@
+"""
+Lider seçimi: advisory lock anahtarının pg_locks (classid, objid) karşılığı
+
+Çalıştırma (bot/ dizininden):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leader import DEFAULT_LOCK_KEY, lock_key_parts
+
+class LockKeyPartsTest(unittest.TestCase):
+    def test_default_key_fits_in_objid(self):
+        self.assertEqual(lock_key_parts(DEFAULT_LOCK_KEY), (0, 73110001))
+
+    def test_bigint_key_is_split_into_high_and_low_words(self):
+        key = (5 << 32) | 42
+        self.assertEqual(lock_key_parts(key), (5, 42))
+
+    def test_negative_key_uses_twos_complement_words(self):
+        # pg_locks classid/objid oid (işaretsiz) olarak gösterir
+        self.assertEqual(lock_key_parts(-1), (4294967295, 4294967295))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Outbox: sonucu bilinmeyen hedefin pending'e dönmesi ve sınırlı yazma tamponu
+
+Çalıştırma (bot/ dizininden):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbox import Outbox
+
+class FakeDB:
+    """run_async(func, *args): yazılacak satırları kaydeder, fail=True ise hata verir"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.writes = []
+
+    async def run_async(self, func, *args):
+        if self.fail:
+            raise ConnectionError("db yok")
+        self.writes.append(args)
+
+class OutboxReleaseTest(unittest.IsolatedAsyncioTestCase):
+    async def test_release_resets_row_to_pending(self):
+        db = FakeDB()
+        outbox = Outbox(db)
+        outbox.claim("KOD", [(-1001, "metin")])
+        await outbox.flush()
+
+        # Önceki deneme failed yazılmışken sonuç bilinmiyor: satır tekrar pending olmalı
+        outbox.complete("KOD", -1001, False)
+        outbox.release("KOD", -1001)
+        await outbox.flush()
+
+        inserts, updates = db.writes[-1]
+        self.assertEqual(inserts, [])
+        self.assertEqual(updates, [("KOD", -1001, "pending", 0)])
+        # Bu process'te de yeniden kuyruğa alınabilir
+        self.assertEqual(outbox.claim("KOD", [(-1001, "metin")]), [(-1001, "metin")])
+
+class OutboxBufferTest(unittest.IsolatedAsyncioTestCase):
+    async def test_buffer_is_capped_while_db_is_down(self):
+        drops = []
+        outbox = Outbox(FakeDB(fail=True), max_buffer=100, on_drop=lambda: drops.append(1))
+
+        for i in range(10):
+            jobs = [(chat_id, "metin") for chat_id in range(50)]
+            # Kayıt atılsa da hedefler gönderilmek üzere döner
+            self.assertEqual(len(outbox.claim(f"KOD{i}", jobs)), 50)
+            with self.assertRaises(ConnectionError):
+                await outbox.flush()
+            self.assertLessEqual(len(outbox), 100)
+
+        self.assertEqual(outbox.dropped, 400)
+        self.assertEqual(len(drops), 400)
+
+    async def test_failed_flush_keeps_rows_and_caps_new_updates(self):
+        outbox = Outbox(FakeDB(fail=True), max_buffer=3)
+        outbox.claim("KOD", [(1, "a"), (2, "b"), (3, "c")])
+        inserts = list(outbox._inserts)
+        with self.assertRaises(ConnectionError):
+            await outbox.flush()
+        self.assertEqual(outbox._inserts, inserts)
+        self.assertEqual(outbox.dropped, 0)
+
+        outbox.complete("KOD", 1, True)
+        self.assertEqual(outbox.dropped, 1)
+        self.assertEqual(len(outbox), 3)
+
+if __name__ == "__main__":
+    unittest.main()
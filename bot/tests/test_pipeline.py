@@ -0,0 +1,80 @@
+"""
+Alım -> gönderim hattı: kapanışta kuyruktaki kodlar kaybolmaz
+
+Çalıştırma (bot/ dizininden):
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedupe import FileJournal, SentCodeStore
+from pipeline import CodeQueue, SenderPool
+
+class SenderPoolStopTest(unittest.IsolatedAsyncioTestCase):
+    async def test_queued_codes_are_delivered_before_stop(self):
+        delivered = []
+
+        async def deliver(item):
+            await asyncio.sleep(0.01)
+            delivered.append(item)
+
+        pool = SenderPool(CodeQueue(maxsize=100, max_age=0), deliver, concurrency=1)
+        pool.start()
+        for i in range(10):
+            pool.submit(f"KOD{i}")
+
+        left = await pool.stop(drain_timeout=5)
+
+        self.assertEqual(left, [])
+        self.assertEqual(sorted(delivered), sorted(f"KOD{i}" for i in range(10)))
+
+    async def test_stop_returns_codes_left_after_timeout(self):
+        async def deliver(item):
+            await asyncio.sleep(10)
+
+        pool = SenderPool(CodeQueue(maxsize=100, max_age=0), deliver, concurrency=1)
+        pool.start()
+        for i in range(3):
+            pool.submit(f"KOD{i}")
+        await asyncio.sleep(0)
+
+        left = await pool.stop(drain_timeout=0.05)
+
+        # Biri gönderimdeyken iptal edildi, kalan ikisi kuyrukta
+        self.assertEqual(len(left), 2)
+        self.assertEqual(len(pool.queue), 0)
+
+class QueuedCodeRestartTest(unittest.IsolatedAsyncioTestCase):
+    """bot.py: alımda add(persist=False), gönderici kodu alınca persist()"""
+
+    async def test_undelivered_code_is_not_blocked_after_restart(self):
+        path = os.path.join(tempfile.mkdtemp(prefix="senttest"), "sent_codes.log")
+        sent_codes = SentCodeStore(journal=FileJournal(path))
+
+        async def deliver(item):
+            sent_codes.persist(item)
+            await asyncio.sleep(10)
+
+        pool = SenderPool(CodeQueue(maxsize=100, max_age=0), deliver, concurrency=1)
+        pool.start()
+        for code in ("KOD1", "KOD2"):
+            sent_codes.add(code, persist=False)
+            pool.submit(code)
+        await asyncio.sleep(0)
+        left = await pool.stop(drain_timeout=0.05)
+        self.assertEqual(left, ["KOD1"])
+
+        # Restart: gönderici almadan kapanışta kalan kod tekrar işlenebilir
+        restarted = SentCodeStore(journal=FileJournal(path))
+        await restarted.restore()
+        self.assertTrue(restarted.contains("KOD2"))
+        self.assertFalse(restarted.contains("KOD1"))
+
+if __name__ == "__main__":
+    unittest.main()
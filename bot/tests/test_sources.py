@@ -0,0 +1,74 @@
+"""
+Kaynak kanal / kelime listesi: tablo yok, tür yok ve tümü pasif durumları
+
+Çalıştırma (bot/ dizininden, bot/requirements.txt kurulu):
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# bot.py import sırasında Telethon client ve kalıcı depolar kurulur: sahte kimlik, kalıcılık kapalı
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "x")
+os.environ.setdefault("SESSION_FILE", os.path.join(tempfile.mkdtemp(prefix="sourcetest"), "bot_session"))
+os.environ.setdefault("DEDUPE_STORE", "memory")
+os.environ.setdefault("OUTBOX_STORE", "off")
+os.environ.setdefault("DELIVERY_LOG", "off")
+
+import bot
+
+class FakeCursor:
+    """source_channels / bot_words sorgularına sabit satır döner (None = tablo yok)"""
+
+    def __init__(self, channels=None, words=None):
+        self.channels = channels
+        self.words = words
+        self._result = None
+
+    def execute(self, query, params=None):
+        if "to_regclass" in query:
+            self._result = [(
+                "source_channels" if self.channels is not None else None,
+                "bot_words" if self.words is not None else None,
+            )]
+        elif "FROM source_channels" in query:
+            self._result = [(channel_id, name) for channel_id, name, active in self.channels if active]
+        elif "FROM bot_words" in query:
+            self._result = list(self.words)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+class FetchSourcesTest(unittest.TestCase):
+    def test_missing_tables_fall_back_to_defaults(self):
+        self.assertEqual(bot.fetch_sources(FakeCursor()), (None, None, None))
+
+    def test_all_inactive_channels_listen_to_nothing(self):
+        channels, _, _ = bot.fetch_sources(FakeCursor(channels=[(-1001, "a", False), (-1002, "b", False)]))
+        self.assertEqual(channels, {})
+
+    def test_keyword_only_rows_keep_default_banned_words(self):
+        _, banned, keywords = bot.fetch_sources(FakeCursor(words=[("keyword", "Kod")]))
+        self.assertIsNone(banned)
+        self.assertEqual(keywords, {"kod"})
+
+    def test_no_banned_rows_keep_default_banned_words(self):
+        _, banned, keywords = bot.fetch_sources(FakeCursor(words=[]))
+        self.assertIsNone(banned)
+        self.assertIsNone(keywords)
+
+    def test_each_word_type_is_built_separately(self):
+        _, banned, keywords = bot.fetch_sources(FakeCursor(words=[("banned", "Yasak"), ("keyword", "KOD")]))
+        self.assertEqual(banned, {"yasak"})
+        self.assertEqual(keywords, {"kod"})
+
+if __name__ == "__main__":
+    unittest.main()
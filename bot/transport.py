@@ -0,0 +1,124 @@
+"""
+Bot API Taşıyıcısı - HTTP/2 destekli, ısıtılmış bağlantı havuzu
+- h2 paketi kuruluysa HTTP/2 (tek bağlantıda çoklu istek), değilse HTTP/1.1
+- Bağlantılar periyodik hafif isteklerle (getMe) sıcak tutulur: sessizlik
+  sonrası ilk kodda TCP+TLS kurulumu beklenmez
+- Havuz boyutu hedef kanal sayısına göre ayarlanır (değişince yeni havuz kurulur,
+  eski havuz üzerindeki istekler bitince kapatılır)
+- Havuzdan bağlantı bekleme süresi ve yeni açılan bağlantılar ölçülür
+"""
+
+import asyncio
+import importlib.util
+import time
+
+import httpx
+
+from payload import JSON_HEADERS
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+class BotTransport:
+    """Gönderim için paylaşılan HTTP istemcisi
+
+    on_pool_wait(saniye): her istekte, havuzdan bağlantı alınana kadar geçen süre
+    on_connect(): yeni TCP bağlantısı açıldığında
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        timeout: float = 5.0,
+        connect_timeout: float = 3.0,
+        min_connections: int = 10,
+        max_connections: int = 50,
+        targets_per_connection: int = 20,
+        keepalive_expiry: float = 60.0,
+        on_pool_wait=None,
+        on_connect=None,
+        verify=True,
+    ):
+        self.http2 = http2 and http2_available()
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.targets_per_connection = targets_per_connection
+        self.keepalive_expiry = keepalive_expiry
+        self.on_pool_wait = on_pool_wait
+        self.on_connect = on_connect
+        self.verify = verify
+        self.size = min_connections
+        self.client = self._build(self.size)
+        self._timeout_ext = self.timeout.as_dict()
+        self._retiring = {}  # kapanmayı bekleyen eski istemci -> task
+
+    def _build(self, size: int) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_keepalive_connections=size, max_connections=size,
+                                keepalive_expiry=self.keepalive_expiry),
+            verify=self.verify,
+        )
+
+    def size_for(self, target_count: int) -> int:
+        wanted = -(-target_count // self.targets_per_connection)
+        return max(self.min_connections, min(self.max_connections, wanted))
+
+    def resize(self, target_count: int) -> bool:
+        """Hedef sayısına göre havuz boyutunu ayarla; değiştiyse True"""
+        size = self.size_for(target_count)
+        if size == self.size:
+            return False
+        old = self.client
+        self.size = size
+        self.client = self._build(size)
+        # Eski havuzdaki istekler timeout süresi içinde biter, sonra kapatılır
+        self._retiring[old] = asyncio.get_running_loop().create_task(self._retire(old))
+        return True
+
+    async def _retire(self, client: httpx.AsyncClient):
+        await asyncio.sleep(self.timeout.read + self.timeout.connect)
+        self._retiring.pop(client, None)
+        await client.aclose()
+
+    async def post(self, url: httpx.URL, body: bytes) -> httpx.Response:
+        """Hazır JSON gövdesini gönder (client header birleştirmesi ve URL parse'ı yok)"""
+        started = time.monotonic()
+        waiting = True
+
+        async def trace(event: str, info: dict):
+            nonlocal waiting
+            if waiting and (event == "connection.connect_tcp.started" or event.endswith("send_request_headers.started")):
+                waiting = False
+                if self.on_pool_wait is not None:
+                    self.on_pool_wait(time.monotonic() - started)
+            if event == "connection.connect_tcp.complete" and self.on_connect is not None:
+                self.on_connect()
+
+        request = httpx.Request("POST", url, content=body, headers=JSON_HEADERS,
+                                extensions={"timeout": self._timeout_ext, "trace": trace})
+        return await self.client.send(request)
+
+    async def warm(self, url: httpx.URL, connections: int = None):
+        """Havuzu ısıt: aynı anda `connections` hafif istek (HTTP/1.1'de her biri ayrı bağlantı)"""
+        if connections is None:
+            connections = 1 if self.http2 else self.size
+        await asyncio.gather(*[self.client.get(url) for _ in range(connections)], return_exceptions=True)
+
+    async def keep_warm(self, url_func, interval: float = 25.0):
+        """Bağlantıları keepalive_expiry dolmadan periyodik olarak kullan
+
+        url_func() -> ısıtma isteği URL'i (token değişebildiği için her seferinde sorulur)
+        """
+        while True:
+            await self.warm(url_func())
+            await asyncio.sleep(min(interval, self.keepalive_expiry / 2))
+
+    async def aclose(self):
+        retiring, self._retiring = self._retiring, {}
+        for client, task in retiring.items():
+            task.cancel()
+            await client.aclose()
+        await self.client.aclose()
@@ -0,0 +1,183 @@
+"""
+Güncelleme Motoru - kanal bazlı pts takibi ile boşluk (gap) odaklı çekim
+- Her kanal için son uygulanan pts tutulur
+- Gelen update'te pts boşluğu varsa sadece o kanal için getChannelDifference
+- Güvenlik ağı olarak kanal bazlı uyarlanabilir aralıkla difference kontrolü:
+  aktif kanal sık, sessiz kanal seyrek kontrol edilir
+- Aynı mesajın event ve difference yolundan iki kez işlenmesini engeller
+"""
+
+import asyncio
+import time
+from collections import deque
+
+class ChannelState:
+    __slots__ = ("channel_id", "pts", "interval", "next_poll", "last_activity", "lock", "recent_ids", "recent_set")
+
+    def __init__(self, channel_id: int, pts, interval: float, recent_size: int):
+        self.channel_id = channel_id
+        self.pts = pts
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.last_activity = 0.0
+        self.lock = asyncio.Lock()
+        self.recent_ids = deque(maxlen=recent_size)  # işlenen son mesaj ID'leri
+        self.recent_set = set()
+
+class UpdateEngine:
+    """Kanal bazlı pts takibi yapan gap odaklı güncelleme motoru
+
+    fetch_difference(channel_id, pts) -> (yeni_pts, mesajlar, final, timeout)
+    get_pts(channel_id) -> pts (bilinmiyorsa motor ilk çekimde sorar)
+    on_message(channel_id, message) -> difference ile gelen ve daha önce
+    işlenmemiş her mesaj için çağrılır (eskiden yeniye)
+    on_error(channel_id, exception) -> çekim hatalarında çağrılır (opsiyonel)
+    """
+
+    def __init__(
+        self,
+        fetch_difference,
+        on_message,
+        get_pts=None,
+        on_error=None,
+        min_interval: float = 2.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        recent_size: int = 200,
+    ):
+        self.fetch_difference = fetch_difference
+        self.on_message = on_message
+        self.get_pts = get_pts
+        self.on_error = on_error
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.recent_size = recent_size
+        self.channels = {}  # channel_id -> ChannelState
+        self.gap_fetches = 0
+        self.poll_fetches = 0
+
+    def add_channel(self, channel_id: int, pts=None):
+        if channel_id not in self.channels:
+            self.channels[channel_id] = ChannelState(channel_id, pts, self.min_interval, self.recent_size)
+        elif pts is not None:
+            self.channels[channel_id].pts = pts
+
+    def remove_channel(self, channel_id: int):
+        self.channels.pop(channel_id, None)
+
+    def set_pts(self, channel_id: int, pts):
+        """Kanalın pts'ini verilen değere çek (None = motor ilk çekimde güncel pts'yi sorar)"""
+        state = self.channels.get(channel_id)
+        if state is not None:
+            state.pts = pts
+
+    async def fetch_all(self):
+        """Tüm kanalları hemen çek (devralma sonrası aradaki mesajlar için)"""
+        await asyncio.gather(*[self._safe_fetch(channel_id) for channel_id in list(self.channels)])
+
+    def claim(self, channel_id: int, message_id: int) -> bool:
+        """Mesaj ilk kez mi işleniyor? (event ve difference yolu arasında tek kazanan)"""
+        state = self.channels.get(channel_id)
+        if state is None:
+            return True
+        if message_id in state.recent_set:
+            return False
+        if len(state.recent_ids) == state.recent_ids.maxlen:
+            state.recent_set.discard(state.recent_ids[0])
+        state.recent_ids.append(message_id)
+        state.recent_set.add(message_id)
+        return True
+
+    def _mark_active(self, state: ChannelState):
+        state.last_activity = time.monotonic()
+        state.interval = self.min_interval
+        state.next_poll = min(state.next_poll, state.last_activity + state.interval)
+
+    def on_update(self, channel_id: int, pts: int, pts_count: int) -> bool:
+        """Event ile gelen update'in pts bilgisini işle. Boşluk varsa çekim başlatır.
+
+        Returns: True = sıralı veya yeni update, False = zaten uygulanmış
+        """
+        state = self.channels.get(channel_id)
+        if state is None:
+            return True
+
+        self._mark_active(state)
+
+        if state.pts is None:
+            state.pts = pts
+            return True
+
+        expected = state.pts + pts_count
+        if pts == expected:
+            state.pts = pts
+            return True
+        if pts < expected:
+            return False
+
+        # Boşluk: aradaki update'ler kaçırıldı, sadece bu kanal için difference çek
+        self.gap_fetches += 1
+        asyncio.create_task(self._safe_fetch(channel_id))
+        return True
+
+    async def fetch(self, channel_id: int):
+        """Kanal için getChannelDifference'ı final olana kadar çek"""
+        state = self.channels.get(channel_id)
+        if state is None:
+            return
+
+        async with state.lock:
+            if state.pts is None:
+                if self.get_pts is None:
+                    return
+                state.pts = await self.get_pts(channel_id)
+                return
+
+            timeout = None
+            while True:
+                new_pts, messages, final, timeout = await self.fetch_difference(channel_id, state.pts)
+                if messages:
+                    self._mark_active(state)
+                    for message in sorted(messages, key=lambda m: m.id):
+                        if self.claim(channel_id, message.id):
+                            await self.on_message(channel_id, message)
+                if new_pts is not None:
+                    state.pts = max(state.pts, new_pts)
+                if final:
+                    break
+
+            # Sessiz kanalın kontrol aralığını yavaşça büyüt (sunucu timeout önerisini aşmadan)
+            if not messages and time.monotonic() - state.last_activity > state.interval:
+                state.interval = min(self.max_interval, state.interval * self.backoff)
+                if timeout:
+                    state.interval = min(state.interval, max(self.min_interval, timeout))
+            state.next_poll = time.monotonic() + state.interval
+
+    async def run(self):
+        """Vakti gelen kanalları kontrol et; bir sonraki vakte kadar uyu"""
+        while True:
+            now = time.monotonic()
+            due = [s for s in self.channels.values() if s.next_poll <= now and not s.lock.locked()]
+            for state in due:
+                state.next_poll = now + state.interval
+                self.poll_fetches += 1
+                asyncio.create_task(self._safe_fetch(state.channel_id))
+
+            if self.channels:
+                sleep_for = max(0.05, min(s.next_poll for s in self.channels.values()) - time.monotonic())
+            else:
+                sleep_for = self.min_interval
+            await asyncio.sleep(sleep_for)
+
+    async def _safe_fetch(self, channel_id: int):
+        try:
+            await self.fetch(channel_id)
+        except Exception as e:
+            # Hata (FloodWait dahil) durumunda kanalın kontrolünü ertele
+            state = self.channels.get(channel_id)
+            if state is not None:
+                state.interval = min(self.max_interval, state.interval * 2)
+                state.next_poll = time.monotonic() + max(state.interval, getattr(e, "seconds", 0) or 0)
+            if self.on_error is not None:
+                self.on_error(channel_id, e)
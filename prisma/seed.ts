@@ -27,6 +27,32 @@ async function main() {
 
   console.log("✅ Süper admin oluşturuldu:", superAdmin.username);
 
+  // Varsayılan kaynak kanallar ve yasaklı kelimeler (bot'taki varsayılanlarla aynı)
+  const sourceChannels: [bigint, string][] = [
+    [BigInt("-1002059757502"), "bamco"],
+    [BigInt("-1001513128130"), "soft"],
+    [BigInt("-1001904588149"), "bonusuzmanı"],
+    [BigInt("-1003795422286"), "eser"],
+  ];
+  for (const [channelId, name] of sourceChannels) {
+    await prisma.sourceChannel.upsert({
+      where: { channelId },
+      update: {},
+      create: { channelId, name },
+    });
+  }
+
+  const bannedWords = ["aktif", "başladı", "test", "etkinliği", "geliyor", "hazirla", "için", "kimler", "bamcoositeler"];
+  for (const word of bannedWords) {
+    await prisma.botWord.upsert({
+      where: { type_word: { type: "banned", word } },
+      update: {},
+      create: { type: "banned", word },
+    });
+  }
+
+  console.log(`✅ Kaynak kanallar (${sourceChannels.length}) ve yasaklı kelimeler (${bannedWords.length}) eklendi`);
+
   console.log("\n📋 Kurulum tamamlandı!");
   console.log(`   Giriş: ${adminUsername}`);
   console.log(`   Şifre: ${adminPassword}`);
@@ -99,7 +99,7 @@ export async function POST(request: NextRequest) {
     });
 
     // Cache'i invalidate et - bot yeni linki görecek
-    await invalidateCache();
+    await invalidateCache({ table: "admin_links", userId: targetUserId, channelId: channel_id });
 
     return NextResponse.json({
       id: link.id,
@@ -157,7 +157,7 @@ export async function PATCH(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "admin_links", userId: updatedLink.userId, channelId: updatedLink.channelId });
 
     return NextResponse.json({
       id: updatedLink.id,
@@ -208,7 +208,7 @@ export async function DELETE(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "admin_links", userId: link.userId, channelId: link.channelId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
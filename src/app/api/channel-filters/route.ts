@@ -131,7 +131,7 @@ export async function POST(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "channel_filters", channelId });
 
     return NextResponse.json({
       id: filter.id,
@@ -195,7 +195,7 @@ export async function DELETE(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "channel_filters", channelId: filter.channelId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -257,7 +257,7 @@ export async function PATCH(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "user_channels", userId: userChannel.userId, channelId });
 
     return NextResponse.json({ success: true, filterMode });
   } catch (error) {
@@ -158,7 +158,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Cache'i invalidate et - bot yeni kanalı görecek
-    await invalidateCache();
+    await invalidateCache({ table: "channels", channelId: finalChannelId });
 
     return NextResponse.json({
       success: true,
@@ -200,7 +200,7 @@ export async function DELETE(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "channels", channelId: parsedChannelId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -239,7 +239,7 @@ export async function PATCH(request: NextRequest) {
     });
 
     // Cache'i invalidate et - pause durumu değişti
-    await invalidateCache();
+    await invalidateCache({ table: "channels", channelId: parsedChannelId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -0,0 +1,101 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db";
+import { getSession } from "@/lib/auth";
+
+// GET - Teslimat logu ve kanal bazlı özet (gönderim sayısı, hata oranı, ortalama gecikme)
+// ?channelId=...&days=1&limit=100
+export async function GET(request: NextRequest) {
+  try {
+    const session = await getSession();
+    if (!session) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+    }
+
+    const { searchParams } = new URL(request.url);
+    const channelId = searchParams.get("channelId");
+    const days = Math.min(30, Math.max(1, parseInt(searchParams.get("days") || "1") || 1));
+    const limit = Math.min(500, Math.max(1, parseInt(searchParams.get("limit") || "100") || 100));
+
+    // Superadmin tüm kanalları, normal kullanıcı sadece kendi kanallarını görür
+    let channelIds: bigint[] | null = null;
+    if (session.role !== "superadmin") {
+      const targetUserId = session.impersonatingUserId || session.userId;
+      const userChannels = await prisma.userChannel.findMany({
+        where: { userId: targetUserId },
+        select: { channelId: true },
+      });
+      channelIds = userChannels.map((uc) => uc.channelId);
+
+      if (channelId && !channelIds.some((id) => id === BigInt(channelId))) {
+        return NextResponse.json({ error: "Forbidden" }, { status: 403 });
+      }
+    }
+    if (channelId) {
+      channelIds = [BigInt(channelId)];
+    }
+    if (channelIds && channelIds.length === 0) {
+      return NextResponse.json({ entries: [], stats: [] });
+    }
+
+    // Gün kolonu indeksli: sadece son `days` günün satırları okunur
+    const since = new Date();
+    since.setUTCHours(0, 0, 0, 0);
+    since.setUTCDate(since.getUTCDate() - (days - 1));
+
+    const where = {
+      day: { gte: since },
+      ...(channelIds ? { chatId: { in: channelIds } } : {}),
+    };
+
+    const [entries, totals, failures] = await Promise.all([
+      prisma.deliveryLog.findMany({
+        where,
+        orderBy: { deliveredAt: "desc" },
+        take: limit,
+      }),
+      prisma.deliveryLog.groupBy({
+        by: ["chatId"],
+        where,
+        _count: { _all: true },
+        _avg: { latencyMs: true },
+      }),
+      prisma.deliveryLog.groupBy({
+        by: ["chatId"],
+        where: { ...where, success: false },
+        _count: { _all: true },
+      }),
+    ]);
+
+    const failureCounts = new Map(failures.map((f) => [f.chatId.toString(), f._count._all]));
+
+    return NextResponse.json({
+      entries: entries.map((e) => ({
+        id: e.id.toString(),
+        deliveredAt: e.deliveredAt.toISOString(),
+        code: e.code,
+        chatId: e.chatId.toString(),
+        success: e.success,
+        errorCode: e.errorCode,
+        error: e.error,
+        attempts: e.attempts,
+        latencyMs: e.latencyMs,
+      })),
+      stats: totals.map((t) => {
+        const failed = failureCounts.get(t.chatId.toString()) || 0;
+        return {
+          chatId: t.chatId.toString(),
+          total: t._count._all,
+          failed,
+          failureRate: t._count._all ? failed / t._count._all : 0,
+          avgLatencyMs: t._avg.latencyMs != null ? Math.round(t._avg.latencyMs) : null,
+        };
+      }),
+    });
+  } catch (error) {
+    console.error("Error fetching delivery log:", error);
+    return NextResponse.json(
+      { error: "Failed to fetch delivery log" },
+      { status: 500 }
+    );
+  }
+}
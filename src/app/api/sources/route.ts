@@ -0,0 +1,125 @@
+import { NextRequest, NextResponse } from "next/server";
+import { prisma } from "@/lib/db";
+import { getSession } from "@/lib/auth";
+import { invalidateCache } from "@/lib/cache";
+
+const WORD_TYPES = ["banned", "keyword"];
+
+// GET - Bot'un dinlediği kaynak kanallar ve kelime listeleri
+export async function GET() {
+  try {
+    // Yetki kontrolü - sadece superadmin erişebilir
+    const session = await getSession();
+    if (!session || session.role !== "superadmin") {
+      return NextResponse.json({ error: "Yetkisiz erisim" }, { status: 403 });
+    }
+
+    const [channels, words] = await Promise.all([
+      prisma.sourceChannel.findMany({ orderBy: { createdAt: "asc" } }),
+      prisma.botWord.findMany({ orderBy: [{ type: "asc" }, { word: "asc" }] }),
+    ]);
+
+    return NextResponse.json({
+      channels: channels.map((c) => ({
+        channelId: c.channelId.toString(),
+        name: c.name,
+        isActive: c.isActive,
+        createdAt: c.createdAt.toISOString(),
+      })),
+      words: words.map((w) => ({
+        id: w.id,
+        word: w.word,
+        type: w.type,
+      })),
+    });
+  } catch (error) {
+    console.error("Error fetching sources:", error);
+    return NextResponse.json({ error: "Kaynak listesi alinamadi" }, { status: 500 });
+  }
+}
+
+// POST - Kaynak kanal veya kelime ekle/güncelle
+// { kind: "channel", channel_id, name, is_active? } | { kind: "word", type: "banned" | "keyword", word }
+export async function POST(request: NextRequest) {
+  try {
+    // Yetki kontrolü - sadece superadmin erişebilir
+    const session = await getSession();
+    if (!session || session.role !== "superadmin") {
+      return NextResponse.json({ error: "Yetkisiz erisim" }, { status: 403 });
+    }
+
+    const body = await request.json();
+
+    if (body.kind === "channel") {
+      const { channel_id, name, is_active = true } = body;
+      if (!channel_id || !name) {
+        return NextResponse.json({ error: "channel_id ve name gerekli" }, { status: 400 });
+      }
+
+      const channelId = BigInt(channel_id);
+      await prisma.sourceChannel.upsert({
+        where: { channelId },
+        update: { name, isActive: Boolean(is_active) },
+        create: { channelId, name, isActive: Boolean(is_active) },
+      });
+
+      // Bot yeni kanalı yeniden bağlanmadan dinlemeye başlar
+      await invalidateCache({ table: "source_channels" });
+      return NextResponse.json({ success: true });
+    }
+
+    if (body.kind === "word") {
+      const { type } = body;
+      const word = typeof body.word === "string" ? body.word.toLowerCase().trim() : "";
+      if (!WORD_TYPES.includes(type) || !word) {
+        return NextResponse.json({ error: "type (banned/keyword) ve word gerekli" }, { status: 400 });
+      }
+
+      await prisma.botWord.upsert({
+        where: { type_word: { type, word } },
+        update: {},
+        create: { type, word },
+      });
+
+      await invalidateCache({ table: "bot_words" });
+      return NextResponse.json({ success: true });
+    }
+
+    return NextResponse.json({ error: "kind channel veya word olmali" }, { status: 400 });
+  } catch (error) {
+    console.error("Error adding source:", error);
+    return NextResponse.json({ error: "Kaynak eklenemedi" }, { status: 500 });
+  }
+}
+
+// DELETE - ?channel_id=... veya ?word_id=...
+export async function DELETE(request: NextRequest) {
+  try {
+    // Yetki kontrolü - sadece superadmin erişebilir
+    const session = await getSession();
+    if (!session || session.role !== "superadmin") {
+      return NextResponse.json({ error: "Yetkisiz erisim" }, { status: 403 });
+    }
+
+    const { searchParams } = new URL(request.url);
+    const channelId = searchParams.get("channel_id");
+    const wordId = searchParams.get("word_id");
+
+    if (channelId) {
+      await prisma.sourceChannel.deleteMany({ where: { channelId: BigInt(channelId) } });
+      await invalidateCache({ table: "source_channels" });
+      return NextResponse.json({ success: true });
+    }
+
+    if (wordId) {
+      await prisma.botWord.deleteMany({ where: { id: parseInt(wordId) } });
+      await invalidateCache({ table: "bot_words" });
+      return NextResponse.json({ success: true });
+    }
+
+    return NextResponse.json({ error: "channel_id veya word_id gerekli" }, { status: 400 });
+  } catch (error) {
+    console.error("Error removing source:", error);
+    return NextResponse.json({ error: "Kaynak silinemedi" }, { status: 500 });
+  }
+}
@@ -185,7 +185,7 @@ export async function POST(request: NextRequest) {
     });
 
     // Cache'i invalidate et - bot yeni kanal atamasını görecek
-    await invalidateCache();
+    await invalidateCache({ table: "user_channels", userId: parseInt(userId), channelId });
 
     // BigInt'i string'e dönüştür
     return NextResponse.json({
@@ -232,7 +232,7 @@ export async function DELETE(request: NextRequest) {
     });
 
     // Cache'i invalidate et
-    await invalidateCache();
+    await invalidateCache({ table: "user_channels", userId: parseInt(userId), channelId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -309,7 +309,7 @@ export async function PATCH(request: NextRequest) {
     });
 
     // Cache'i invalidate et - pause durumu değişti, bot aktif kanalları yenilemeli
-    await invalidateCache();
+    await invalidateCache({ table: "user_channels", userId: targetUserId, channelId });
 
     // BigInt'i string'e dönüştür
     return NextResponse.json({
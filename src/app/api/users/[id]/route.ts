@@ -29,6 +29,7 @@ export async function GET(
         bannedAt: true,
         bannedReason: true,
         botEnabled: true,
+        coalesceWindowMs: true,
         createdAt: true,
         updatedAt: true,
         channels: {
@@ -87,7 +88,8 @@ export async function PATCH(
       isActive,
       isBanned,
       bannedReason,
-      botEnabled
+      botEnabled,
+      coalesceWindowMs
     } = body;
 
     // Güncelleme verisi hazırla
@@ -98,6 +100,10 @@ export async function PATCH(
     if (role !== undefined) updateData.role = role;
     if (isActive !== undefined) updateData.isActive = isActive;
     if (botEnabled !== undefined) updateData.botEnabled = botEnabled;
+    // null = bot varsayılanı, 0 = kapalı
+    if (coalesceWindowMs !== undefined) {
+      updateData.coalesceWindowMs = coalesceWindowMs === null ? null : Math.max(0, Math.min(5000, Number(coalesceWindowMs) || 0));
+    }
 
     // Ban işlemi
     if (isBanned !== undefined) {
@@ -130,6 +136,7 @@ export async function PATCH(
         bannedAt: true,
         bannedReason: true,
         botEnabled: true,
+        coalesceWindowMs: true,
         updatedAt: true,
       },
     });
@@ -144,7 +151,7 @@ export async function PATCH(
 
     // Cache'i invalidate et - kullanıcı durumu değişti (botEnabled, isBanned, isActive)
     // Bot aktif kanalları yenilemeli
-    await invalidateCache();
+    await invalidateCache({ table: "users", userId });
 
     return NextResponse.json(user);
   } catch (error) {
@@ -180,7 +187,7 @@ export async function DELETE(
     });
 
     // Cache'i invalidate et - kullanıcı silindi, aktif kanallar değişebilir
-    await invalidateCache();
+    await invalidateCache({ table: "users", userId });
 
     return NextResponse.json({ success: true });
   } catch (error) {
@@ -1,16 +1,51 @@
 import { prisma } from "./db";
 
 /**
- * Cache version'ı artır - Bot bu değişikliği algılayıp cache'i yeniler
+ * Değişen satırın kapsamı - Bot sadece bu satırları yeniden okur
+ * Kapsam verilmezse bot tüm cache'i yeniler
+ */
+export interface CacheChange {
+  table:
+    | "users"
+    | "channels"
+    | "user_channels"
+    | "admin_links"
+    | "channel_filters"
+    | "source_channels"
+    | "bot_words";
+  userId?: number;
+  channelId?: bigint | string | number;
+}
+
+/**
+ * Cache version'ı artır ve bota NOTIFY gönder - Bot bu değişikliği algılayıp cache'i yeniler
  * Website'de keywords, banned words, channels, users değiştiğinde çağrılmalı
+ * Version artışı ve bildirim aynı sorguda yapılır, böylece bildirimler version sırasıyla gelir
  */
-export async function invalidateCache(): Promise<void> {
+export async function invalidateCache(change?: CacheChange): Promise<void> {
+  const table = change?.table ?? null;
+  const userId = change?.userId ?? null;
+  const channelId = change?.channelId != null ? change.channelId.toString() : null;
+
   try {
     await prisma.$executeRaw`
-      INSERT INTO cache_version (id, version, updated_at)
-      VALUES (1, 1, NOW())
-      ON CONFLICT (id)
-      DO UPDATE SET version = cache_version.version + 1, updated_at = NOW()
+      WITH bumped AS (
+        INSERT INTO cache_version (id, version, updated_at)
+        VALUES (1, 1, NOW())
+        ON CONFLICT (id)
+        DO UPDATE SET version = cache_version.version + 1, updated_at = NOW()
+        RETURNING version
+      )
+      SELECT pg_notify(
+        'cache_invalidate',
+        json_build_object(
+          'version', bumped.version,
+          'table', ${table}::text,
+          'user_id', ${userId}::int,
+          'channel_id', ${channelId}::text
+        )::text
+      )
+      FROM bumped
     `;
   } catch (error) {
     console.error("Cache invalidation hatası:", error);